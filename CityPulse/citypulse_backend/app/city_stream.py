@@ -0,0 +1,260 @@
+"""
+Şehir bazlı canlı güncelleme akışı (Server-Sent Events)
+
+Feedback, metrik (city_stats, city_weather, paycell_stats) ve skor tablolarına
+yazılan satırlar trigger'larla city_changes tablosuna eklenir; yazan submit,
+arka plan kuyruğu veya update_eco_scores.py gibi başka bir process olabilir.
+Her worker'da tek bir asyncio görevi bu tabloyu seq sırasıyla okur ve olayı
+o şehrin abonelerine dağıtır:
+
+- Olay çerçevesi bir kez oluşturulur, tüm abonelere aynı metin gider
+- Abone başına kuyruk sınırlıdır; yavaş istemcide en eski olay düşer ve
+  istemciye "resync" olayı gönderilir (ekranı yeniden yüklemesi için)
+- Boşta bekleyen abone sadece bir asyncio.Event ve bir zamanlayıcıdır;
+  olay yoksa STREAM_HEARTBEAT_SECONDS aralığıyla heartbeat yorumu yazılır
+- Abone yoksa tabloya sadece son seq için bakılır
+
+Olay id'si seq'tir; yeniden bağlanan istemci Last-Event-ID gönderirse kaçırdığı
+olaylar (tutulan STREAM_CHANGE_RETENTION kayıt içindeyse) önce gönderilir.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+
+from sqlalchemy import text
+
+from . import config
+from .database import SessionLocal
+
+
+# Tek kontrolde okunan en fazla değişiklik
+_PARTI = 1000
+
+_SON_SEQ = text("SELECT COALESCE(MAX(seq), 0) FROM city_changes")
+_DEGISIKLIKLER = text("""
+    SELECT seq, city_id, event, payload FROM city_changes
+    WHERE seq > :son ORDER BY seq LIMIT :limit
+""")
+_GECMIS = text("""
+    SELECT seq, event, payload FROM city_changes
+    WHERE seq > :son AND seq <= :ust AND city_id = :city_id ORDER BY seq LIMIT :limit
+""")
+_EN_ESKI_SEQ = text("SELECT MIN(seq) FROM city_changes")
+_BUDA = text("DELETE FROM city_changes WHERE seq <= :sinir")
+
+
+class AkisDolu(Exception):
+    """Worker'daki abone sınırı aşıldı"""
+
+
+def cerceve(seq: int, olay: str, veri: str) -> str:
+    """SSE olay çerçevesi (veri tek satır JSON)"""
+    return f"id: {seq}\nevent: {olay}\ndata: {veri}\n\n"
+
+
+class Abone:
+    """Tek SSE bağlantısı: sınırlı kuyruk, doluysa en eski olay düşer"""
+
+    __slots__ = ("city_id", "_kuyruk", "_olay", "dusen")
+
+    def __init__(self, city_id: str, boyut: int):
+        self.city_id = city_id
+        self._kuyruk: deque = deque(maxlen=max(1, boyut))
+        self._olay = asyncio.Event()
+        # Son okumadan beri düşen olay sayısı
+        self.dusen = 0
+
+    def ekle(self, metin: str) -> bool:
+        """Olayı kuyruğa koy - yer açmak için eski olay düştüyse False"""
+        dustu = len(self._kuyruk) == self._kuyruk.maxlen
+        if dustu:
+            self.dusen += 1
+        self._kuyruk.append(metin)
+        self._olay.set()
+        return not dustu
+
+    async def bekle(self, sure: float) -> List[str]:
+        """Bekleyen çerçeveler - sure içinde olay gelmezse boş liste (heartbeat zamanı)"""
+        if not self._kuyruk:
+            self._olay.clear()
+            try:
+                await asyncio.wait_for(self._olay.wait(), sure)
+            except asyncio.TimeoutError:
+                return []
+        cerceveler = list(self._kuyruk)
+        self._kuyruk.clear()
+        if self.dusen:
+            cerceveler.insert(0, f'event: resync\ndata: {{"dropped": {self.dusen}}}\n\n')
+            self.dusen = 0
+        return cerceveler
+
+
+class CanliAkis:
+    """city_changes'i okuyup şehir abonelerine dağıtan hub (worker başına bir tane)"""
+
+    def __init__(
+        self,
+        kontrol_araligi: float,
+        kuyruk_boyutu: int,
+        kalp_atisi: float,
+        en_fazla_abone: int,
+        saklanan_degisiklik: int
+    ):
+        self.kontrol_araligi = max(0.05, kontrol_araligi)
+        self.kuyruk_boyutu = max(1, kuyruk_boyutu)
+        self.kalp_atisi = max(0.1, kalp_atisi)
+        self.en_fazla_abone = max(0, en_fazla_abone)
+        self.saklanan_degisiklik = max(_PARTI, saklanan_degisiklik)
+
+        self._aboneler: Dict[str, Set[Abone]] = {}
+        self._abone_sayisi = 0
+        # Dağıtılan son değişiklik; görev başlamadan None
+        self._son_seq: Optional[int] = None
+        self._gorev: Optional[asyncio.Task] = None
+        self._sayaclar = {"events": 0, "delivered": 0, "dropped": 0, "subscribed": 0}
+
+    @property
+    def son_seq(self) -> Optional[int]:
+        return self._son_seq
+
+    def abone_ol(self, city_id: str) -> Abone:
+        if self._abone_sayisi >= self.en_fazla_abone:
+            raise AkisDolu(f"En fazla {self.en_fazla_abone} abone")
+        abone = Abone(city_id, self.kuyruk_boyutu)
+        self._aboneler.setdefault(city_id, set()).add(abone)
+        self._abone_sayisi += 1
+        self._sayaclar["subscribed"] += 1
+        return abone
+
+    def ayril(self, abone: Abone):
+        aboneler = self._aboneler.get(abone.city_id)
+        if aboneler is None or abone not in aboneler:
+            return
+        aboneler.discard(abone)
+        if not aboneler:
+            del self._aboneler[abone.city_id]
+        self._abone_sayisi -= 1
+
+    def dagit(self, satirlar: List[Tuple[int, str, str, str]]):
+        """Okunan değişiklikleri (seq, city_id, event, payload) abonelere dağıt"""
+        for seq, city_id, olay, veri in satirlar:
+            self._son_seq = seq
+            self._sayaclar["events"] += 1
+            aboneler = self._aboneler.get(city_id)
+            if not aboneler:
+                continue
+            metin = cerceve(seq, olay, veri)
+            for abone in aboneler:
+                if not abone.ekle(metin):
+                    self._sayaclar["dropped"] += 1
+            self._sayaclar["delivered"] += len(aboneler)
+
+    async def gecmis(self, city_id: str, son_id: int) -> List[str]:
+        """
+        Last-Event-ID'den sonra kaçırılan olaylar (abone olduktan sonra çağrılır)
+
+        Sadece hub'ın dağıttığı son seq'e kadar okunur; sonrakiler zaten aboneye
+        kuyruktan gelir. Kaçırılanlar silinmişse veya kuyruğa sığmıyorsa sadece
+        resync olayı döner, istemci ekranı baştan yükler.
+        """
+        ust = self._son_seq
+        if ust is None or son_id >= ust:
+            return []
+        satirlar, en_eski = await asyncio.to_thread(self._gecmisi_oku, city_id, son_id, ust)
+        if (en_eski is not None and en_eski > son_id + 1) or len(satirlar) > self.kuyruk_boyutu:
+            return ['event: resync\ndata: {"dropped": null}\n\n']
+        return [cerceve(seq, olay, veri) for seq, olay, veri in satirlar]
+
+    def _gecmisi_oku(self, city_id: str, son_id: int, ust: int):
+        db = SessionLocal()
+        try:
+            satirlar = db.execute(_GECMIS, {
+                "son": son_id, "ust": ust, "city_id": city_id, "limit": self.kuyruk_boyutu + 1
+            }).all()
+            return [tuple(s) for s in satirlar], db.execute(_EN_ESKI_SEQ).scalar()
+        finally:
+            db.close()
+
+    def _oku(self, son: Optional[int]) -> Tuple[Optional[int], List[Tuple[int, str, str, str]]]:
+        db = SessionLocal()
+        try:
+            if son is None:
+                return db.execute(_SON_SEQ).scalar(), []
+            satirlar = db.execute(_DEGISIKLIKLER, {"son": son, "limit": _PARTI}).all()
+            return son, [tuple(s) for s in satirlar]
+        finally:
+            db.close()
+
+    def _buda(self, son: int) -> int:
+        db = SessionLocal()
+        try:
+            silinen = db.execute(_BUDA, {"sinir": son - self.saklanan_degisiklik}).rowcount
+            db.commit()
+            return silinen
+        finally:
+            db.close()
+
+    async def kontrol(self) -> int:
+        """Yeni değişiklikleri oku ve dağıt - dağıtılan değişiklik sayısı"""
+        if not self._aboneler or self._son_seq is None:
+            # Dinleyen yok: sadece nereden devam edileceğini takip et
+            self._son_seq, _ = await asyncio.to_thread(self._oku, None)
+            return 0
+        toplam = 0
+        while True:
+            _, satirlar = await asyncio.to_thread(self._oku, self._son_seq)
+            self.dagit(satirlar)
+            toplam += len(satirlar)
+            if len(satirlar) < _PARTI:
+                return toplam
+
+    async def _calis(self):
+        tur = 0
+        while True:
+            try:
+                await self.kontrol()
+                tur += 1
+                # Eski değişiklikleri ara sıra sil (birden fazla worker silse de zararsız)
+                if tur % 120 == 0 and self._son_seq:
+                    await asyncio.to_thread(self._buda, self._son_seq)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Canlı akış kontrol hatası: {str(e)}")
+            await asyncio.sleep(self.kontrol_araligi)
+
+    def baslat(self):
+        """Çalışan event loop'ta dağıtım görevini başlat (lifespan içinde çağrılır)"""
+        if self._gorev is not None:
+            return
+        self._gorev = asyncio.get_running_loop().create_task(self._calis())
+
+    async def durdur(self):
+        gorev, self._gorev = self._gorev, None
+        if gorev is None:
+            return
+        gorev.cancel()
+        try:
+            await gorev
+        except asyncio.CancelledError:
+            pass
+        self._son_seq = None
+
+    def metrikler(self) -> dict:
+        return {
+            "running": self._gorev is not None,
+            "subscribers": self._abone_sayisi,
+            "cities": len(self._aboneler),
+            "max_subscribers": self.en_fazla_abone,
+            "last_seq": self._son_seq,
+            **self._sayaclar
+        }
+
+
+canli_akis = CanliAkis(
+    kontrol_araligi=config.STREAM_POLL_INTERVAL,
+    kuyruk_boyutu=config.STREAM_QUEUE_SIZE,
+    kalp_atisi=config.STREAM_HEARTBEAT_SECONDS,
+    en_fazla_abone=config.STREAM_MAX_SUBSCRIBERS,
+    saklanan_degisiklik=config.STREAM_CHANGE_RETENTION
+)
@@ -0,0 +1,288 @@
+"""
+Feedback'leri istekten bağımsız sınıflandıran arka plan kuyruğu
+
+CLASSIFIER_ASYNC açıkken submit mesajı "Beklemede" kategorisiyle kaydedip hemen
+döner. Kuyruğun kaynağı veritabanının kendisidir: bekleyen satırlar kısmi bir
+indeksle (category = 'Beklemede') bulunur, arka plan thread'i bunları id
+sırasıyla küçük partiler halinde sınıflandırıp günceller. Uygulama yeniden
+başlarsa veya satırı başka bir worker process kaydettiyse, periyodik kontrol
+kalan satırları yakalar; hiçbir feedback beklemede kalmaz.
+
+CLASSIFIER_ASYNC kapatılıp uygulama yeniden başlatılırsa, önceki çalışmadan
+kalan bekleyen satırlar için kuyruk yine başlatılır ve bunlar bitince durur.
+
+Güncelleme yalnızca satır hâlâ beklemedeyse yapılır, bu yüzden birden fazla
+worker aynı satırı işlese de sonuç değişmez.
+"""
+from collections import deque
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from sqlalchemy import bindparam, func, select, update
+
+from . import config, models
+from .classifier_pool import siniflandirici_surumu, toplu_analiz_et
+from .database import SessionLocal
+from .feedback_service import referanslar
+
+
+BEKLEMEDE_KATEGORISI = "Beklemede"
+
+# Bir uyanmada işlenecek en fazla parti; sürekli yeni satır gelse de thread periyodik
+# kontrole döner
+_EN_FAZLA_PARTI = 1000
+
+_feedback = models.CityFeedback.__table__
+
+# Satır sınıflandırılmadan önce başka bir yol (ör. reclassify scripti) güncellediyse dokunma
+_KATEGORI_GUNCELLE = (
+    update(_feedback)
+    .where(_feedback.c.id == bindparam("_id"))
+    .where(_feedback.c.category == BEKLEMEDE_KATEGORISI)
+    .values(category=bindparam("_kategori"), keyword_version=bindparam("_surum"))
+)
+
+
+def _kategorileri_hazirla(db, kategoriler: set):
+    """
+    Haritada olmayan kategorileri oluştur (foreign key için)
+
+    Commit'ten sonra referanslar.commit_edildi çağrılmalıdır.
+    """
+    for kategori in kategoriler:
+        referanslar.kategori_hazirla(db, kategori)
+
+
+class SiniflandirmaKuyrugu:
+    """Bekleyen feedback'leri mikro partilerle sınıflandıran arka plan thread'i"""
+
+    def __init__(self, parti_boyutu: int, kontrol_araligi: float):
+        self.parti_boyutu = max(1, parti_boyutu)
+        self.kontrol_araligi = max(0.05, kontrol_araligi)
+
+        self._uyandir = threading.Event()
+        self._dur = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Sadece kalan satırları işleyip duran kuyruk (asenkron mod kapalıyken)
+        self._bosalinca_dur = False
+        self._kilit = threading.Lock()
+        # Bu process'te kuyruğa giren id -> giriş zamanı (ekleme sırası = yaş sırası)
+        self._giris_zamanlari: Dict[int, float] = {}
+        self._gecikmeler = deque(maxlen=1000)
+        self._sayaclar = {
+            "enqueued": 0,
+            "classified": 0,
+            "batches": 0,
+            "recovered": 0,
+            "errors": 0
+        }
+
+    @property
+    def aktif(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def baslat(self, bosalinca_dur: bool = False):
+        """
+        Bekleme kategorisini hazırla ve worker thread'ini başlat
+
+        bosalinca_dur: Bekleyen satır kalmayınca thread'i bitir (yeni satır beklenmiyor)
+        """
+        if self.aktif:
+            return
+        self._bosalinca_dur = bosalinca_dur
+        db = SessionLocal()
+        try:
+            _kategorileri_hazirla(db, {BEKLEMEDE_KATEGORISI})
+            db.commit()
+            referanslar.commit_edildi(db)
+        finally:
+            db.close()
+
+        self._dur.clear()
+        self._thread = threading.Thread(
+            target=self._calis, name="classification-queue", daemon=True
+        )
+        self._thread.start()
+        # Önceki çalışmadan kalan satırlar hemen işlensin
+        self._uyandir.set()
+
+    def durdur(self):
+        self._dur.set()
+        self._uyandir.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def bildir(self, feedback_id: int):
+        """Submit commit edildikten sonra çağrılır - worker'ı uyandırır"""
+        with self._kilit:
+            self._giris_zamanlari[feedback_id] = time.monotonic()
+            self._sayaclar["enqueued"] += 1
+        self._uyandir.set()
+
+    def _calis(self):
+        while not self._dur.is_set():
+            self._uyandir.wait(self.kontrol_araligi)
+            self._uyandir.clear()
+            try:
+                self.bekleyenleri_isle()
+                if self._bosalinca_dur and not self.bekleyen_var():
+                    print("✅ Önceki çalışmadan kalan bekleyen feedback'ler sınıflandırıldı")
+                    return
+            except Exception as e:
+                with self._kilit:
+                    self._sayaclar["errors"] += 1
+                print(f"❌ Arka plan sınıflandırma hatası: {str(e)}")
+
+    def bekleyen_var(self) -> bool:
+        """Veritabanında sınıflandırılmayı bekleyen satır var mı (kısmi indeksten)"""
+        db = SessionLocal()
+        try:
+            return db.execute(
+                select(_feedback.c.id).where(_feedback.c.category == BEKLEMEDE_KATEGORISI).limit(1)
+            ).first() is not None
+        finally:
+            db.close()
+
+    def bekleyenleri_isle(self) -> int:
+        """
+        Kuyruk sonuna kadar parti parti işle
+
+        İmleç her partide ilerler; hâlâ beklemede kalan satırlar (ör. sınıflandırıcı
+        "Beklemede" döndürdüyse) bir sonraki uyanmada yeniden denenir.
+
+        Returns:
+            int: İşlenen toplam satır sayısı
+        """
+        toplam = 0
+        son_id = 0
+        for _ in range(_EN_FAZLA_PARTI):
+            if self._dur.is_set():
+                break
+            adet, son_id = self.parti_isle(son_id)
+            toplam += adet
+            if adet < self.parti_boyutu:
+                break
+        return toplam
+
+    def parti_isle(self, son_id: int = 0) -> Tuple[int, int]:
+        """
+        son_id'den sonraki en eski bekleyen satırlardan bir parti sınıflandır ve güncelle
+
+        Returns:
+            tuple: (işlenen satır sayısı, partideki son id - sonraki partinin imleci)
+        """
+        db = SessionLocal()
+        try:
+            satirlar = db.execute(
+                select(_feedback.c.id, _feedback.c.message)
+                .where(_feedback.c.category == BEKLEMEDE_KATEGORISI, _feedback.c.id > son_id)
+                .order_by(_feedback.c.id)
+                .limit(self.parti_boyutu)
+            ).all()
+
+            if not satirlar:
+                if son_id == 0:
+                    # Bekleyen yoksa başka yoldan sınıflandırılmış kayıtların izini bırak
+                    with self._kilit:
+                        self._giris_zamanlari.clear()
+                return 0, son_id
+
+            analizler = toplu_analiz_et([satir.message for satir in satirlar])
+            guncellemeler = [
+                {
+                    "_id": satir.id,
+                    "_kategori": analiz['kategori'],
+                    "_surum": siniflandirici_surumu(analiz)
+                }
+                for satir, analiz in zip(satirlar, analizler)
+            ]
+
+            _kategorileri_hazirla(db, {g["_kategori"] for g in guncellemeler})
+            db.execute(_KATEGORI_GUNCELLE, guncellemeler)
+            db.commit()
+            referanslar.commit_edildi(db)
+        except Exception:
+            db.rollback()
+            db.info.pop("yeni_kategoriler", None)
+            raise
+        finally:
+            db.close()
+
+        simdi = time.monotonic()
+        with self._kilit:
+            if son_id == 0:
+                # En eski bekleyen satırdan küçük id'ler artık beklemede değil
+                # (başka bir worker veya reclassify scripti sınıflandırdı)
+                ilk_id = satirlar[0].id
+                for eski in [i for i in self._giris_zamanlari if i < ilk_id]:
+                    del self._giris_zamanlari[eski]
+            for satir in satirlar:
+                giris = self._giris_zamanlari.pop(satir.id, None)
+                if giris is None:
+                    self._sayaclar["recovered"] += 1
+                else:
+                    self._gecikmeler.append((simdi - giris) * 1000)
+            self._sayaclar["classified"] += len(satirlar)
+            self._sayaclar["batches"] += 1
+        return len(satirlar), satirlar[-1].id
+
+    def metrikler(self) -> dict:
+        """Bekleyen satır sayısı (veritabanından) ve sınıflandırma gecikmesi"""
+        db = SessionLocal()
+        try:
+            bekleyen = db.execute(
+                select(func.count()).select_from(_feedback)
+                .where(_feedback.c.category == BEKLEMEDE_KATEGORISI)
+            ).scalar()
+        finally:
+            db.close()
+
+        with self._kilit:
+            sayaclar = dict(self._sayaclar)
+            gecikmeler = sorted(self._gecikmeler)
+            en_eski = next(iter(self._giris_zamanlari.values()), None)
+
+        def yuzdelik(oran: float) -> float:
+            if not gecikmeler:
+                return 0
+            return round(gecikmeler[min(len(gecikmeler) - 1, int(len(gecikmeler) * oran))], 2)
+
+        return {
+            "enabled": config.CLASSIFIER_ASYNC,
+            "running": self.aktif,
+            "batch_size": self.parti_boyutu,
+            "backlog": bekleyen,
+            "oldest_pending_age_ms": round((time.monotonic() - en_eski) * 1000, 2) if en_eski else 0,
+            "lag_ms": {
+                "samples": len(gecikmeler),
+                "avg": round(sum(gecikmeler) / len(gecikmeler), 2) if gecikmeler else 0,
+                "p50": yuzdelik(0.50),
+                "p99": yuzdelik(0.99)
+            },
+            **sayaclar
+        }
+
+
+kuyruk = SiniflandirmaKuyrugu(
+    parti_boyutu=config.CLASSIFIER_ASYNC_BATCH_SIZE,
+    kontrol_araligi=config.CLASSIFIER_ASYNC_POLL_INTERVAL
+)
+
+
+def kuyrugu_baslat():
+    """
+    Uygulama açılışında çağrılır
+
+    CLASSIFIER_ASYNC kapalıysa kuyruk yalnızca önceki çalışmadan kalan bekleyen
+    satırlar varsa başlar ve onlar sınıflandırılınca durur.
+    """
+    if config.CLASSIFIER_ASYNC:
+        kuyruk.baslat()
+    elif kuyruk.bekleyen_var():
+        kuyruk.baslat(bosalinca_dur=True)
+
+
+def kuyrugu_durdur():
+    kuyruk.durdur()
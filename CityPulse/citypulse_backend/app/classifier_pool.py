@@ -0,0 +1,264 @@
+"""
+CPU yoğun sınıflandırmayı istek thread'lerinden ayıran process havuzu
+
+CLASSIFIER_MODE=process olduğunda sınıflandırma, anahtar kelime indeksini önceden
+yüklemiş worker process'lerde çalışır; böylece regex/eşleştirme işi AnyIO thread
+havuzundaki diğer isteklerle GIL için yarışmaz. Havuz doluysa, zaman aşımında
+veya havuz bozulduğunda mesaj istek thread'inde (inline) sınıflandırılır.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import threading
+import time
+
+from . import config, linear_classifier
+from .feedback_classifier import (
+    KeywordIndex,
+    aktif_indeks,
+    indeksi_yenile,
+    kategori_detayli_analiz,
+    kategori_ozeti,
+    kategori_toplu_analiz,
+    onbellek,
+    onbellekli_analiz,
+)
+
+
+def _isci_baslat():
+    """Worker process başlangıcı - anahtar kelime indeksini belleğe yükle"""
+    kategori_detayli_analiz("isinma")
+
+
+class SurumUyusmazligi(RuntimeError):
+    """Worker'ın yükleyebildiği anahtar kelime sürümü istenen sürüm değil"""
+
+
+def _surumlu_indeks(surum: str) -> KeywordIndex:
+    """
+    Worker'daki indeks istenen sürümde değilse dosyadan yeniden yükle
+
+    Dosya bu arada tekrar değişmiş olabilir; yüklenen sürüm istenen sürüm
+    değilse hata verilir ve görev ana process'te (inline) doğru indeksle
+    çalışır. Sonuç hiçbir zaman başka bir sürümle etiketlenmez.
+    """
+    indeks = aktif_indeks()
+    if indeks.surum != surum:
+        indeksi_yenile(zorla=True)
+        indeks = aktif_indeks()
+        if indeks.surum != surum:
+            raise SurumUyusmazligi(f"istenen {surum}, dosyadaki {indeks.surum}")
+    return indeks
+
+
+def _havuz_ozeti(arguman: Tuple[str, str]) -> dict:
+    temiz_mesaj, surum = arguman
+    return kategori_ozeti(temiz_mesaj, _surumlu_indeks(surum))
+
+
+def _havuz_toplu_analizi(arguman: Tuple[List[str], str]) -> List[dict]:
+    mesajlar, surum = arguman
+    return kategori_toplu_analiz(mesajlar, _surumlu_indeks(surum))
+
+
+class ClassifierPool:
+    """Sınırlı kuyruklu, sıcak tutulan sınıflandırma process havuzu"""
+    
+    def __init__(self, isci_sayisi: int, kuyruk_limiti: int, zaman_asimi: float):
+        self.isci_sayisi = max(1, isci_sayisi)
+        self.kuyruk_limiti = max(1, kuyruk_limiti)
+        self.zaman_asimi = zaman_asimi
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._kilit = threading.Lock()
+        self._bekleyen = 0
+        self._gecikmeler = deque(maxlen=1000)
+        self._sayaclar = {
+            "submitted": 0,
+            "completed": 0,
+            "inline_fallbacks": 0,
+            "errors": 0
+        }
+    
+    @property
+    def aktif(self) -> bool:
+        return self._executor is not None
+    
+    def baslat(self):
+        """Havuzu oluştur ve her worker'ı ısıt"""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.isci_sayisi,
+            initializer=_isci_baslat
+        )
+        isinma = [
+            self._executor.submit(kategori_detayli_analiz, "isinma")
+            for _ in range(self.isci_sayisi)
+        ]
+        for gorev in isinma:
+            gorev.result()
+    
+    def kapat(self):
+        """Havuzu kapat"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+    
+    def calistir(self, fonksiyon, arguman):
+        """
+        Fonksiyonu havuzda çalıştır, mümkün değilse inline çalıştır
+        
+        Havuz kapalıysa veya bekleyen görev sayısı kuyruk limitine ulaştıysa
+        görev havuza hiç gönderilmez.
+        """
+        if self._executor is None:
+            return fonksiyon(arguman)
+        
+        with self._kilit:
+            if self._bekleyen >= self.kuyruk_limiti:
+                self._sayaclar["inline_fallbacks"] += 1
+                havuza_gonder = False
+            else:
+                self._bekleyen += 1
+                self._sayaclar["submitted"] += 1
+                havuza_gonder = True
+        
+        if not havuza_gonder:
+            return fonksiyon(arguman)
+        
+        baslangic = time.perf_counter()
+        try:
+            gorev = self._executor.submit(fonksiyon, arguman)
+        except Exception:
+            # Bozuk veya kapanmış havuz - görev hiç kuyruğa girmedi
+            with self._kilit:
+                self._bekleyen -= 1
+                self._sayaclar["errors"] += 1
+                self._sayaclar["inline_fallbacks"] += 1
+            return fonksiyon(arguman)
+        # Sayaç görev gerçekten bitince (veya iptal edilince) düşer; zaman aşımına
+        # uğrayıp hâlâ çalışan görevler de kuyruk limitine sayılır
+        gorev.add_done_callback(self._gorev_bitti)
+        
+        try:
+            sonuc = gorev.result(timeout=self.zaman_asimi)
+        except Exception:
+            # Zaman aşımı veya bozuk havuz - henüz başlamadıysa iptal et, inline sınıflandır
+            gorev.cancel()
+            with self._kilit:
+                self._sayaclar["errors"] += 1
+                self._sayaclar["inline_fallbacks"] += 1
+            return fonksiyon(arguman)
+        
+        gecikme = time.perf_counter() - baslangic
+        with self._kilit:
+            self._sayaclar["completed"] += 1
+            self._gecikmeler.append(gecikme)
+        return sonuc
+    
+    def _gorev_bitti(self, gorev):
+        with self._kilit:
+            self._bekleyen -= 1
+    
+    def metrikler(self) -> dict:
+        """Kuyruk derinliği, sayaçlar ve görev gecikmesi (ms) metrikleri"""
+        with self._kilit:
+            gecikmeler = sorted(self._gecikmeler)
+            bekleyen = self._bekleyen
+            sayaclar = dict(self._sayaclar)
+        
+        def yuzdelik(oran: float) -> float:
+            if not gecikmeler:
+                return 0
+            indeks = min(len(gecikmeler) - 1, int(len(gecikmeler) * oran))
+            return round(gecikmeler[indeks] * 1000, 3)
+        
+        return {
+            "mode": "process" if self.aktif else "inline",
+            "cache": onbellek.metrikler(),
+            "workers": self.isci_sayisi,
+            "max_queue": self.kuyruk_limiti,
+            "in_flight": bekleyen,
+            "queue_depth": max(0, bekleyen - self.isci_sayisi),
+            **sayaclar,
+            "latency_ms": {
+                "samples": len(gecikmeler),
+                "avg": round(sum(gecikmeler) / len(gecikmeler) * 1000, 3) if gecikmeler else 0,
+                "p50": yuzdelik(0.50),
+                "p99": yuzdelik(0.99)
+            }
+        }
+
+
+# Uygulama genelinde tek havuz - CLASSIFIER_MODE=process ise açılışta başlatılır
+havuz = ClassifierPool(
+    isci_sayisi=config.CLASSIFIER_POOL_WORKERS,
+    kuyruk_limiti=config.CLASSIFIER_POOL_MAX_QUEUE,
+    zaman_asimi=config.CLASSIFIER_POOL_TIMEOUT
+)
+
+
+def havuzu_baslat():
+    """Ayar process modundaysa havuzu başlat"""
+    if config.CLASSIFIER_MODE == "process":
+        havuz.baslat()
+
+
+def havuzu_kapat():
+    havuz.kapat()
+
+
+def analiz_et(mesaj: str) -> Tuple[dict, str]:
+    """
+    Mesajı aktif motor ve moda göre detaylı analiz et
+    
+    CLASSIFIER_ENGINE=linear ise önce doğrusal model denenir, emin değilse kural
+    motoruna düşülür. Kural motorunda önbellek ana process'te tutulur; sadece
+    ıskalamalar havuza gönderilir. Worker'lar, ana process'in kullandığı anahtar
+    kelime sürümüyle çalışır.
+    
+    Returns:
+        tuple: (kategori_detayli_analiz sonucu, sınıflandırıcı sürümü)
+    """
+    tahmin = linear_classifier.guvenli_tahminler([mesaj])[0]
+    if tahmin is not None:
+        return linear_classifier.analiz_sonucu(mesaj, tahmin), tahmin[3]
+    
+    indeks = aktif_indeks()
+    analiz = onbellekli_analiz(
+        mesaj,
+        lambda temiz_mesaj, ind: havuz.calistir(_havuz_ozeti, (temiz_mesaj, ind.surum)),
+        indeks
+    )
+    return analiz, indeks.surum
+
+
+def toplu_analiz_et(mesajlar: List[str]) -> List[dict]:
+    """
+    Mesaj listesini aktif motor ve moda göre analiz et
+    
+    Doğrusal motor tüm listeyi tek matris çarpımıyla skorlar; emin olmadığı
+    mesajlar toplu olarak kural motoruna gönderilir. Kural motoru sonuçlarının
+    analiz_detayi'sine kullanılan anahtar kelime sürümü eklenir (bkz.
+    siniflandirici_surumu).
+    """
+    tahminler = linear_classifier.guvenli_tahminler(mesajlar)
+    dusenler = [mesaj for mesaj, tahmin in zip(mesajlar, tahminler) if tahmin is None]
+    
+    # Havuz ve inline yol tam olarak bu sürümle çalışır (_surumlu_indeks)
+    kural_surumu = aktif_indeks().surum
+    kural_sonuclari = iter([
+        {**analiz, 'analiz_detayi': {**analiz['analiz_detayi'], 'anahtar_kelime_surumu': kural_surumu}}
+        for analiz in (havuz.calistir(_havuz_toplu_analizi, (dusenler, kural_surumu)) if dusenler else [])
+    ])
+    return [
+        next(kural_sonuclari) if tahmin is None else linear_classifier.analiz_sonucu(mesaj, tahmin)
+        for mesaj, tahmin in zip(mesajlar, tahminler)
+    ]
+
+
+def siniflandirici_surumu(analiz: dict) -> Optional[str]:
+    """toplu_analiz_et sonucunu üreten sınıflandırıcının sürümü (model veya anahtar kelime)"""
+    detay = analiz['analiz_detayi']
+    return detay.get('model_surumu', detay.get('anahtar_kelime_surumu'))
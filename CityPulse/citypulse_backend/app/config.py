@@ -0,0 +1,144 @@
+"""
+Uygulama ayarları - ortam değişkenlerinden okunur
+"""
+import os
+
+
+def _env_int(ad: str, varsayilan: int) -> int:
+    """Tam sayı ortam değişkeni oku, geçersizse varsayılanı kullan"""
+    try:
+        return int(os.getenv(ad, varsayilan))
+    except ValueError:
+        return varsayilan
+
+
+def _env_float(ad: str, varsayilan: float) -> float:
+    """Ondalıklı ortam değişkeni oku, geçersizse varsayılanı kullan"""
+    try:
+        return float(os.getenv(ad, varsayilan))
+    except ValueError:
+        return varsayilan
+
+
+def _env_bool(ad: str, varsayilan: bool) -> bool:
+    """Evet/hayır ortam değişkeni oku (1, true, yes, evet)"""
+    deger = os.getenv(ad)
+    if deger is None:
+        return varsayilan
+    return deger.strip().lower() in ("1", "true", "yes", "evet", "on")
+
+
+# ==================== SINIFLANDIRICI ====================
+# rules: anahtar kelime kuralları | linear: hash'lenmiş kelime torbası modeli (numpy/scipy gerekir)
+CLASSIFIER_ENGINE = os.getenv("CLASSIFIER_ENGINE", "rules").lower()
+
+# Doğrusal model dosyası (train_linear_classifier.py ile üretilir)
+CLASSIFIER_LINEAR_MODEL_PATH = os.getenv(
+    "CLASSIFIER_LINEAR_MODEL_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "linear_model.npz")
+)
+
+# Doğrusal model güveni (0-100) bu değerin altındaysa kural motoruna düşülür
+CLASSIFIER_LINEAR_MIN_CONFIDENCE = _env_float("CLASSIFIER_LINEAR_MIN_CONFIDENCE", 60.0)
+
+# inline: istek thread'inde çalışır | process: ProcessPoolExecutor'a gönderilir
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "inline").lower()
+
+# Process havuzundaki worker sayısı
+CLASSIFIER_POOL_WORKERS = _env_int("CLASSIFIER_POOL_WORKERS", 2)
+
+# Havuzda aynı anda bekleyebilecek en fazla görev - dolunca inline sınıflandırmaya düşülür
+CLASSIFIER_POOL_MAX_QUEUE = _env_int("CLASSIFIER_POOL_MAX_QUEUE", 64)
+
+# Havuzdan sonuç beklenecek en uzun süre (saniye) - aşılırsa inline sınıflandırılır
+CLASSIFIER_POOL_TIMEOUT = _env_float("CLASSIFIER_POOL_TIMEOUT", 2.0)
+
+# Tekrarlanan mesajlar için LRU sonuç önbelleği boyutu (0: kapalı)
+CLASSIFIER_CACHE_SIZE = _env_int("CLASSIFIER_CACHE_SIZE", 10000)
+
+# Kategori anahtar kelimelerinin okunduğu JSON dosyası
+CLASSIFIER_KEYWORDS_PATH = os.getenv(
+    "CLASSIFIER_KEYWORDS_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "category_keywords.json")
+)
+
+# Anahtar kelime dosyasının değişiklik kontrol aralığı (saniye, 0: kapalı)
+CLASSIFIER_KEYWORDS_RELOAD_INTERVAL = _env_float("CLASSIFIER_KEYWORDS_RELOAD_INTERVAL", 5.0)
+
+# Açıksa submit mesajı "Beklemede" kategorisiyle kaydedip hemen döner,
+# kategori arka plan worker'ı tarafından belirlenir
+CLASSIFIER_ASYNC = _env_bool("CLASSIFIER_ASYNC", False)
+
+# Arka plan worker'ının tek seferde sınıflandırdığı en fazla satır
+CLASSIFIER_ASYNC_BATCH_SIZE = _env_int("CLASSIFIER_ASYNC_BATCH_SIZE", 200)
+
+# Bildirim gelmese de bekleyen satırların kontrol edildiği aralık (saniye)
+# Yeniden başlatma veya başka worker'lardan kalan satırları yakalar
+CLASSIFIER_ASYNC_POLL_INTERVAL = _env_float("CLASSIFIER_ASYNC_POLL_INTERVAL", 1.0)
+
+# ==================== GRUP COMMIT ====================
+# Açıksa submit satırları tek yazıcı thread'de toplanıp grup halinde commit edilir
+FEEDBACK_GROUP_COMMIT = _env_bool("FEEDBACK_GROUP_COMMIT", False)
+
+# Tek commit'te yazılan en fazla satır
+FEEDBACK_GROUP_COMMIT_MAX_ROWS = _env_int("FEEDBACK_GROUP_COMMIT_MAX_ROWS", 200)
+
+# Grubun ilk satırından sonra yeni satırlar için beklenen en fazla süre (ms)
+FEEDBACK_GROUP_COMMIT_MAX_WAIT_MS = _env_float("FEEDBACK_GROUP_COMMIT_MAX_WAIT_MS", 5.0)
+
+# ==================== IDEMPOTENCY ====================
+# Submit'te Idempotency-Key ile saklanan yanıtın geçerlilik süresi (saniye)
+IDEMPOTENCY_TTL_SECONDS = _env_float("IDEMPOTENCY_TTL_SECONDS", 86400.0)
+
+# Process içinde bellekte tutulan en fazla tamamlanmış anahtar
+IDEMPOTENCY_CACHE_SIZE = _env_int("IDEMPOTENCY_CACHE_SIZE", 10000)
+
+# Süresi dolan anahtarların silinme aralığı (saniye)
+IDEMPOTENCY_CLEANUP_INTERVAL = _env_float("IDEMPOTENCY_CLEANUP_INTERVAL", 300.0)
+
+# ==================== CANLI AKIŞ ====================
+# city_changes tablosunun yeni kayıtlar için kontrol aralığı (saniye)
+STREAM_POLL_INTERVAL = _env_float("STREAM_POLL_INTERVAL", 0.5)
+
+# Abone başına bekleyen en fazla olay - dolunca en eskisi düşer
+STREAM_QUEUE_SIZE = _env_int("STREAM_QUEUE_SIZE", 100)
+
+# Olay yokken bağlantıyı canlı tutan heartbeat aralığı (saniye)
+STREAM_HEARTBEAT_SECONDS = _env_float("STREAM_HEARTBEAT_SECONDS", 15.0)
+
+# Worker başına en fazla eşzamanlı abone - aşılınca 503
+STREAM_MAX_SUBSCRIBERS = _env_int("STREAM_MAX_SUBSCRIBERS", 10000)
+
+# city_changes'te tutulan son değişiklik sayısı (Last-Event-ID ile tekrar için)
+STREAM_CHANGE_RETENTION = _env_int("STREAM_CHANGE_RETENTION", 100000)
+
+# ==================== LİDERLİK TABLOSU ====================
+# Veri değişmese de liderlik tablosunun yeniden hesaplanacağı süre (saniye, 0: önbellek kapalı)
+LEADERBOARD_CACHE_TTL = _env_float("LEADERBOARD_CACHE_TTL", 300.0)
+
+# Veri değişince veya TTL dolunca, biri yeniden hesaplarken eski sonucun sunulabileceği ek süre (saniye)
+LEADERBOARD_STALE_SECONDS = _env_float("LEADERBOARD_STALE_SECONDS", 60.0)
+
+# ==================== YAKIN-KOPYA TESPİTİ ====================
+# off: kapalı | flag: kaydet ve duplicate_of ile işaretle | collapse: kaydetmeden orijinali döndür
+DUPLICATE_MODE = os.getenv("DUPLICATE_MODE", "flag").lower()
+
+# İki mesajın kopya sayılması için gereken karakter 5-gram Jaccard benzerliği
+DUPLICATE_THRESHOLD = _env_float("DUPLICATE_THRESHOLD", 0.8)
+
+# Şehir başına indekste tutulan en fazla feedback
+DUPLICATE_INDEX_SIZE = _env_int("DUPLICATE_INDEX_SIZE", 2000)
+
+# Bu süreden (saat) eski feedback'ler kopya karşılaştırmasına girmez
+DUPLICATE_WINDOW_HOURS = _env_float("DUPLICATE_WINDOW_HOURS", 72.0)
+
+# ==================== TOPLU YÜKLEME ====================
+# NDJSON toplu yüklemede tek transaction'da sınıflandırılıp yazılan satır sayısı
+BULK_INGEST_CHUNK_SIZE = _env_int("BULK_INGEST_CHUNK_SIZE", 500)
+
+# Tek NDJSON satırının en fazla boyutu (bayt) - aşan satır hata olarak raporlanır
+BULK_INGEST_MAX_LINE_BYTES = _env_int("BULK_INGEST_MAX_LINE_BYTES", 16384)
+
+# ==================== YÖNETİM ====================
+# Yönetim endpoint'leri için token - boşsa yönetim endpoint'leri kapalıdır (503)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
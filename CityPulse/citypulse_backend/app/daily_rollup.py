@@ -0,0 +1,270 @@
+"""
+Şehir x gün özet tablosu (city_daily_rollup)
+
+İstatistik endpoint'leri ham metrik satırlarını her istekte yeniden toplamak
+yerine şehir başına günlük özetlerden okur. Her kaynak tablo için satır sayısı
+ve her metrik için toplam, sayı (NULL olmayan), en küçük ve en büyük değer
+tutulur; pencere ortalaması toplam / sayı'dır. Feedback için sayılan (yakın-kopya
+olmayan, sınıflandırılmış) toplam ve çevre kategorisi sayıları tutulur.
+
+Özetler trigger'larla güncellenir: kaynak satır eklenince, değişince veya
+silinince yalnızca o satırın (şehir, gün) özeti kaynaktan yeniden hesaplanır
+(birincil anahtar üzerinden birkaç satırlık okuma). Feedback özeti
+feedback_category_counts sayaçlarından hesaplanır. Trigger'lar dışında yazılmış
+veya geçmişe dönük düzeltilmiş veriler için belirli bir tarih aralığı
+yeniden_olustur ile baştan hesaplanabilir:
+
+    python rebuild_daily_rollup.py --baslangic 2025-01-01 --bitis 2025-12-31
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Çevre mesaj oranına giren feedback kategorileri (değişirse özetler yeniden oluşturulmalı)
+CEVRE_KATEGORILERI = ['Çevre', 'Yeşil', 'Sürdürülebilirlik', 'Enerji']
+
+# Kaynak tablo -> (özetteki ön ek, metrik kolonları); tüm kaynaklarda gün kolonu "date"
+KAYNAKLAR: Dict[str, Tuple[str, List[str]]] = {
+    "city_stats": ("stats", ["signal_strength", "traffic_gb"]),
+    "paycell_stats": ("paycell", ["transactions_count", "total_amount"]),
+    "city_weather": ("weather", ["temp_c", "air_quality"]),
+    "city_scores": ("scores", ["eco_score", "alerts_count"]),
+}
+
+_ISTATISTIKLER = ("sum", "count", "min", "max")
+
+
+def _kolonlar(tablo: str) -> List[str]:
+    """Kaynağın özetteki kolonları"""
+    onek, metrikler = KAYNAKLAR[tablo]
+    return [f"{onek}_rows"] + [f"{m}_{i}" for m in metrikler for i in _ISTATISTIKLER]
+
+
+def _ifadeler(tablo: str) -> str:
+    """Kaynağın özet kolonlarını hesaplayan SELECT ifadeleri (_kolonlar sırasıyla)"""
+    _, metrikler = KAYNAKLAR[tablo]
+    return ", ".join(["COUNT(*)"] + [f"{i.upper()}({m})" for m in metrikler for i in _ISTATISTIKLER])
+
+
+_FEEDBACK_KOLONLARI = ["feedback_count", "eco_feedback_count"]
+_CEVRE = ", ".join(f"'{k}'" for k in CEVRE_KATEGORILERI)
+_FEEDBACK_IFADELERI = (
+    f"COALESCE(SUM(count), 0), COALESCE(SUM(CASE WHEN category IN ({_CEVRE}) THEN count END), 0)"
+)
+
+
+def _kaynak_tanimlari() -> List[Tuple[str, str, List[str], str]]:
+    """(tablo, gün kolonu, özet kolonları, ifadeler) - metrik tabloları ve feedback sayaçları"""
+    return [
+        (tablo, "date", _kolonlar(tablo), _ifadeler(tablo)) for tablo in KAYNAKLAR
+    ] + [("feedback_category_counts", "day", _FEEDBACK_KOLONLARI, _FEEDBACK_IFADELERI)]
+
+
+def tablo_ifadesi() -> str:
+    kolonlar = []
+    for _, _, ozet, _ in _kaynak_tanimlari():
+        for kolon in ozet:
+            tur = "INTEGER NOT NULL DEFAULT 0" if kolon.endswith(("_rows", "_count")) else "REAL"
+            kolonlar.append(f"{kolon} {tur}")
+    return (
+        "CREATE TABLE IF NOT EXISTS city_daily_rollup (\n"
+        "            city_id VARCHAR NOT NULL,\n"
+        "            day DATE NOT NULL,\n"
+        + "".join(f"            {k},\n" for k in kolonlar)
+        + "            PRIMARY KEY (city_id, day)\n"
+        "        )"
+    )
+
+
+def _gunu_yenile(tablo: str, gun_kolonu: str, ozet: List[str], ifadeler: str, satir: str) -> str:
+    """Trigger gövdesi: satırın (şehir, gün) özetini kaynaktan yeniden hesapla"""
+    return f"""INSERT INTO city_daily_rollup(city_id, day) VALUES ({satir}.city_id, {satir}.{gun_kolonu})
+                ON CONFLICT(city_id, day) DO NOTHING;
+            UPDATE city_daily_rollup SET ({", ".join(ozet)}) = (
+                SELECT {ifadeler} FROM {tablo}
+                WHERE city_id = {satir}.city_id AND {gun_kolonu} = {satir}.{gun_kolonu}
+            ) WHERE city_id = {satir}.city_id AND day = {satir}.{gun_kolonu};"""
+
+
+def tetikleyici_ifadeleri() -> List[str]:
+    """Kaynak tablolar değişince özetleri güncelleyen trigger'lar"""
+    ifadeler = []
+    for tablo, gun, ozet, hesap in _kaynak_tanimlari():
+        for ek, olay, satirlar in (
+            ("ai", "INSERT", ["NEW"]),
+            ("ad", "DELETE", ["OLD"]),
+            # Şehir veya gün değiştiyse eski gün de yeniden hesaplanır
+            ("au", "UPDATE", ["OLD", "NEW"]),
+        ):
+            govde = "\n            ".join(_gunu_yenile(tablo, gun, ozet, hesap, s) for s in satirlar)
+            ifadeler.append(
+                f"""CREATE TRIGGER IF NOT EXISTS {tablo}_rollup_{ek} AFTER {olay} ON {tablo} BEGIN
+            {govde}
+        END"""
+            )
+    return ifadeler
+
+
+def yeniden_olustur_ifadeleri(aralikli: bool) -> List[str]:
+    """
+    Özetleri kaynaklardan baştan hesaplayan ifadeler
+
+    aralikli ise sadece :baslangic ve :bitis (dahil) arasındaki günler işlenir.
+    """
+    ifadeler = []
+    for tablo, gun, ozet, hesap in _kaynak_tanimlari():
+        aralik = f"{gun} BETWEEN :baslangic AND :bitis" if aralikli else "1"
+        ifadeler.append(
+            f"""INSERT INTO city_daily_rollup(city_id, day)
+            SELECT DISTINCT city_id, {gun} FROM {tablo} WHERE {aralik}
+            ON CONFLICT(city_id, day) DO NOTHING"""
+        )
+    for tablo, gun, ozet, hesap in _kaynak_tanimlari():
+        aralik = "day BETWEEN :baslangic AND :bitis" if aralikli else "1"
+        ifadeler.append(
+            f"""UPDATE city_daily_rollup SET ({", ".join(ozet)}) = (
+                SELECT {hesap} FROM {tablo} AS k
+                WHERE k.city_id = city_daily_rollup.city_id AND k.{gun} = city_daily_rollup.day
+            ) WHERE {aralik}"""
+        )
+    return ifadeler
+
+
+def yeniden_olustur(db: Session, baslangic: date, bitis: date) -> int:
+    """
+    Tarih aralığının (dahil) özetlerini kaynaklardan yeniden hesapla ve commit et
+
+    Returns:
+        int: Aralıktaki özet satırı sayısı
+    """
+    parametreler = {"baslangic": str(baslangic), "bitis": str(bitis)}
+    try:
+        for ifade in yeniden_olustur_ifadeleri(aralikli=True):
+            db.execute(text(ifade), parametreler)
+        sayi = db.execute(
+            text("SELECT COUNT(*) FROM city_daily_rollup WHERE day BETWEEN :baslangic AND :bitis"),
+            parametreler
+        ).scalar()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return sayi
+
+
+# ==================== OKUMA ====================
+# Tüm zamanlar penceresinin başlangıcı
+_EN_ESKI = "0000-01-01"
+
+
+def _pencere_ifadeleri() -> Tuple[List[str], str]:
+    """Metrik kolonları [:baslangic, :bitis], feedback kolonları :feedback_baslangic sonrası"""
+    adlar, ifadeler = [], []
+
+    def metrik(ifade: str) -> str:
+        return f"CASE WHEN day BETWEEN :baslangic AND :bitis THEN {ifade} END"
+
+    for onek, metrikler in KAYNAKLAR.values():
+        adlar.append(f"{onek}_rows")
+        ifadeler.append(f"COALESCE(SUM({metrik(f'{onek}_rows')}), 0)")
+        for m in metrikler:
+            adlar += [f"{m}_sum", f"{m}_count", f"{m}_min", f"{m}_max"]
+            ifadeler += [
+                f"SUM({metrik(f'{m}_sum')})",
+                f"COALESCE(SUM({metrik(f'{m}_count')}), 0)",
+                f"MIN({metrik(f'{m}_min')})",
+                f"MAX({metrik(f'{m}_max')})",
+            ]
+    for kolon in _FEEDBACK_KOLONLARI:
+        adlar.append(kolon)
+        ifadeler.append(f"COALESCE(SUM(CASE WHEN day >= :feedback_baslangic THEN {kolon} END), 0)")
+    return adlar, ", ".join(ifadeler)
+
+
+_PENCERE_ADLARI, _PENCERE_IFADELERI = _pencere_ifadeleri()
+
+
+def ortalama(ozet: dict, metrik: str) -> Optional[float]:
+    """Penceredeki metrik ortalaması (değer yoksa None - SQL AVG gibi)"""
+    sayi = ozet[f"{metrik}_count"]
+    return ozet[f"{metrik}_sum"] / sayi if sayi else None
+
+
+def pencere_ozetleri(
+    db: Session,
+    baslangic: date,
+    bitis: Optional[date] = None,
+    feedback_baslangic: Optional[date] = None,
+    city_id: Optional[str] = None
+) -> Dict[str, dict]:
+    """
+    Şehirlerin pencere özetleri tek sorguda
+
+    Args:
+        baslangic, bitis: Metrik penceresi (dahil; bitis yoksa üst sınır yok)
+        feedback_baslangic: Feedback sayılarının başlangıcı (None: tüm zamanlar)
+        city_id: Sadece bu şehir (None: tüm şehirler)
+
+    Returns:
+        dict: {city_id: {kaynak}_rows, {metrik}_sum/_count/_min/_max,
+            feedback_count, eco_feedback_count} - özeti olmayan şehir yer almaz
+    """
+    parametreler = {
+        "baslangic": str(baslangic),
+        "bitis": str(bitis) if bitis is not None else "9999-12-31",
+        "feedback_baslangic": str(feedback_baslangic) if feedback_baslangic is not None else _EN_ESKI,
+        "city_id": city_id
+    }
+    parametreler["alt"] = min(parametreler["baslangic"], parametreler["feedback_baslangic"])
+    sehir = "AND city_id = :city_id" if city_id is not None else ""
+    satirlar = db.execute(
+        text(f"""SELECT city_id, {_PENCERE_IFADELERI} FROM city_daily_rollup
+            WHERE day >= :alt {sehir} GROUP BY city_id"""),
+        parametreler
+    ).all()
+    return {satir[0]: dict(zip(_PENCERE_ADLARI, satir[1:])) for satir in satirlar}
+
+
+def sehir_anlik_ozeti(
+    db: Session,
+    city_id: str,
+    baslangic: date,
+    bitis: date,
+    feedback_baslangic: Optional[date] = None
+) -> Optional[dict]:
+    """
+    Şehir bilgileri ve pencere özeti tek ifadede (cities LEFT JOIN özetler)
+
+    Returns:
+        dict: city_id, name, region, population ve pencere_ozetleri alanları
+            (özeti olmayan şehirde sıfır) - şehir yoksa None
+    """
+    parametreler = {
+        "baslangic": str(baslangic),
+        "bitis": str(bitis),
+        "feedback_baslangic": str(feedback_baslangic) if feedback_baslangic is not None else _EN_ESKI,
+        "city_id": city_id
+    }
+    parametreler["alt"] = min(parametreler["baslangic"], parametreler["feedback_baslangic"])
+    satir = db.execute(
+        text(f"""SELECT c.city_id, c.name, c.region, c.population, {_PENCERE_IFADELERI}
+            FROM cities AS c
+            LEFT JOIN city_daily_rollup AS r ON r.city_id = c.city_id AND r.day >= :alt
+            WHERE c.city_id = :city_id
+            GROUP BY c.city_id"""),
+        parametreler
+    ).first()
+    if satir is None:
+        return None
+    return dict(zip(["city_id", "name", "region", "population", *_PENCERE_ADLARI], satir))
+
+
+def bos_ozet() -> dict:
+    """Özeti olmayan şehir için sıfır değerli özet"""
+    return {
+        ad: 0 if ad.endswith(("_rows", "_count")) else None
+        for ad in _PENCERE_ADLARI
+    }
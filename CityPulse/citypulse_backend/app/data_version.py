@@ -0,0 +1,174 @@
+"""
+Veri sürümleri ve sürüme bağlı sonuç önbelleği
+
+data_versions tablosundaki sayaçlar, kaynak tabloya yazan her işlemde (submit,
+toplu yükleme, arka plan sınıflandırma, reclassify scripti) trigger'larla aynı
+transaction içinde artar. Pahalı sorgu sonuçları okunan sürümle birlikte
+önbelleğe alınır; sürüm değişince önbellek boşaltılır. Sayaç veritabanında
+tutulduğu için başka worker process'lerin yazmaları da görülür.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple
+import threading
+import time
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+
+_SURUMLERI_OKU = text(
+    "SELECT name, version FROM data_versions WHERE name IN :adlar"
+).bindparams(bindparam("adlar", expanding=True))
+
+
+def veri_surumu(db: Session, *tablolar: str) -> Tuple[int, ...]:
+    """Tabloların güncel veri sürümleri (verilen sırayla, kaydı olmayan tablo için 0)"""
+    surumler = dict(db.execute(_SURUMLERI_OKU, {"adlar": list(tablolar)}).all())
+    return tuple(surumler.get(tablo, 0) for tablo in tablolar)
+
+
+class SurumluOnbellek:
+    """
+    Sınırlı LRU sonuç önbelleği - veri sürümü değiştiğinde kendiliğinden boşalır
+    """
+
+    def __init__(self, boyut: int):
+        self.boyut = max(0, boyut)
+        self._kayitlar: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._surum: Optional[Hashable] = None
+        self._kilit = threading.Lock()
+        self.isabet = 0
+        self.iska = 0
+
+    def getir(self, anahtar: Hashable, surum: Hashable) -> Optional[Any]:
+        if not self.boyut:
+            return None
+        with self._kilit:
+            if surum != self._surum:
+                self._kayitlar.clear()
+                self._surum = surum
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                self.iska += 1
+                return None
+            self._kayitlar.move_to_end(anahtar)
+            self.isabet += 1
+            return kayit
+
+    def koy(self, anahtar: Hashable, surum: Hashable, kayit: Any):
+        if not self.boyut:
+            return
+        with self._kilit:
+            # Hesaplama sırasında veri değiştiyse eski sonucu yazma
+            if surum != self._surum:
+                return
+            self._kayitlar[anahtar] = kayit
+            self._kayitlar.move_to_end(anahtar)
+            if len(self._kayitlar) > self.boyut:
+                self._kayitlar.popitem(last=False)
+
+    def metrikler(self) -> dict:
+        with self._kilit:
+            return {
+                "size": len(self._kayitlar),
+                "max_size": self.boyut,
+                "hits": self.isabet,
+                "misses": self.iska
+            }
+
+
+class _SureliKayit(NamedTuple):
+    deger: Any
+    surum: Hashable
+    donem: Hashable
+    zaman: float
+
+
+class SureliOnbellek:
+    """
+    TTL'li, sürümlü sonuç önbelleği - yeniden hesaplanırken bayat sonucu sunar
+
+    Kayıt sürümü ve dönemi (ör. pencerenin bittiği gün) güncelse ve TTL
+    dolmadıysa tazedir. Sürüm değiştiğinde veya TTL dolduğunda aynı anda yalnızca
+    bir istek yeniden hesaplar; hesaplama sürerken gelen istekler, kayıt
+    ttl + bayat_suresi'nden eski değilse bayat sonucu alır. Dönem değişmişse
+    eski sonuç sunulmaz, istekler hesaplamayı bekler.
+    """
+
+    def __init__(self, ttl: float, bayat_suresi: float, boyut: int = 64):
+        self.ttl = ttl
+        self.bayat_suresi = max(0.0, bayat_suresi)
+        self.boyut = max(0, boyut)
+        self._kayitlar: "OrderedDict[Hashable, _SureliKayit]" = OrderedDict()
+        self._kilit = threading.Lock()
+        # Yeniden hesaplamalar sırayla: aynı anda en fazla bir hesaplama
+        self._hesaplama_kilidi = threading.Lock()
+        self.isabet = 0
+        self.bayat = 0
+        self.iska = 0
+
+    def _taze(self, kayit: Optional[_SureliKayit], surum: Hashable, donem: Hashable, simdi: float) -> bool:
+        return (
+            kayit is not None and kayit.surum == surum and kayit.donem == donem
+            and simdi - kayit.zaman < self.ttl
+        )
+
+    def getir(self, anahtar: Hashable, surum: Hashable, donem: Hashable, hesapla: Callable[[], Any]) -> Any:
+        """Anahtarın sonucu; yoksa veya eskidiyse hesapla() ile yeniden hesaplanır"""
+        if not self.boyut or self.ttl <= 0:
+            return hesapla()
+        baslangic = time.monotonic()
+        with self._kilit:
+            kayit = self._kayitlar.get(anahtar)
+            if self._taze(kayit, surum, donem, baslangic):
+                self._kayitlar.move_to_end(anahtar)
+                self.isabet += 1
+                return kayit.deger
+            sunulabilir = (
+                kayit is not None and kayit.donem == donem
+                and baslangic - kayit.zaman < self.ttl + self.bayat_suresi
+            )
+
+        if not self._hesaplama_kilidi.acquire(blocking=not sunulabilir):
+            # Başka bir istek yeniden hesaplıyor
+            with self._kilit:
+                self.bayat += 1
+            return kayit.deger
+        try:
+            with self._kilit:
+                kayit = self._kayitlar.get(anahtar)
+                # Beklerken başka bir istek bu sürümü hesapladıysa (bu istek gelmeden
+                # başlamış olsa bile) veya bu istekten sonra başlayan bir hesaplama
+                # sonucu yazdıysa o kullanılır
+                if self._taze(kayit, surum, donem, time.monotonic()) or (
+                    kayit is not None and kayit.donem == donem and kayit.zaman >= baslangic
+                ):
+                    self._kayitlar.move_to_end(anahtar)
+                    self.isabet += 1
+                    return kayit.deger
+                self.iska += 1
+            # Kaydın yaşı hesaplamanın başladığı andan itibaren sayılır
+            basladi = time.monotonic()
+            deger = hesapla()
+            with self._kilit:
+                self._kayitlar[anahtar] = _SureliKayit(deger, surum, donem, basladi)
+                self._kayitlar.move_to_end(anahtar)
+                if len(self._kayitlar) > self.boyut:
+                    self._kayitlar.popitem(last=False)
+            return deger
+        finally:
+            self._hesaplama_kilidi.release()
+
+    def temizle(self):
+        with self._kilit:
+            self._kayitlar.clear()
+
+    def metrikler(self) -> dict:
+        with self._kilit:
+            return {
+                "size": len(self._kayitlar),
+                "max_size": self.boyut,
+                "hits": self.isabet,
+                "stale_hits": self.bayat,
+                "misses": self.iska
+            }
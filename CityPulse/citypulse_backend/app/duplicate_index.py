@@ -0,0 +1,203 @@
+"""
+Şehir bazında yakın-kopya feedback tespiti (MinHash + LSH)
+
+Bir olay sonrası aynı şikâyet kısa sürede birçok kez, küçük farklarla gelir.
+Her şehir için son feedback'lerin bellekte bir MinHash LSH indeksi tutulur:
+
+- Mesajın ilk 1000 karakteri temizle_metin ile normalize edilip karakter
+  5-gram'larına (shingle) bölünür; arama maliyeti mesaj uzunluğundan bağımsızdır
+- 32 permütasyonlu MinHash imzası 8 banda (4'er satır) ayrılır; aynı bandı
+  paylaşan kayıtlar adaydır
+- Adaylar gerçek Jaccard benzerliğiyle doğrulanır (DUPLICATE_THRESHOLD)
+
+İndekste sadece orijinal (duplicate_of'u boş) kayıtlar tutulur, şehir başına
+DUPLICATE_INDEX_SIZE ve DUPLICATE_WINDOW_HOURS ile sınırlıdır. Pencere, hem
+submit'te hem yeniden kurulumda satırın kendi timestamp'ine göre uygulanır. Uygulama
+açılışında veritabanından yeniden kurulur. İndeks process'e özeldir; birden
+fazla worker varsa her worker kendi kaydettiklerini ve açılışta okuduklarını görür.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import random
+import threading
+import zlib
+
+from sqlalchemy import select
+
+from . import config, models
+from .database import SessionLocal
+from .feedback_classifier import temizle_metin
+
+
+SHINGLE_BOYUTU = 5
+# Karşılaştırmaya giren en fazla karakter - çok uzun mesajlar imza süresini şişirmesin
+EN_FAZLA_KARAKTER = 1000
+BANT_SAYISI = 8
+BANT_SATIRI = 4
+_ASAL = (1 << 61) - 1
+
+_rastgele = random.Random(1)
+_PERMUTASYONLAR = [
+    (_rastgele.randrange(1, _ASAL), _rastgele.randrange(0, _ASAL))
+    for _ in range(BANT_SAYISI * BANT_SATIRI)
+]
+
+
+def shingle_kumesi(mesaj: str) -> frozenset:
+    """Normalize edilmiş mesajın karakter n-gram hash'leri"""
+    temiz = temizle_metin(mesaj[:EN_FAZLA_KARAKTER])
+    if len(temiz) <= SHINGLE_BOYUTU:
+        return frozenset([zlib.crc32(temiz.encode('utf-8'))]) if temiz else frozenset()
+    return frozenset(
+        zlib.crc32(temiz[i:i + SHINGLE_BOYUTU].encode('utf-8'))
+        for i in range(len(temiz) - SHINGLE_BOYUTU + 1)
+    )
+
+
+def bant_anahtarlari(shingle: frozenset) -> List[int]:
+    """MinHash imzasının bant hash'leri - bant numarası anahtara dahildir"""
+    imza = [min((a * h + b) % _ASAL for h in shingle) for a, b in _PERMUTASYONLAR]
+    return [
+        hash((bant, tuple(imza[bant * BANT_SATIRI:(bant + 1) * BANT_SATIRI])))
+        for bant in range(BANT_SAYISI)
+    ]
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    kesisim = len(a & b)
+    return kesisim / (len(a) + len(b) - kesisim)
+
+
+class _SehirIndeksi:
+    """Tek şehrin LSH bantları ve kayıtları (eklenme sırasıyla)"""
+
+    def __init__(self):
+        self.kayitlar: Dict[int, Tuple[frozenset, List[int], datetime]] = {}
+        self.sira = deque()
+        self.bantlar: Dict[int, List[int]] = {}
+
+    def ekle(self, feedback_id: int, shingle: frozenset, anahtarlar: List[int], zaman: datetime):
+        self.kayitlar[feedback_id] = (shingle, anahtarlar, zaman)
+        self.sira.append(feedback_id)
+        for anahtar in anahtarlar:
+            self.bantlar.setdefault(anahtar, []).append(feedback_id)
+
+    def eskileri_at(self, en_fazla: int, sinir: datetime):
+        while self.sira and (len(self.sira) > en_fazla or self.kayitlar[self.sira[0]][2] < sinir):
+            feedback_id = self.sira.popleft()
+            _, anahtarlar, _ = self.kayitlar.pop(feedback_id)
+            for anahtar in anahtarlar:
+                kova = self.bantlar.get(anahtar)
+                if kova is not None:
+                    kova.remove(feedback_id)
+                    if not kova:
+                        del self.bantlar[anahtar]
+
+    def en_benzer(self, shingle: frozenset, anahtarlar: List[int], esik: float) -> Optional[Tuple[int, float]]:
+        adaylar = set()
+        for anahtar in anahtarlar:
+            adaylar.update(self.bantlar.get(anahtar, ()))
+
+        en_iyi = None
+        for aday in adaylar:
+            benzerlik = jaccard(shingle, self.kayitlar[aday][0])
+            if benzerlik >= esik and (en_iyi is None or benzerlik > en_iyi[1]):
+                en_iyi = (aday, benzerlik)
+        return en_iyi
+
+
+class DuplicateIndex:
+    """Tüm şehirlerin yakın-kopya indeksleri"""
+
+    def __init__(self, esik: float, sehir_basina: int, pencere_saat: float):
+        self.esik = esik
+        self.sehir_basina = max(1, sehir_basina)
+        self.pencere = timedelta(hours=pencere_saat)
+        self._sehirler: Dict[str, _SehirIndeksi] = {}
+        self._kilit = threading.Lock()
+
+    def _sinir(self) -> datetime:
+        return datetime.now() - self.pencere
+
+    def bul(self, city_id: str, mesaj: str) -> Optional[Tuple[int, float]]:
+        """
+        Şehirdeki en benzer orijinal feedback
+
+        Returns:
+            tuple: (feedback id, Jaccard benzerliği) veya eşik aşılmadıysa None
+        """
+        shingle = shingle_kumesi(mesaj)
+        if not shingle:
+            return None
+        anahtarlar = bant_anahtarlari(shingle)
+        with self._kilit:
+            sehir = self._sehirler.get(city_id)
+            if sehir is None:
+                return None
+            sehir.eskileri_at(self.sehir_basina, self._sinir())
+            return sehir.en_benzer(shingle, anahtarlar, self.esik)
+
+    def ekle(self, city_id: str, feedback_id: int, mesaj: str, zaman: datetime):
+        """
+        Orijinal bir feedback'i indekse ekle
+
+        Args:
+            zaman: Satırın timestamp'i - pencere dışındaysa indekse girmez
+        """
+        sinir = self._sinir()
+        if zaman < sinir:
+            return
+        shingle = shingle_kumesi(mesaj)
+        if not shingle:
+            return
+        anahtarlar = bant_anahtarlari(shingle)
+        with self._kilit:
+            sehir = self._sehirler.setdefault(city_id, _SehirIndeksi())
+            sehir.ekle(feedback_id, shingle, anahtarlar, zaman)
+            sehir.eskileri_at(self.sehir_basina, sinir)
+
+    def yeniden_kur(self) -> int:
+        """İndeksi veritabanındaki pencere içi orijinal feedback'lerden kur"""
+        feedback = models.CityFeedback
+        db = SessionLocal()
+        try:
+            satirlar = db.execute(
+                select(feedback.id, feedback.city_id, feedback.message, feedback.timestamp)
+                .where(feedback.duplicate_of.is_(None), feedback.timestamp >= self._sinir())
+                .order_by(feedback.id)
+            ).all()
+        finally:
+            db.close()
+
+        with self._kilit:
+            self._sehirler = {}
+        for satir in satirlar:
+            self.ekle(satir.city_id, satir.id, satir.message, satir.timestamp)
+        return len(satirlar)
+
+    def metrikler(self) -> dict:
+        with self._kilit:
+            return {
+                "mode": config.DUPLICATE_MODE,
+                "threshold": self.esik,
+                "cities": len(self._sehirler),
+                "indexed": sum(len(s.kayitlar) for s in self._sehirler.values())
+            }
+
+
+kopya_indeksi = DuplicateIndex(
+    esik=config.DUPLICATE_THRESHOLD,
+    sehir_basina=config.DUPLICATE_INDEX_SIZE,
+    pencere_saat=config.DUPLICATE_WINDOW_HOURS
+)
+
+
+def indeksi_kur():
+    """Uygulama açılışında çağrılır - DUPLICATE_MODE=off ise bir şey yapmaz"""
+    if config.DUPLICATE_MODE == "off":
+        return
+    adet = kopya_indeksi.yeniden_kur()
+    print(f"✅ Yakın-kopya indeksi kuruldu: {adet} feedback")
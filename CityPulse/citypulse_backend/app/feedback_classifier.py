@@ -1,61 +1,37 @@
 """
 Feedback mesajlarını kategorilemek için kural tabanlı NLP servisi
 """
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
 import re
+import threading
 
+from . import config
+
+
+def anahtar_kelimeleri_oku(yol: str) -> Dict[str, List[str]]:
+    """Kategori anahtar kelimelerini JSON dosyasından oku ve doğrula"""
+    with open(yol, encoding='utf-8') as f:
+        kelimeler = json.load(f)
+    
+    if not isinstance(kelimeler, dict) or not kelimeler:
+        raise ValueError("Anahtar kelime dosyası kategori -> kelime listesi eşlemesi olmalı")
+    for kategori, liste in kelimeler.items():
+        if not isinstance(liste, list) or not all(isinstance(k, str) for k in liste):
+            raise ValueError(f"'{kategori}' kategorisinin kelimeleri metin listesi olmalı")
+    
+    return kelimeler
 
-# Kategori anahtar kelimeleri
-CATEGORY_KEYWORDS = {
-    "Trafik": [
-        # Trafik durumu
-        "trafik", "yol", "cadde", "sokak", "bulvar", "kavşak", "köprü",
-        "yoğunluk", "sıkışık", "araç", "otobüs", "minibüs", "taksi",
-        "park", "otopark", "durak", "kaldırım", "yaya", "kaza",
-        # Yol durumu
-        "çukur", "bozuk", "asfalt", "kırık", "sinyalizasyon", "ışık",
-        "işaret", "levha", "şerit", "yol çalışması", "kapalı yol",
-        "viraj", "merdiven", "rampa", "geçit", "şerit", "yol yapımı",
-        "trafik lambası", "kırmızı ışık", "yeşil ışık", "trafik cezası",
-        "hız", "yavaş", "hızlı", "akış", "tıkanma", "araç yoğunluğu",
-        "ulaşım", "toplu taşıma", "metro", "tramvay", "dolmuş"
-    ],
-    
-    "Çevre": [
-        # Hava kalitesi
-        "hava", "kirli", "temiz", "hava kalitesi", "duman", "egzoz",
-        "toz", "koku", "kokulu", "pis", "karbonmonoksit", "pm2.5",
-        "hava kirliliği", "smog", "sis", "kirlenme",
-        # Yeşil alan
-        "park", "yeşil alan", "ağaç", "çiçek", "bahçe", "orman",
-        "bitki", "çim", "ot", "peyzaj", "doğa", "mesire",
-        # Temizlik
-        "çöp", "temizlik", "pis", "kirli", "atık", "pislik",
-        "süpürge", "temiz", "hijyen", "kir", "leke", "koku",
-        "çöp kutusu", "çöplük", "moloz", "enkaz", "pislik",
-        "temizleme", "temizleyici", "çöp toplama", "çöp kamyonu",
-        # Genel çevre
-        "çevre", "doğa", "sürdürülebilir", "geri dönüşüm", "atık",
-        "yeşil", "ekoloji", "enerji tasarrufu", "su tasarrufu"
-    ],
-    
-    "Bağlantı": [
-        # İnternet
-        "internet", "wifi", "wi-fi", "bağlantı", "ağ", "sinyal",
-        "çekmemek", "çekmiyor", "yavaş", "kesik", "kopuk", "bağlanmıyor",
-        "mobil veri", "4g", "5g", "3g", "gsm", "mobil", "operatör",
-        # Teknik terimler
-        "bant genişliği", "hız", "mbps", "latency", "ping", "yükleme",
-        "indirme", "donma", "takılma", "gecikmeli", "erişim",
-        "bağlanamadım", "bağlanamıyorum", "açılmıyor", "yüklenmiyor",
-        # Telekomünikasyon
-        "telefon", "arama", "konuşma", "hat", "şebeke", "kapsama",
-        "alan", "operatör", "turkcell", "vodafone", "türk telekom",
-        "fiber", "adsl", "modem", "router", "access point",
-        "hotspot", "ücretsiz internet", "kablosuz", "kablo",
-        "baz istasyonu", "çekim gücü", "sinyal gücü"
-    ]
-}
+
+# Kategori anahtar kelimeleri - app/data/category_keywords.json (indeks yenilenince güncellenir)
+CATEGORY_KEYWORDS = anahtar_kelimeleri_oku(config.CLASSIFIER_KEYWORDS_PATH)
+
+
+_TURKCE_KARAKTERLER = str.maketrans('ığüşöç', 'igusoc')
+_NOKTALAMA = re.compile(r'[^\w\s]')
 
 
 def temizle_metin(metin: str) -> str:
@@ -63,15 +39,11 @@ def temizle_metin(metin: str) -> str:
     if not metin:
         return ""
     
-    # Küçük harfe çevir
-    metin = metin.lower()
-    
-    # Türkçe karakterleri düzelt
-    metin = metin.replace('ı', 'i').replace('ğ', 'g').replace('ü', 'u')
-    metin = metin.replace('ş', 's').replace('ö', 'o').replace('ç', 'c')
+    # Küçük harfe çevir ve Türkçe karakterleri düzelt
+    metin = metin.lower().translate(_TURKCE_KARAKTERLER)
     
     # Noktalama işaretlerini kaldır
-    metin = re.sub(r'[^\w\s]', ' ', metin)
+    metin = _NOKTALAMA.sub(' ', metin)
     
     # Fazla boşlukları temizle
     metin = ' '.join(metin.split())
@@ -79,6 +51,185 @@ def temizle_metin(metin: str) -> str:
     return metin
 
 
+class KeywordIndex:
+    """
+    Anahtar kelimelerden bir kez derlenen token n-gram indeksi
+    
+    Temizlenmiş mesaj sadece kelime karakterleri ve tek boşluklardan oluştuğu için
+    `\\b kelime \\b` regex eşleşmesi, ardışık token dizisinin birebir eşleşmesine denktir.
+    Mesaj tek geçişte taranır; skorlar, eşleşme sayıları ve bulunan kelimeler
+    eski regex döngüsüyle aynı sırada ve aynı değerlerle hesaplanır.
+    """
+    
+    def __init__(self, kategori_kelimeleri: Dict[str, List[str]]):
+        self.kategoriler = list(kategori_kelimeleri)
+        # Anahtar kelime setinin sürümü - set değişince sonuç önbelleği geçersiz olur
+        icerik = json.dumps(kategori_kelimeleri, ensure_ascii=False)
+        self.surum = hashlib.sha1(icerik.encode('utf-8')).hexdigest()[:12]
+        # (kategori, orijinal kelime, ağırlık) - anahtar kelime listesi sırasıyla
+        self._girdiler: List[Tuple[str, str, float]] = []
+        # temizlenmiş kelime -> girdi indeksleri (tekrarlanan kelimeler ayrı girdi sayılır)
+        self._kelimeler: Dict[str, List[int]] = {}
+        # çok kelimeli ifadeler için ilk token -> ifade uzunlukları
+        self._baslangiclar: Dict[str, List[int]] = {}
+        
+        for kategori, kelimeler in kategori_kelimeleri.items():
+            for kelime in kelimeler:
+                temiz_kelime = temizle_metin(kelime)
+                if not temiz_kelime:
+                    raise ValueError(f"Geçersiz anahtar kelime: {kelime!r}")
+                
+                self._kelimeler.setdefault(temiz_kelime, []).append(len(self._girdiler))
+                # Daha uzun kelimeler daha fazla puan alsın
+                self._girdiler.append((kategori, kelime, len(kelime) / 5))
+                
+                tokenlar = temiz_kelime.split(' ')
+                if len(tokenlar) > 1:
+                    uzunluklar = self._baslangiclar.setdefault(tokenlar[0], [])
+                    if len(tokenlar) not in uzunluklar:
+                        uzunluklar.append(len(tokenlar))
+    
+    def esles(self, temiz_mesaj: str) -> Dict[str, dict]:
+        """
+        Temizlenmiş mesajı tek geçişte tara
+        
+        Returns:
+            dict: {kategori: {'skor': float, 'eslesme': int, 'bulunan': list}}
+        """
+        sayimlar: Dict[str, int] = {}
+        
+        if temiz_mesaj:
+            kelimeler = self._kelimeler
+            baslangiclar = self._baslangiclar
+            tokenlar = temiz_mesaj.split(' ')
+            token_sayisi = len(tokenlar)
+            # Çok kelimeli ifadeler için son eşleşmenin bitişi (re.findall çakışmayan eşleşme sayar)
+            son_bitis: Dict[str, int] = {}
+            
+            for i, token in enumerate(tokenlar):
+                if token in kelimeler:
+                    sayimlar[token] = sayimlar.get(token, 0) + 1
+                
+                uzunluklar = baslangiclar.get(token)
+                if uzunluklar:
+                    for uzunluk in uzunluklar:
+                        if i + uzunluk > token_sayisi:
+                            continue
+                        ifade = ' '.join(tokenlar[i:i + uzunluk])
+                        if ifade in kelimeler and i >= son_bitis.get(ifade, 0):
+                            sayimlar[ifade] = sayimlar.get(ifade, 0) + 1
+                            son_bitis[ifade] = i + uzunluk
+        
+        # Eşleşmeleri anahtar kelime sırasına diz (skor toplama sırası eski davranışla aynı kalsın)
+        eslesmeler = sorted(
+            (girdi, sayi)
+            for ifade, sayi in sayimlar.items()
+            for girdi in self._kelimeler[ifade]
+        )
+        
+        sonuc = {
+            kategori: {'skor': 0, 'eslesme': 0, 'bulunan': []}
+            for kategori in self.kategoriler
+        }
+        for girdi, sayi in eslesmeler:
+            kategori, kelime, agirlik = self._girdiler[girdi]
+            kategori_sonucu = sonuc[kategori]
+            kategori_sonucu['skor'] += sayi * agirlik
+            kategori_sonucu['eslesme'] += sayi
+            kategori_sonucu['bulunan'].append(kelime)
+        
+        return sonuc
+
+
+def _imza_oku(yol: str) -> Optional[Tuple[int, int]]:
+    """Dosya değişikliğini anlamak için (mtime, boyut) imzası"""
+    try:
+        bilgi = os.stat(yol)
+    except OSError:
+        return None
+    return (bilgi.st_mtime_ns, bilgi.st_size)
+
+
+# Aktif indeks - yenilemede yeni indeks tamamen derlendikten sonra tek atamayla değiştirilir
+_INDEKS = KeywordIndex(CATEGORY_KEYWORDS)
+_dosya_imzasi = _imza_oku(config.CLASSIFIER_KEYWORDS_PATH)
+_yenileme_kilidi = threading.Lock()
+
+
+def aktif_indeks() -> KeywordIndex:
+    """Şu an kullanılan anahtar kelime indeksi"""
+    return _INDEKS
+
+
+def indeksi_yenile(zorla: bool = False) -> dict:
+    """
+    Anahtar kelime dosyası değiştiyse yeni indeksi derle ve aktif indeksle değiştir
+    
+    Derleme sırasında sınıflandırma eski indeksle devam eder; hatalı dosyada
+    eski indeks korunur ve hata yukarı iletilir.
+    
+    Returns:
+        dict: {'reloaded': bool, 'version': str, 'previous_version': str}
+    """
+    global _INDEKS, CATEGORY_KEYWORDS, _dosya_imzasi
+    
+    yol = config.CLASSIFIER_KEYWORDS_PATH
+    with _yenileme_kilidi:
+        onceki_surum = _INDEKS.surum
+        imza = _imza_oku(yol)
+        if not zorla and imza == _dosya_imzasi:
+            return {'reloaded': False, 'version': onceki_surum, 'previous_version': onceki_surum}
+        
+        # Aynı hatalı dosya her kontrolde tekrar denenmesin
+        _dosya_imzasi = imza
+        kelimeler = anahtar_kelimeleri_oku(yol)
+        yeni_indeks = KeywordIndex(kelimeler)
+        
+        CATEGORY_KEYWORDS = kelimeler
+        _INDEKS = yeni_indeks
+    
+    return {
+        'reloaded': yeni_indeks.surum != onceki_surum,
+        'version': yeni_indeks.surum,
+        'previous_version': onceki_surum
+    }
+
+
+class _DosyaIzleyici:
+    """Anahtar kelime dosyasını belirli aralıklarla kontrol eden arka plan thread'i"""
+    
+    def __init__(self):
+        self._dur = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def baslat(self, aralik: float):
+        if aralik <= 0 or self._thread is not None:
+            return
+        self._dur.clear()
+        self._thread = threading.Thread(
+            target=self._calis, args=(aralik,), name="keyword-watcher", daemon=True
+        )
+        self._thread.start()
+    
+    def durdur(self):
+        self._dur.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def _calis(self, aralik: float):
+        while not self._dur.wait(aralik):
+            try:
+                sonuc = indeksi_yenile()
+                if sonuc['reloaded']:
+                    print(f"🔄 Anahtar kelime indeksi yenilendi: {sonuc['previous_version']} → {sonuc['version']}")
+            except Exception as e:
+                print(f"❌ Anahtar kelime dosyası yüklenemedi, eski indeks kullanılıyor: {str(e)}")
+
+
+dosya_izleyici = _DosyaIzleyici()
+
+
 def kategori_bul(mesaj: str) -> str:
     """
     Mesajı analiz ederek kategori bul
@@ -92,33 +243,14 @@ def kategori_bul(mesaj: str) -> str:
     if not mesaj or not mesaj.strip():
         return "Öneri"
     
-    # Metni temizle
-    temiz_mesaj = temizle_metin(mesaj)
-    
-    # Her kategori için eşleşme skorunu hesapla
-    kategori_skorlari = {}
+    # Metni temizle ve her kategori için eşleşme skorunu hesapla
+    eslesmeler = aktif_indeks().esles(temizle_metin(mesaj))
     
-    for kategori, kelimeler in CATEGORY_KEYWORDS.items():
-        skor = 0
-        eslesme_sayisi = 0
-        
-        for kelime in kelimeler:
-            temiz_kelime = temizle_metin(kelime)
-            
-            # Tam kelime eşleşmesi (word boundary)
-            pattern = r'\b' + re.escape(temiz_kelime) + r'\b'
-            eslesme = len(re.findall(pattern, temiz_mesaj))
-            
-            if eslesme > 0:
-                eslesme_sayisi += eslesme
-                # Daha uzun kelimeler daha fazla puan alsın
-                skor += eslesme * (len(kelime) / 5)
-        
-        if eslesme_sayisi > 0:
-            kategori_skorlari[kategori] = {
-                'skor': skor,
-                'eslesme': eslesme_sayisi
-            }
+    kategori_skorlari = {
+        kategori: sonuc
+        for kategori, sonuc in eslesmeler.items()
+        if sonuc['eslesme'] > 0
+    }
     
     # En yüksek skora sahip kategoriyi seç
     if kategori_skorlari:
@@ -132,46 +264,90 @@ def kategori_bul(mesaj: str) -> str:
     return "Öneri"
 
 
-def kategori_detayli_analiz(mesaj: str) -> dict:
+class AnalizOnbellegi:
     """
-    Mesajı detaylı analiz et ve kategori bilgilerini döndür
+    Normalize edilmiş mesaj özetine göre sınırlı LRU sonuç önbelleği
     
-    Returns:
-        dict: {
-            'kategori': str,
-            'guven_skoru': float (0-100),
-            'bulunan_kelimeler': list,
-            'analiz_detayi': dict
-        }
+    Sadece metne bağlı sonuç (kategori, güven, kelimeler, skorlar) saklanır;
+    mesaj uzunluğu gibi ham mesaja bağlı alanlar her çağrıda yeniden hesaplanır.
+    İndeks sürümü değiştiğinde önbellek kendiliğinden boşaltılır.
     """
-    if not mesaj or not mesaj.strip():
-        return {
-            'kategori': 'Öneri',
-            'guven_skoru': 0,
-            'bulunan_kelimeler': [],
-            'analiz_detayi': {}
-        }
     
-    temiz_mesaj = temizle_metin(mesaj)
+    def __init__(self, boyut: int):
+        self.boyut = max(0, boyut)
+        self._kayitlar: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._surum: Optional[str] = None
+        self._kilit = threading.Lock()
+        self.isabet = 0
+        self.iska = 0
     
-    tum_skorlar = {}
-    tum_kelimeler = {}
+    @staticmethod
+    def anahtar(temiz_mesaj: str) -> bytes:
+        return hashlib.blake2b(temiz_mesaj.encode('utf-8'), digest_size=16).digest()
     
-    for kategori, kelimeler in CATEGORY_KEYWORDS.items():
-        skor = 0
-        bulunan = []
-        
-        for kelime in kelimeler:
-            temiz_kelime = temizle_metin(kelime)
-            pattern = r'\b' + re.escape(temiz_kelime) + r'\b'
-            eslesme = len(re.findall(pattern, temiz_mesaj))
-            
-            if eslesme > 0:
-                bulunan.append(kelime)
-                skor += eslesme * (len(kelime) / 5)
-        
-        tum_skorlar[kategori] = skor
-        tum_kelimeler[kategori] = bulunan
+    def getir(self, anahtar: bytes, surum: str) -> Optional[dict]:
+        if not self.boyut:
+            return None
+        with self._kilit:
+            if surum != self._surum:
+                self._kayitlar.clear()
+                self._surum = surum
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                self.iska += 1
+                return None
+            self._kayitlar.move_to_end(anahtar)
+            self.isabet += 1
+            return kayit
+    
+    def koy(self, anahtar: bytes, surum: str, kayit: dict):
+        if not self.boyut:
+            return
+        with self._kilit:
+            # Hesaplama sırasında indeks değiştiyse eski sonucu yazma
+            if surum != self._surum:
+                return
+            self._kayitlar[anahtar] = kayit
+            self._kayitlar.move_to_end(anahtar)
+            if len(self._kayitlar) > self.boyut:
+                self._kayitlar.popitem(last=False)
+    
+    def temizle(self):
+        with self._kilit:
+            self._kayitlar.clear()
+    
+    def metrikler(self) -> dict:
+        with self._kilit:
+            toplam = self.isabet + self.iska
+            return {
+                "size": len(self._kayitlar),
+                "max_size": self.boyut,
+                "hits": self.isabet,
+                "misses": self.iska,
+                "hit_ratio": round(self.isabet / toplam, 4) if toplam else 0,
+                "keyword_version": self._surum
+            }
+
+
+# Tekrarlanan mesajlar için süreç içi sonuç önbelleği (CLASSIFIER_CACHE_SIZE=0 kapatır)
+onbellek = AnalizOnbellegi(config.CLASSIFIER_CACHE_SIZE)
+
+
+def anahtar_kelime_surumu() -> str:
+    """Aktif anahtar kelime setinin sürümü"""
+    return aktif_indeks().surum
+
+
+def kategori_ozeti(temiz_mesaj: str, indeks: Optional[KeywordIndex] = None) -> dict:
+    """
+    Temizlenmiş mesajın sadece metne bağlı analiz sonucunu hesapla
+    
+    Returns:
+        dict: {'kategori', 'guven_skoru', 'bulunan_kelimeler', 'tum_skorlar'}
+    """
+    eslesmeler = (indeks or aktif_indeks()).esles(temiz_mesaj)
+    
+    tum_skorlar = {kategori: sonuc['skor'] for kategori, sonuc in eslesmeler.items()}
     
     # En iyi kategoriyi bul
     if any(tum_skorlar.values()):
@@ -185,24 +361,112 @@ def kategori_detayli_analiz(mesaj: str) -> dict:
         return {
             'kategori': en_iyi_kategori,
             'guven_skoru': round(guven_skoru, 2),
-            'bulunan_kelimeler': tum_kelimeler[en_iyi_kategori],
-            'analiz_detayi': {
-                'tum_skorlar': tum_skorlar,
-                'mesaj_uzunlugu': len(mesaj),
-                'kelime_sayisi': len(mesaj.split())
-            }
+            'bulunan_kelimeler': eslesmeler[en_iyi_kategori]['bulunan'],
+            'tum_skorlar': tum_skorlar
         }
-    else:
+    
+    return {
+        'kategori': 'Öneri',
+        'guven_skoru': 0,
+        'bulunan_kelimeler': [],
+        'tum_skorlar': tum_skorlar
+    }
+
+
+def kategori_detayli_analiz(mesaj: str) -> dict:
+    """
+    Mesajı detaylı analiz et ve kategori bilgilerini döndür
+    
+    Returns:
+        dict: {
+            'kategori': str,
+            'guven_skoru': float (0-100),
+            'bulunan_kelimeler': list,
+            'analiz_detayi': dict
+        }
+    """
+    return onbellekli_analiz(mesaj, kategori_ozeti)
+
+
+def onbellekli_analiz(
+    mesaj: str,
+    ozet_hesapla: Callable[[str, KeywordIndex], dict],
+    indeks: Optional[KeywordIndex] = None
+) -> dict:
+    """
+    Önbelleğe bakarak detaylı analiz yap; ıskalamada özeti verilen fonksiyonla hesapla
+    
+    Process havuzu modunda ozet_hesapla özeti worker'da hesaplatır,
+    önbellek ve sonuç birleştirme ana process'te kalır. Analiz tek bir indeks
+    sürümüyle yapılır; çağıran taraf sürümü kaydetmek isterse indeksi kendisi verir.
+    """
+    if not mesaj or not mesaj.strip():
         return {
             'kategori': 'Öneri',
             'guven_skoru': 0,
             'bulunan_kelimeler': [],
-            'analiz_detayi': {
-                'tum_skorlar': tum_skorlar,
-                'mesaj_uzunlugu': len(mesaj),
-                'kelime_sayisi': len(mesaj.split())
-            }
+            'analiz_detayi': {}
+        }
+    
+    indeks = indeks or aktif_indeks()
+    temiz_mesaj = temizle_metin(mesaj)
+    anahtar = AnalizOnbellegi.anahtar(temiz_mesaj)
+    
+    ozet = onbellek.getir(anahtar, indeks.surum)
+    if ozet is None:
+        ozet = ozet_hesapla(temiz_mesaj, indeks)
+        onbellek.koy(anahtar, indeks.surum, ozet)
+    
+    return _analiz_sonucu(mesaj, ozet)
+
+
+def kategori_toplu_analiz(mesajlar: List[str], indeks: Optional[KeywordIndex] = None) -> List[dict]:
+    """
+    Mesaj listesini tek seferde analiz et
+    
+    Aynı mesajlar ve aynı normalize metne sahip mesajlar toplu içinde bir kez
+    eşleştirilir; her mesaj için kategori_detayli_analiz ile aynı sonuç döner.
+    Toplu istekler LRU önbelleği kullanmaz, önbelleği tek seferlik mesajlarla doldurmaz.
+    
+    Returns:
+        list: Girdi sırasıyla kategori_detayli_analiz sonuçları
+              (aynı mesajlar aynı sonuç nesnesini paylaşır, sonuçlar değiştirilmemeli)
+    """
+    indeks = indeks or aktif_indeks()
+    sonuclar = []
+    mesaj_sonuclari: Dict[str, dict] = {}
+    ozetler: Dict[str, dict] = {}
+    
+    for mesaj in mesajlar:
+        sonuc = mesaj_sonuclari.get(mesaj)
+        if sonuc is None:
+            if not mesaj or not mesaj.strip():
+                sonuc = kategori_detayli_analiz(mesaj)
+            else:
+                temiz_mesaj = temizle_metin(mesaj)
+                ozet = ozetler.get(temiz_mesaj)
+                if ozet is None:
+                    ozet = kategori_ozeti(temiz_mesaj, indeks)
+                    ozetler[temiz_mesaj] = ozet
+                sonuc = _analiz_sonucu(mesaj, ozet)
+            mesaj_sonuclari[mesaj] = sonuc
+        sonuclar.append(sonuc)
+    
+    return sonuclar
+
+
+def _analiz_sonucu(mesaj: str, ozet: dict) -> dict:
+    """Metin özetine ham mesaja bağlı alanları ekleyerek detaylı sonucu oluştur"""
+    return {
+        'kategori': ozet['kategori'],
+        'guven_skoru': ozet['guven_skoru'],
+        'bulunan_kelimeler': list(ozet['bulunan_kelimeler']),
+        'analiz_detayi': {
+            'tum_skorlar': dict(ozet['tum_skorlar']),
+            'mesaj_uzunlugu': len(mesaj),
+            'kelime_sayisi': len(mesaj.split())
         }
+    }
 
 
 # Test fonksiyonu
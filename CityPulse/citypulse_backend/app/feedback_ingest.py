@@ -0,0 +1,317 @@
+"""
+NDJSON toplu feedback yükleme
+
+Çevrimdışı biriken mobil feedback'ler ve çağrı merkezi / e-posta dışa
+aktarımları için: her satır submit gövdesiyle aynı JSON nesnesidir
+({"city_id": ..., "message": ..., "timestamp": ...}). Gövde (gzip'li olabilir)
+geldikçe açılır ve satırlara bölünür; satırlar BULK_INGEST_CHUNK_SIZE'lık
+partiler halinde toplu sınıflandırılıp tek transaction'da yazılır. Her partinin
+sonucu hemen istemciye akıtılır, bellekte en fazla bir parti tutulur.
+
+Yanıt da NDJSON'dur: girdi sırasıyla her satır için id veya hata, en sonda
+bir özet satırı.
+"""
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import json
+import zlib
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from . import config
+from .classifier_pool import siniflandirici_surumu, toplu_analiz_et
+from .classification_queue import BEKLEMEDE_KATEGORISI, kuyruk
+from .database import SessionLocal
+from .duplicate_index import DuplicateIndex, kopya_indeksi
+from .feedback_service import feedback_toplu_kaydet, referanslar
+
+
+# Sıkıştırılmış gövdeden tek adımda açılacak en fazla bayt (gzip bombasına karşı)
+_ACMA_PARCASI = 256 * 1024
+
+
+class SatirHatasi(ValueError):
+    """Satır işlenemedi - yanıtta satırın hatası olarak döner"""
+
+    def __init__(self, mesaj: str, kod: str):
+        super().__init__(mesaj)
+        self.kod = kod
+
+
+def _hata(satir_no: int, hata: SatirHatasi) -> dict:
+    return {"line": satir_no, "error": str(hata), "error_code": hata.kod}
+
+
+def _zaman_coz(deger) -> datetime:
+    """Submit ile aynı kural: "YYYY-MM-DD HH:MM:SS" değilse şimdiki zaman"""
+    if isinstance(deger, str):
+        try:
+            return datetime.strptime(deger, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            pass
+    return datetime.now()
+
+
+def satir_coz(ham: bytes) -> dict:
+    """NDJSON satırını doğrula"""
+    try:
+        kayit = json.loads(ham)
+    except (ValueError, UnicodeDecodeError):
+        raise SatirHatasi("Geçersiz JSON", "INVALID_JSON")
+    if not isinstance(kayit, dict):
+        raise SatirHatasi("Satır bir JSON nesnesi olmalı", "INVALID_LINE")
+    city_id = kayit.get("city_id")
+    mesaj = kayit.get("message")
+    if not isinstance(city_id, str) or not city_id:
+        raise SatirHatasi("city_id zorunlu", "INVALID_LINE")
+    if not isinstance(mesaj, str) or not mesaj:
+        raise SatirHatasi("message zorunlu", "INVALID_LINE")
+    return {"city_id": city_id, "message": mesaj, "timestamp": _zaman_coz(kayit.get("timestamp"))}
+
+
+async def _ac(govde: AsyncIterator[bytes], gzipli: bool) -> AsyncIterator[bytes]:
+    """Gövdeyi geldikçe aç - tek seferde en fazla _ACMA_PARCASI bayt üretir"""
+    if not gzipli:
+        async for parca in govde:
+            yield parca
+        return
+    acici = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    async for parca in govde:
+        veri = acici.decompress(parca, _ACMA_PARCASI)
+        while veri:
+            yield veri
+            veri = acici.decompress(acici.unconsumed_tail, _ACMA_PARCASI) if acici.unconsumed_tail else b""
+    son = acici.flush()
+    if son:
+        yield son
+    if not acici.eof:
+        raise zlib.error("gzip akışı eksik")
+
+
+async def satirlar(
+    govde: AsyncIterator[bytes],
+    gzipli: bool,
+    max_bayt: int
+) -> AsyncIterator[Tuple[int, Optional[bytes], Optional[SatirHatasi]]]:
+    """
+    Gövdeyi satırlara böl: (satır no, ham satır, hata)
+
+    Boş satırlar atlanır (numaraları sayılır). max_bayt'ı aşan satır tamponda
+    tutulmaz; satır sonuna kadar atlanıp hata olarak döner.
+    """
+    tampon = bytearray()
+    satir_no = 0
+    atlaniyor = False
+    veriler = _ac(govde, gzipli)
+    while True:
+        try:
+            veri = await veriler.__anext__()
+        except StopAsyncIteration:
+            break
+        except zlib.error:
+            # Akış yarıda kesildi: yarım kalan son satır da hata olarak raporlanır
+            if atlaniyor or tampon.strip():
+                yield satir_no + 1, None, SatirHatasi("Satır gzip akışı kesildiği için eksik", "TRUNCATED_LINE")
+            raise
+        baslangic = 0
+        while True:
+            son = veri.find(b"\n", baslangic)
+            if son < 0:
+                if not atlaniyor:
+                    tampon += veri[baslangic:]
+                    if len(tampon) > max_bayt:
+                        tampon.clear()
+                        atlaniyor = True
+                break
+            satir_no += 1
+            if atlaniyor:
+                atlaniyor = False
+                yield satir_no, None, SatirHatasi(f"Satır {max_bayt} baytı aşıyor", "LINE_TOO_LONG")
+            else:
+                tampon += veri[baslangic:son]
+                if len(tampon) > max_bayt:
+                    yield satir_no, None, SatirHatasi(f"Satır {max_bayt} baytı aşıyor", "LINE_TOO_LONG")
+                elif tampon.strip():
+                    yield satir_no, bytes(tampon), None
+                tampon.clear()
+            baslangic = son + 1
+    if atlaniyor:
+        yield satir_no + 1, None, SatirHatasi(f"Satır {max_bayt} baytı aşıyor", "LINE_TOO_LONG")
+    elif tampon.strip():
+        yield satir_no + 1, bytes(tampon), None
+
+
+def parti_kaydet(parti: List[Tuple[int, dict]]) -> List[dict]:
+    """
+    Geçerli satırları sınıflandır ve tek transaction'da yaz (threadpool'da çalışır)
+
+    Şehir kontrolü, yakın-kopya ve asenkron sınıflandırma kuralları submit
+    ile aynıdır.
+    """
+    sonuclar: Dict[int, dict] = {}
+    db = SessionLocal()
+    try:
+        kayitlar = []
+        for satir_no, kayit in parti:
+            if referanslar.sehir_adi(db, kayit["city_id"]) is None:
+                sonuclar[satir_no] = _hata(
+                    satir_no, SatirHatasi(f"Şehir ID {kayit['city_id']} bulunamadı", "CITY_NOT_FOUND")
+                )
+            else:
+                kayitlar.append((satir_no, kayit))
+
+        # Yakın-kopyalar: collapse modunda yazılmaz, orijinalin id'si döner. Partideki
+        # orijinaller henüz id almadığı için parti içi ayrı bir indekste tutulur;
+        # sonraki satırlar hem genel indekse hem bu indekse karşı kontrol edilir.
+        yazilacaklar = []
+        parti_indeksi = DuplicateIndex(
+            esik=kopya_indeksi.esik,
+            sehir_basina=len(kayitlar) or 1,
+            pencere_saat=kopya_indeksi.pencere.total_seconds() / 3600
+        )
+        for satir_no, kayit in kayitlar:
+            kopya = parti_kopyasi = None
+            if config.DUPLICATE_MODE != "off":
+                kopya = kopya_indeksi.bul(kayit["city_id"], kayit["message"])
+                if kopya is None:
+                    parti_kopyasi = parti_indeksi.bul(kayit["city_id"], kayit["message"])
+            if parti_kopyasi is not None:
+                # Partideki anahtar, orijinalin yazilacaklar içindeki sırasıdır
+                if config.DUPLICATE_MODE == "collapse":
+                    sonuclar[satir_no] = {"line": satir_no, "_orijinal_sira": parti_kopyasi[0]}
+                    continue
+                kayit["duplicate_of"] = None
+                kayit["duplicate_of_index"] = parti_kopyasi[0]
+            elif kopya is not None and config.DUPLICATE_MODE == "collapse":
+                sonuclar[satir_no] = {"line": satir_no, "id": kopya[0], "duplicate_of": kopya[0], "collapsed": True}
+                continue
+            else:
+                kayit["duplicate_of"] = kopya[0] if kopya else None
+                if kopya is None and config.DUPLICATE_MODE != "off":
+                    parti_indeksi.ekle(kayit["city_id"], len(yazilacaklar), kayit["message"], kayit["timestamp"])
+            yazilacaklar.append((satir_no, kayit))
+
+        if config.CLASSIFIER_ASYNC:
+            for _, kayit in yazilacaklar:
+                kayit["category"] = BEKLEMEDE_KATEGORISI
+        elif yazilacaklar:
+            analizler = toplu_analiz_et([kayit["message"] for _, kayit in yazilacaklar])
+            for (_, kayit), analiz in zip(yazilacaklar, analizler):
+                kayit["category"] = analiz["kategori"]
+                kayit["keyword_version"] = siniflandirici_surumu(analiz)
+
+        try:
+            kaydedilenler = feedback_toplu_kaydet(db, [kayit for _, kayit in yazilacaklar])
+        except Exception as e:
+            hata = SatirHatasi(f"Feedback kaydedilirken hata: {str(e)}", "FEEDBACK_SAVE_ERROR")
+            for satir_no, _ in yazilacaklar:
+                sonuclar[satir_no] = _hata(satir_no, hata)
+            kaydedilenler = []
+
+        for (satir_no, _), satir in zip(yazilacaklar, kaydedilenler):
+            # Sadece orijinaller indekse girer
+            if satir["duplicate_of"] is None and config.DUPLICATE_MODE != "off":
+                kopya_indeksi.ekle(satir["city_id"], satir["id"], satir["message"], satir["timestamp"])
+            if satir["category"] == BEKLEMEDE_KATEGORISI:
+                kuyruk.bildir(satir["id"])
+            sonuclar[satir_no] = {
+                "line": satir_no,
+                "id": satir["id"],
+                "user": satir["user"],
+                "category": satir["category"],
+                "duplicate_of": satir["duplicate_of"]
+            }
+
+        # collapse: partideki orijinale katlanan satırlar, orijinalin id'sini alır
+        satir_sirasi = {sira: satir_no for sira, (satir_no, _) in enumerate(yazilacaklar)}
+        for satir_no, sonuc in list(sonuclar.items()):
+            if "_orijinal_sira" not in sonuc:
+                continue
+            orijinal = sonuclar[satir_sirasi[sonuc["_orijinal_sira"]]]
+            if "error" in orijinal:
+                sonuclar[satir_no] = {**orijinal, "line": satir_no}
+            else:
+                sonuclar[satir_no] = {
+                    "line": satir_no, "id": orijinal["id"], "duplicate_of": orijinal["id"], "collapsed": True
+                }
+    finally:
+        db.close()
+    return [sonuclar[satir_no] for satir_no, _ in parti]
+
+
+class NdjsonYaniti(StreamingResponse):
+    """
+    İstek gövdesini okurken akıtılan NDJSON yanıtı
+
+    StreamingResponse, ASGI 2.4 öncesi sunucularda yanıt süresince receive()'i
+    bağlantı kopması için dinler; bu dinleyici gövdenin http.request mesajlarını
+    da tüketir ve gövde hiç bitmez. Gövde zaten request.stream() ile okunduğu
+    (kopma orada ClientDisconnect olarak görülür) için dinleyici başlatılmaz.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _json_satiri(nesne: dict) -> bytes:
+    return json.dumps(nesne, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+async def ndjson_yukle(govde: AsyncIterator[bytes], gzipli: bool = False) -> AsyncIterator[bytes]:
+    """
+    İstek gövdesini işle, sonuçları NDJSON satırları olarak üret
+
+    Veritabanı ve sınıflandırma işi threadpool'da yapılır; event loop bloklanmaz.
+    """
+    parti_boyutu = max(1, config.BULK_INGEST_CHUNK_SIZE)
+    ozet = {"lines": 0, "saved": 0, "duplicates": 0, "errors": 0}
+    parti: List[Tuple[int, object]] = []
+
+    async def isle() -> bytes:
+        gecerliler = [(satir_no, kayit) for satir_no, kayit in parti if isinstance(kayit, dict)]
+        kayit_sonuclari = iter(await run_in_threadpool(parti_kaydet, gecerliler) if gecerliler else [])
+        cikti = bytearray()
+        for satir_no, kayit in parti:
+            sonuc = _hata(satir_no, kayit) if isinstance(kayit, SatirHatasi) else next(kayit_sonuclari)
+            ozet["lines"] += 1
+            if "error" in sonuc:
+                ozet["errors"] += 1
+            elif sonuc.get("collapsed"):
+                ozet["duplicates"] += 1
+            else:
+                ozet["saved"] += 1
+                if sonuc["duplicate_of"] is not None:
+                    ozet["duplicates"] += 1
+            cikti += _json_satiri(sonuc)
+        parti.clear()
+        return bytes(cikti)
+
+    try:
+        async for satir_no, ham, hata in satirlar(govde, gzipli, config.BULK_INGEST_MAX_LINE_BYTES):
+            if hata is None:
+                try:
+                    parti.append((satir_no, satir_coz(ham)))
+                except SatirHatasi as e:
+                    parti.append((satir_no, e))
+            else:
+                parti.append((satir_no, hata))
+            if len(parti) >= parti_boyutu:
+                yield await isle()
+        if parti:
+            yield await isle()
+    except zlib.error as e:
+        # Bozuk gzip: o ana kadar okunan satırlar işlenir, kalanı okunamaz
+        if parti:
+            yield await isle()
+        ozet["errors"] += 1
+        yield _json_satiri({"error": f"Gzip gövdesi açılamadı: {str(e)}", "error_code": "INVALID_GZIP"})
+
+    yield _json_satiri({"summary": ozet})
@@ -0,0 +1,279 @@
+"""
+Feedback yazma yolu - sabit sayıda ifadeli tek transaction
+
+Submit isteği (veya toplu yüklemede bir parti) başına veritabanına giden ifadeler:
+1. UPDATE id_counters ... RETURNING  (kullanıcı numaraları; yazma kilidini de alır)
+2. INSERT feedback_categories         (sadece daha önce görülmemiş kategori için)
+3. INSERT city_feedback ... RETURNING (partide tek çok satırlı ifade)
+4. COMMIT
+
+Şehir ve kategori kontrolleri process içi önbellekten yapılır; tablo büyüdükçe
+maliyet değişmez. Kategoriler açılışta değişmez bir haritaya yüklenir; yeni
+kategori eklendiğinde harita kopyalanıp bütün olarak değiştirilir, okuyanlar
+kilit almadan eski veya yeni haritanın tamamını görür. Sayaç artırımı transaction'ın ilk yazmasıdır: SQLite yazmaları
+sıraladığı için eşzamanlı isteklerde (farklı worker process'lerde bile) aynı
+numara iki kez verilmez, transaction geri alınırsa numara da geri alınır.
+
+Yük testi: python -m benchmarks.submit_load
+"""
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+import threading
+import time
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+
+KULLANICI_SAYACI = "feedback_user"
+
+_SAYAC_ARTIR = text(
+    "UPDATE id_counters SET value = value + :adet WHERE name = :ad RETURNING value"
+)
+
+# Başka worker process'lerin eklediği kategoriler en geç bu sürede haritaya girer (saniye)
+KATEGORI_YENILEME_SURESI = 60.0
+
+
+class ReferansOnbellegi:
+    """Şehir adları ve kategori haritası (açılışta veya ilk kullanımda veritabanından yüklenir)"""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._sehirler: Optional[Dict[str, str]] = None
+        # kategori -> açıklama; değişmez, güncellemede bütün olarak değiştirilir
+        self._kategoriler: Optional[Mapping[str, str]] = None
+        self._kategori_zamani = 0.0
+
+    def _kategorileri_oku(self, db: Session) -> Mapping[str, str]:
+        return MappingProxyType(dict(db.execute(
+            select(models.FeedbackCategory.category, models.FeedbackCategory.description)
+            .order_by(models.FeedbackCategory.category)
+        ).all()))
+
+    def _yukle(self, db: Session):
+        sehirler = dict(db.execute(select(models.City.city_id, models.City.name)).all())
+        kategoriler = self._kategorileri_oku(db)
+        with self._kilit:
+            self._sehirler = sehirler
+            self._kategoriler = kategoriler
+            self._kategori_zamani = time.monotonic()
+
+    def yukle(self):
+        """Uygulama açılışında çağrılır - ilk istekler veritabanı okumadan cevaplanır"""
+        db = SessionLocal()
+        try:
+            self._yukle(db)
+        finally:
+            db.close()
+
+    def sehir_adi(self, db: Session, city_id: str) -> Optional[str]:
+        """Şehrin adı, şehir yoksa None"""
+        if self._sehirler is None:
+            self._yukle(db)
+        ad = self._sehirler.get(city_id)
+        if ad is None:
+            # Uygulama açıldıktan sonra eklenmiş olabilir
+            ad = db.execute(
+                select(models.City.name).where(models.City.city_id == city_id)
+            ).scalar()
+            if ad is not None:
+                with self._kilit:
+                    self._sehirler[city_id] = ad
+        return ad
+
+    def kategori_haritasi(self) -> Mapping[str, str]:
+        """
+        Güncel kategori haritası (kategori -> açıklama)
+
+        Dönen harita değişmez; yeni kategori eklenince aynı nesne değil yeni bir
+        harita döner, bu yüzden nesne kimliği sürüm olarak kullanılabilir.
+        """
+        if (
+            self._kategoriler is None
+            or time.monotonic() - self._kategori_zamani > KATEGORI_YENILEME_SURESI
+        ):
+            db = SessionLocal()
+            try:
+                kategoriler = self._kategorileri_oku(db)
+            finally:
+                db.close()
+            with self._kilit:
+                # İçerik aynıysa eski harita kalsın (hazır yanıtlar geçerli kalır)
+                if self._kategoriler is None or dict(self._kategoriler) != dict(kategoriler):
+                    self._kategoriler = kategoriler
+                self._kategori_zamani = time.monotonic()
+        return self._kategoriler
+
+    def kategori_aciklamasi(self, kategori: str) -> Optional[str]:
+        """Kategorinin açıklaması, kategori yoksa None"""
+        aciklama = self.kategori_haritasi().get(kategori)
+        if aciklama is None:
+            # Başka bir worker process eklemiş olabilir
+            db = SessionLocal()
+            try:
+                aciklama = db.execute(
+                    select(models.FeedbackCategory.description)
+                    .where(models.FeedbackCategory.category == kategori)
+                ).scalar()
+            finally:
+                db.close()
+            if aciklama is not None:
+                self._haritaya_ekle({kategori: aciklama})
+        return aciklama
+
+    def _haritaya_ekle(self, yeni: Mapping[str, str]):
+        with self._kilit:
+            harita = dict(self._kategoriler or {})
+            harita.update(yeni)
+            self._kategoriler = MappingProxyType(dict(sorted(harita.items())))
+
+    def kategori_hazirla(self, db: Session, kategori: str):
+        """Kategori haritada yoksa açık transaction içinde oluştur"""
+        if self._kategoriler is None:
+            self._yukle(db)
+        if kategori in self._kategoriler:
+            return
+        db.execute(
+            insert(models.FeedbackCategory)
+            .values(category=kategori, description=f"{kategori} kategorisi için feedback'ler")
+            .prefix_with("OR IGNORE")
+        )
+        # Commit'ten sonra haritaya eklenir (geri alınırsa tekrar denenir)
+        db.info.setdefault("yeni_kategoriler", set()).add(kategori)
+
+    def commit_edildi(self, db: Session):
+        yeni = db.info.pop("yeni_kategoriler", None)
+        if yeni:
+            self._haritaya_ekle(self._aciklamalari_oku(db, yeni))
+
+    def _aciklamalari_oku(self, db: Session, kategoriler: Iterable[str]) -> Dict[str, str]:
+        # INSERT OR IGNORE başka bir process'in kaydını bırakmış olabilir: açıklama tablodan okunur
+        aciklamalar = dict(db.execute(
+            select(models.FeedbackCategory.category, models.FeedbackCategory.description)
+            .where(models.FeedbackCategory.category.in_(list(kategoriler)))
+        ).all())
+        db.commit()
+        return aciklamalar
+
+    def temizle(self):
+        with self._kilit:
+            self._sehirler = None
+            self._kategoriler = None
+
+
+referanslar = ReferansOnbellegi()
+_yazma_kilidi = threading.Lock()
+
+
+def kullanici_numaralari_al(db: Session, adet: int) -> range:
+    """Açık transaction içinde art arda adet kadar kullanıcı numarası ayır"""
+    son = db.execute(_SAYAC_ARTIR, {"ad": KULLANICI_SAYACI, "adet": adet}).scalar_one()
+    return range(son - adet + 1, son + 1)
+
+
+def feedback_toplu_kaydet(db: Session, kayitlar: List[dict]) -> List[dict]:
+    """
+    Feedback'leri tek transaction'da kaydet ve commit et
+
+    Args:
+        kayitlar: city_id, message, category, timestamp ve opsiyonel
+            keyword_version / duplicate_of alanlarını içeren satırlar.
+            duplicate_of_index, orijinali aynı listedeki başka bir satır olan
+            kopyalar içindir (orijinalin listedeki sırası). sonrasi(db, satir),
+            satır eklendikten sonra aynı transaction'da çağrılır (ör. idempotency
+            yanıtı); hata verirse tüm transaction geri alınır.
+
+    Returns:
+        list: Girdi sırasıyla kaydedilen satırların alanları (id ve user eklenmiş)
+    """
+    if not kayitlar:
+        return []
+    # Aynı process'teki yazarlar sırayla girer: SQLite'ın meşgul bekleme döngüsünde
+    # yarışmak yerine kuyrukta beklerler (kuyruk sonu gecikmesi sınırlı kalır).
+    # Kilit beklenirken bağlantı tutulmaz: önceki okumaların bağlantısı havuza
+    # bırakılır, yazma bağlantısı kilit alındıktan sonra alınır. Aksi halde kilidi
+    # tutan istek havuzdan bağlantı beklerken bağlantıları tutanlar kilidi bekler.
+    if db.in_transaction():
+        db.commit()
+    with _yazma_kilidi:
+        try:
+            numaralar = kullanici_numaralari_al(db, len(kayitlar))
+            satirlar = [
+                {
+                    "city_id": kayit["city_id"],
+                    "user": f"user_{numara}",
+                    "message": kayit["message"],
+                    "category": kayit["category"],
+                    "timestamp": kayit["timestamp"],
+                    "keyword_version": kayit.get("keyword_version"),
+                    "duplicate_of": kayit.get("duplicate_of")
+                }
+                for kayit, numara in zip(kayitlar, numaralar)
+            ]
+            for kategori in {satir["category"] for satir in satirlar}:
+                referanslar.kategori_hazirla(db, kategori)
+            # Partideki başka bir satırın kopyası olanlar (duplicate_of_index) orijinalin
+            # id'sini bilmek için ikinci ifadede yazılır
+            bagimli = [i for i, kayit in enumerate(kayitlar) if kayit.get("duplicate_of_index") is not None]
+            bagimsiz = [i for i, kayit in enumerate(kayitlar) if kayit.get("duplicate_of_index") is None]
+            idler = [None] * len(satirlar)
+            for grup in (bagimsiz, bagimli):
+                if not grup:
+                    continue
+                for i in grup:
+                    orijinal = kayitlar[i].get("duplicate_of_index")
+                    if orijinal is not None:
+                        satirlar[i]["duplicate_of"] = idler[orijinal]
+                # Çok satırlı INSERT ... RETURNING (executemany), id'ler girdi sırasıyla döner
+                grup_idleri = db.execute(
+                    insert(models.CityFeedback).returning(
+                        models.CityFeedback.id, sort_by_parameter_order=True
+                    ),
+                    [satirlar[i] for i in grup]
+                ).scalars().all()
+                for i, feedback_id in zip(grup, grup_idleri):
+                    idler[i] = feedback_id
+            for kayit, satir, feedback_id in zip(kayitlar, satirlar, idler):
+                satir["id"] = feedback_id
+                if kayit.get("sonrasi") is not None:
+                    kayit["sonrasi"](db, satir)
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.info.pop("yeni_kategoriler", None)
+            raise
+
+    referanslar.commit_edildi(db)
+    return satirlar
+
+
+def feedback_kaydet(
+    db: Session,
+    city_id: str,
+    mesaj: str,
+    kategori: str,
+    zaman: datetime,
+    anahtar_kelime_surumu: Optional[str] = None,
+    duplicate_of: Optional[int] = None,
+    sonrasi: Optional[Callable[[Session, dict], None]] = None
+) -> dict:
+    """
+    Tek feedback'i kaydet ve commit et (sonrasi: bkz. feedback_toplu_kaydet)
+
+    Returns:
+        dict: Kaydedilen satırın alanları (commit sonrası ek SELECT yapılmaz)
+    """
+    return feedback_toplu_kaydet(db, [{
+        "city_id": city_id,
+        "message": mesaj,
+        "category": kategori,
+        "timestamp": zaman,
+        "keyword_version": anahtar_kelime_surumu,
+        "duplicate_of": duplicate_of,
+        "sonrasi": sonrasi
+    }])[0]
@@ -0,0 +1,269 @@
+"""
+Submit için Idempotency-Key desteği
+
+Mobil istemci ağ hatasında aynı feedback'i tekrar gönderir. İstek bir
+Idempotency-Key header'ı taşıyorsa ilk isteğin yanıtı saklanır, aynı anahtarla
+gelen tekrarlar sınıflandırma ve yazma yapmadan aynı yanıtı alır.
+
+- Kalıcı kayıt idempotency_keys tablosundadır; tüm worker process'ler aynı
+  tabloyu gördüğü için tekrar başka bir worker'a düşse de yakalanır
+- İşlenen anahtar önce yanıtsız olarak ayrılır (birincil anahtar çakışması
+  ikinci isteği durdurur); eşzamanlı tekrar ilk isteğin bitmesini kısa süre
+  bekler, bitmezse 409 alır
+- Yanıt, feedback satırıyla aynı transaction'da yazılır: satır kaydedilip yanıt
+  kaydedilmemiş bir ara durum olmaz. Anahtar bu arada başka bir isteğe
+  devredildiyse yazma (ve satır) geri alınır
+- Tamamlanan yanıtlar process içinde sınırlı bir LRU önbellekte de tutulur
+- Süresi dolan anahtarlar arka plan thread'inde silinir
+
+Anahtar farklı bir istek gövdesiyle tekrar kullanılırsa 422 döner.
+"""
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import config
+from .database import SessionLocal
+
+
+# Yanıtsız (işlenmekte olan) anahtarın tekrarı en fazla bu kadar bekler (saniye)
+_BEKLEME_SURESI = 5.0
+_BEKLEME_ARALIGI = 0.05
+# Bu süreden eski yanıtsız kayıt, ilk istek yarıda kesilmiş sayılır ve devralınır
+_SAHIPSIZ_SURE = 60.0
+
+ANAHTAR_UZUNLUGU = 255
+
+_AYIR = text("""
+    INSERT INTO idempotency_keys(key, request_hash, created_at) VALUES (:anahtar, :ozet, :simdi)
+    ON CONFLICT(key) DO NOTHING
+""")
+_OKU = text("SELECT request_hash, response, created_at FROM idempotency_keys WHERE key = :anahtar")
+# Süresi dolmuş veya sahipsiz kalmış kaydı devral
+_DEVRAL = text("""
+    UPDATE idempotency_keys SET request_hash = :ozet, response = NULL, created_at = :simdi
+    WHERE key = :anahtar AND (created_at < :suresi_dolan OR (response IS NULL AND created_at < :sahipsiz))
+""")
+# Ayırma zamanı (created_at) ayırmanın kimliğidir: devralınan anahtara eski sahibi yazamaz
+_TAMAMLA = text("""
+    UPDATE idempotency_keys SET response = :yanit
+    WHERE key = :anahtar AND request_hash = :ozet AND created_at = :ayrilma AND response IS NULL
+""")
+_BIRAK = text(
+    "DELETE FROM idempotency_keys WHERE key = :anahtar AND created_at = :ayrilma AND response IS NULL"
+)
+_TEMIZLE = text("DELETE FROM idempotency_keys WHERE created_at < :suresi_dolan")
+
+
+# db.info'da bu oturumun ayırdığı anahtarlar: anahtar -> ayırma zamanı
+_AYIRMALAR = "idempotency_ayirmalari"
+
+
+class AnahtarHatasi(Exception):
+    """Anahtar kullanılamıyor - HTTP durum kodu ve hata kodu taşır"""
+
+    def __init__(self, mesaj: str, durum: int, kod: str):
+        super().__init__(mesaj)
+        self.durum = durum
+        self.kod = kod
+
+
+def istek_ozeti(*alanlar) -> str:
+    """Anahtarın hangi istekle kullanıldığını ayırt etmek için gövde özeti"""
+    ham = json.dumps(alanlar, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(ham.encode("utf-8")).hexdigest()
+
+
+class TekrarAnahtarlari:
+    """Idempotency anahtarları: LRU önbellek + idempotency_keys tablosu"""
+
+    def __init__(self, ttl_saniye: float, boyut: int, temizlik_araligi: float):
+        self.ttl = max(1.0, ttl_saniye)
+        self.boyut = max(0, boyut)
+        self.temizlik_araligi = max(1.0, temizlik_araligi)
+        # anahtar -> (son geçerlilik zamanı, istek özeti, yanıt)
+        self._onbellek: "OrderedDict[str, Tuple[float, str, dict]]" = OrderedDict()
+        self._kilit = threading.Lock()
+        self._dur = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sayaclar = {"replays": 0, "conflicts": 0, "expired": 0}
+
+    def _onbellekten(self, anahtar: str) -> Optional[Tuple[str, dict]]:
+        with self._kilit:
+            kayit = self._onbellek.get(anahtar)
+            if kayit is None:
+                return None
+            if kayit[0] < time.time():
+                del self._onbellek[anahtar]
+                return None
+            self._onbellek.move_to_end(anahtar)
+            return kayit[1], kayit[2]
+
+    def _onbellege(self, anahtar: str, ozet: str, yanit: dict, olusturma: float):
+        if not self.boyut:
+            return
+        with self._kilit:
+            self._onbellek[anahtar] = (olusturma + self.ttl, ozet, yanit)
+            self._onbellek.move_to_end(anahtar)
+            while len(self._onbellek) > self.boyut:
+                self._onbellek.popitem(last=False)
+
+    def _tekrar(self, ozet: str, kayitli_ozet: str, yanit: dict) -> dict:
+        if kayitli_ozet != ozet:
+            with self._kilit:
+                self._sayaclar["conflicts"] += 1
+            raise AnahtarHatasi(
+                "Idempotency-Key farklı bir istekle kullanılmış", 422, "IDEMPOTENCY_KEY_REUSED"
+            )
+        with self._kilit:
+            self._sayaclar["replays"] += 1
+        return yanit
+
+    def ayir(self, db: Session, anahtar: str, ozet: str) -> Optional[dict]:
+        """
+        Anahtarı bu istek için ayır
+
+        Returns:
+            dict: Anahtar daha önce tamamlandıysa saklanan yanıt (işlem yapılmaz),
+            None: Anahtar bu isteğe ayrıldı - ayırma zamanı db.info'ya konur
+                (ayrilma_zamani); işlem yanit_yaz ile tamamlanır veya birak çağrılır
+
+        Raises:
+            AnahtarHatasi: Anahtar başka bir gövdeyle kullanılmış (422) veya
+                ilk istek hâlâ işleniyor (409)
+        """
+        if not anahtar or len(anahtar) > ANAHTAR_UZUNLUGU:
+            raise AnahtarHatasi(
+                f"Idempotency-Key 1-{ANAHTAR_UZUNLUGU} karakter olmalı", 400, "INVALID_IDEMPOTENCY_KEY"
+            )
+        kayit = self._onbellekten(anahtar)
+        if kayit is not None:
+            return self._tekrar(ozet, *kayit)
+
+        bitis = time.monotonic() + _BEKLEME_SURESI
+        while True:
+            simdi = time.time()
+            parametreler = {
+                "anahtar": anahtar,
+                "ozet": ozet,
+                "simdi": simdi,
+                "suresi_dolan": simdi - self.ttl,
+                "sahipsiz": simdi - _SAHIPSIZ_SURE
+            }
+            if db.execute(_AYIR, parametreler).rowcount or db.execute(_DEVRAL, parametreler).rowcount:
+                db.commit()
+                db.info.setdefault(_AYIRMALAR, {})[anahtar] = simdi
+                return None
+            satir = db.execute(_OKU, parametreler).first()
+            db.commit()
+            if satir is not None and satir.response is not None:
+                yanit = json.loads(satir.response)
+                self._onbellege(anahtar, satir.request_hash, yanit, satir.created_at)
+                return self._tekrar(ozet, satir.request_hash, yanit)
+            if satir is not None and satir.request_hash != ozet:
+                return self._tekrar(ozet, satir.request_hash, {})
+            if time.monotonic() >= bitis:
+                raise AnahtarHatasi(
+                    "Bu Idempotency-Key ile gönderilen istek hâlâ işleniyor", 409, "IDEMPOTENCY_IN_PROGRESS"
+                )
+            time.sleep(_BEKLEME_ARALIGI)
+
+    def ayrilma_zamani(self, db: Session, anahtar: str) -> float:
+        """ayir'ın bu oturumda anahtarı ayırdığı zaman (yanit_yaz ve birak için)"""
+        return db.info[_AYIRMALAR][anahtar]
+
+    def yanit_yaz(self, db: Session, anahtar: str, ozet: str, ayrilma: float, yanit: dict):
+        """
+        Yanıtı çağıranın transaction'ında sakla - commit çağırana aittir
+
+        Raises:
+            AnahtarHatasi: Anahtar bu ayırmaya ait değil (süresi dolup başka bir
+                isteğe devredilmiş); çağıran transaction'ı geri almalıdır (409)
+        """
+        yazilan = db.execute(_TAMAMLA, {
+            "anahtar": anahtar,
+            "ozet": ozet,
+            "ayrilma": ayrilma,
+            "yanit": json.dumps(yanit, ensure_ascii=False)
+        }).rowcount
+        if not yazilan:
+            raise AnahtarHatasi(
+                "Idempotency-Key başka bir istek tarafından devralınmış", 409, "IDEMPOTENCY_IN_PROGRESS"
+            )
+
+    def tamamlandi(self, anahtar: str, ozet: str, yanit: dict):
+        """yanit_yaz'ın transaction'ı commit edildi: tekrarlar önbellekten yanıtlanır"""
+        self._onbellege(anahtar, ozet, yanit, time.time())
+
+    def birak(self, db: Session, anahtar: str, ayrilma: float):
+        """İşlem başarısız: ayrılan anahtarı sil, tekrar normal işlensin"""
+        db.rollback()
+        db.execute(_BIRAK, {"anahtar": anahtar, "ayrilma": ayrilma})
+        db.commit()
+
+    def temizle(self) -> int:
+        """Süresi dolan anahtarları tablodan ve önbellekten sil"""
+        simdi = time.time()
+        with self._kilit:
+            for anahtar in [a for a, kayit in self._onbellek.items() if kayit[0] < simdi]:
+                del self._onbellek[anahtar]
+        db = SessionLocal()
+        try:
+            silinen = db.execute(_TEMIZLE, {"suresi_dolan": simdi - self.ttl}).rowcount
+            db.commit()
+        finally:
+            db.close()
+        with self._kilit:
+            self._sayaclar["expired"] += silinen
+        return silinen
+
+    def baslat(self):
+        """Süresi dolan anahtarları silen arka plan thread'ini başlat"""
+        if self._thread is not None:
+            return
+        self._dur.clear()
+        self._thread = threading.Thread(target=self._calis, name="idempotency-cleanup", daemon=True)
+        self._thread.start()
+
+    def durdur(self):
+        self._dur.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _calis(self):
+        while not self._dur.wait(self.temizlik_araligi):
+            try:
+                self.temizle()
+            except Exception as e:
+                print(f"❌ Idempotency anahtarları temizlenemedi: {str(e)}")
+
+    def metrikler(self) -> dict:
+        with self._kilit:
+            return {
+                "cached": len(self._onbellek),
+                "max_cached": self.boyut,
+                "ttl_seconds": self.ttl,
+                **self._sayaclar
+            }
+
+
+tekrar_anahtarlari = TekrarAnahtarlari(
+    ttl_saniye=config.IDEMPOTENCY_TTL_SECONDS,
+    boyut=config.IDEMPOTENCY_CACHE_SIZE,
+    temizlik_araligi=config.IDEMPOTENCY_CLEANUP_INTERVAL
+)
+
+
+def temizleyiciyi_baslat():
+    tekrar_anahtarlari.baslat()
+
+
+def temizleyiciyi_durdur():
+    tekrar_anahtarlari.durdur()
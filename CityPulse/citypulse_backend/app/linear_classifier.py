@@ -0,0 +1,292 @@
+"""
+Hash'lenmiş kelime torbası (bag-of-words) doğrusal sınıflandırıcı
+
+Kural tabanlı motora alternatif, etiketli city_feedback satırlarından çevrimdışı
+eğitilen bir softmax (multinomial lojistik) model. Özellikler temizle_metin
+token'ları ve ikili token'lardır; sabit boyutlu bir uzaya crc32 ile hash'lenir,
+böylece kelime sayısı arttıkça skorlama yavaşlamaz. Bir toplu istekteki tüm
+mesajlar tek bir seyrek matris çarpımıyla skorlanır.
+
+CLASSIFIER_ENGINE=linear ile seçilir. Güveni CLASSIFIER_LINEAR_MIN_CONFIDENCE
+altında kalan mesajlar kural tabanlı motora düşer. NumPy/SciPy opsiyoneldir;
+kurulu değilse veya model dosyası yoksa kural tabanlı motor kullanılır.
+
+Eğitim:
+    python train_linear_classifier.py
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Opsiyonel bağımlılık
+    np = None
+    sparse = None
+
+from . import config
+from .feedback_classifier import temizle_metin
+
+
+VARSAYILAN_OZELLIK_BOYUTU = 2 ** 18
+
+
+def ozellik_boyutu_dogrula(ozellik_boyutu: int) -> int:
+    """Hash uzayı boyutu 2'nin kuvveti olmalı (indeksler maske ile alınır)"""
+    if ozellik_boyutu < 2 or ozellik_boyutu & (ozellik_boyutu - 1):
+        raise ValueError(f"Özellik boyutu 2'nin kuvveti olmalı: {ozellik_boyutu}")
+    return ozellik_boyutu
+
+
+def kullanilabilir() -> bool:
+    """NumPy ve SciPy kurulu mu?"""
+    return np is not None and sparse is not None
+
+
+def _ozellik_indeksleri(temiz_mesaj: str, maske: int) -> List[int]:
+    """Token ve ikili token'ların hash indeksleri"""
+    tokenlar = temiz_mesaj.split()
+    indeksler = [zlib.crc32(token.encode('utf-8')) & maske for token in tokenlar]
+    indeksler.extend(
+        zlib.crc32(f"{a} {b}".encode('utf-8')) & maske
+        for a, b in zip(tokenlar, tokenlar[1:])
+    )
+    return indeksler
+
+
+def ozellik_matrisi(mesajlar: Sequence[str], ozellik_boyutu: int):
+    """
+    Mesajları L2 normalize edilmiş seyrek (CSR) özellik matrisine çevir
+
+    Args:
+        mesajlar: Ham mesajlar
+        ozellik_boyutu: Hash uzayı boyutu (2'nin kuvveti)
+    """
+    maske = ozellik_boyutu - 1
+    indptr = [0]
+    indeksler: List[int] = []
+
+    for mesaj in mesajlar:
+        indeksler.extend(_ozellik_indeksleri(temizle_metin(mesaj), maske))
+        indptr.append(len(indeksler))
+
+    veri = np.ones(len(indeksler), dtype=np.float32)
+    matris = sparse.csr_matrix(
+        (veri, np.asarray(indeksler, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(mesajlar), ozellik_boyutu)
+    )
+    matris.sum_duplicates()
+
+    normlar = np.sqrt(matris.multiply(matris).sum(axis=1)).A1
+    normlar[normlar == 0] = 1
+    return sparse.diags(1 / normlar).dot(matris).tocsr().astype(np.float32)
+
+
+def _softmax(skorlar):
+    skorlar = skorlar - skorlar.max(axis=1, keepdims=True)
+    ustel = np.exp(skorlar)
+    return ustel / ustel.sum(axis=1, keepdims=True)
+
+
+class LinearModel:
+    """Eğitilmiş ağırlıklar ve tahmin fonksiyonları"""
+
+    def __init__(self, agirliklar, sapma, kategoriler: List[str], meta: Optional[dict] = None):
+        self.agirliklar = agirliklar  # (ozellik_boyutu, kategori_sayisi) float32
+        self.sapma = sapma            # (kategori_sayisi,) float32
+        self.kategoriler = list(kategoriler)
+        self.ozellik_boyutu = ozellik_boyutu_dogrula(agirliklar.shape[0])
+        self.meta = meta or {}
+        ozet = hashlib.sha1(agirliklar.tobytes() + sapma.tobytes())
+        ozet.update("|".join(self.kategoriler).encode('utf-8'))
+        # city_feedback.keyword_version kolonuna sığacak kısa sürüm
+        self.surum = "lin-" + ozet.hexdigest()[:12]
+
+    def olasiliklar(self, mesajlar: Sequence[str]):
+        """Tüm mesajlar için kategori olasılıkları - tek seyrek matris çarpımı"""
+        ozellikler = ozellik_matrisi(mesajlar, self.ozellik_boyutu)
+        return _softmax(ozellikler @ self.agirliklar + self.sapma)
+
+    def tahmin_et(self, mesajlar: Sequence[str]) -> List[Tuple[str, float, Dict[str, float]]]:
+        """
+        Returns:
+            list: [(kategori, güven 0-100, {kategori: olasılık}), ...]
+        """
+        if not mesajlar:
+            return []
+        olasiliklar = self.olasiliklar(mesajlar)
+        en_iyiler = olasiliklar.argmax(axis=1)
+        return [
+            (
+                self.kategoriler[en_iyi],
+                round(float(satir[en_iyi]) * 100, 2),
+                {k: round(float(p), 4) for k, p in zip(self.kategoriler, satir)}
+            )
+            for en_iyi, satir in zip(en_iyiler, olasiliklar)
+        ]
+
+    def kaydet(self, yol: str):
+        """Sadece sıfır olmayan ağırlık satırlarını sıkıştırılmış .npz olarak yaz"""
+        satirlar = np.flatnonzero(np.any(self.agirliklar != 0, axis=1)).astype(np.int32)
+        np.savez_compressed(
+            yol,
+            satirlar=satirlar,
+            agirliklar=self.agirliklar[satirlar],
+            sapma=self.sapma,
+            kategoriler=np.array(self.kategoriler),
+            ozellik_boyutu=np.array(self.ozellik_boyutu),
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False))
+        )
+
+    @classmethod
+    def yukle(cls, yol: str) -> "LinearModel":
+        with np.load(yol, allow_pickle=False) as dosya:
+            satirlar = dosya["satirlar"]
+            kategoriler = [str(k) for k in dosya["kategoriler"]]
+            agirliklar = np.zeros((int(dosya["ozellik_boyutu"]), len(kategoriler)), dtype=np.float32)
+            agirliklar[satirlar] = dosya["agirliklar"]
+            return cls(
+                agirliklar,
+                dosya["sapma"].astype(np.float32),
+                kategoriler,
+                json.loads(str(dosya["meta"]))
+            )
+
+
+def egit(
+    mesajlar: Sequence[str],
+    etiketler: Sequence[str],
+    ozellik_boyutu: int = VARSAYILAN_OZELLIK_BOYUTU,
+    donem: int = 15,
+    ogrenme_orani: float = 2.0,
+    l2: float = 1e-6,
+    parti_boyutu: int = 256,
+    tohum: int = 42
+) -> LinearModel:
+    """Mini-batch gradyan inişiyle softmax regresyon eğit"""
+    if not kullanilabilir():
+        raise RuntimeError("Doğrusal sınıflandırıcı için numpy ve scipy gerekli")
+    ozellik_boyutu_dogrula(ozellik_boyutu)
+
+    kategoriler = sorted(set(etiketler))
+    kategori_indeksi = {k: i for i, k in enumerate(kategoriler)}
+    ozellikler = ozellik_matrisi(mesajlar, ozellik_boyutu)
+    hedef = np.zeros((len(etiketler), len(kategoriler)), dtype=np.float32)
+    hedef[np.arange(len(etiketler)), [kategori_indeksi[e] for e in etiketler]] = 1
+
+    agirliklar = np.zeros((ozellik_boyutu, len(kategoriler)), dtype=np.float32)
+    sapma = np.zeros(len(kategoriler), dtype=np.float32)
+    rastgele = np.random.default_rng(tohum)
+
+    for _ in range(donem):
+        sira = rastgele.permutation(len(etiketler))
+        for baslangic in range(0, len(sira), parti_boyutu):
+            parti = sira[baslangic:baslangic + parti_boyutu]
+            x = ozellikler[parti]
+            hata = _softmax(x @ agirliklar + sapma) - hedef[parti]
+
+            # Sadece partide geçen özelliklerin ağırlıklarını güncelle (seyrek güncelleme)
+            kolonlar = np.unique(x.indices)
+            gradyan = (x[:, kolonlar].T @ hata) / len(parti)
+            agirliklar[kolonlar] -= ogrenme_orani * (gradyan + l2 * agirliklar[kolonlar])
+            sapma -= ogrenme_orani * hata.mean(axis=0)
+
+    return LinearModel(agirliklar, sapma, kategoriler, {
+        "samples": len(etiketler),
+        "epochs": donem,
+        "features": ozellik_boyutu,
+        "labels": {k: int(hedef[:, i].sum()) for k, i in kategori_indeksi.items()}
+    })
+
+
+# ==================== MOTOR SEÇİMİ ====================
+_model: Optional[LinearModel] = None
+_kilit = threading.Lock()
+_sayaclar = {"linear_decisions": 0, "rule_fallbacks": 0}
+
+
+def motoru_baslat():
+    """CLASSIFIER_ENGINE=linear ise modeli yükle, olmazsa kural motorunda kal"""
+    global _model
+    if config.CLASSIFIER_ENGINE != "linear":
+        return
+    if not kullanilabilir():
+        print("⚠️  CLASSIFIER_ENGINE=linear ama numpy/scipy kurulu değil - kural motoru kullanılıyor")
+        return
+    if not os.path.exists(config.CLASSIFIER_LINEAR_MODEL_PATH):
+        print(f"⚠️  Model dosyası bulunamadı ({config.CLASSIFIER_LINEAR_MODEL_PATH}) - kural motoru kullanılıyor")
+        return
+    try:
+        _model = LinearModel.yukle(config.CLASSIFIER_LINEAR_MODEL_PATH)
+    except ValueError as e:
+        print(f"⚠️  Model dosyası geçersiz ({config.CLASSIFIER_LINEAR_MODEL_PATH}): {e} - kural motoru kullanılıyor")
+        return
+    print(f"✅ Doğrusal sınıflandırıcı yüklendi: {_model.surum}")
+
+
+def aktif_model() -> Optional[LinearModel]:
+    return _model
+
+
+def guvenli_tahminler(mesajlar: Sequence[str]) -> List[Optional[Tuple[str, float, Dict[str, float], str]]]:
+    """
+    Doğrusal modelin yeterince emin olduğu tahminler
+
+    Returns:
+        list: Her mesaj için (kategori, güven, olasılıklar, model sürümü) veya
+              güven eşiğin altındaysa / model yüklü değilse None
+    """
+    model = _model
+    sonuclar: List[Optional[Tuple[str, float, Dict[str, float], str]]] = [None] * len(mesajlar)
+    if model is None:
+        return sonuclar
+
+    # Boş mesajlar her zaman kural motorunda kalır (Öneri, güven 0)
+    dolu = [i for i, mesaj in enumerate(mesajlar) if mesaj and mesaj.strip()]
+    tahminler = model.tahmin_et([mesajlar[i] for i in dolu])
+    for i, (kategori, guven, olasiliklar) in zip(dolu, tahminler):
+        if guven >= config.CLASSIFIER_LINEAR_MIN_CONFIDENCE:
+            sonuclar[i] = (kategori, guven, olasiliklar, model.surum)
+
+    emin = sum(1 for s in sonuclar if s is not None)
+    with _kilit:
+        _sayaclar["linear_decisions"] += emin
+        _sayaclar["rule_fallbacks"] += len(sonuclar) - emin
+    return sonuclar
+
+
+def analiz_sonucu(mesaj: str, tahmin: Tuple[str, float, Dict[str, float], str]) -> dict:
+    """Doğrusal model tahminini kategori_detayli_analiz biçiminde döndür"""
+    kategori, guven, olasiliklar, surum = tahmin
+    return {
+        'kategori': kategori,
+        'guven_skoru': guven,
+        'bulunan_kelimeler': [],
+        'analiz_detayi': {
+            'motor': 'linear',
+            'model_surumu': surum,
+            'olasiliklar': olasiliklar,
+            'mesaj_uzunlugu': len(mesaj),
+            'kelime_sayisi': len(mesaj.split())
+        }
+    }
+
+
+def metrikler() -> dict:
+    with _kilit:
+        sayaclar = dict(_sayaclar)
+    model = _model
+    return {
+        "engine": "linear" if model is not None else "rules",
+        "linear_model": {
+            "version": model.surum,
+            "categories": model.kategoriler,
+            "min_confidence": config.CLASSIFIER_LINEAR_MIN_CONFIDENCE,
+            **model.meta
+        } if model is not None else None,
+        **sayaclar
+    }
@@ -94,7 +94,27 @@ class CityFeedback(Base):
     message = Column(String, nullable=False)
     category = Column(String, ForeignKey("feedback_categories.category", ondelete="CASCADE"), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    keyword_version = Column(String, nullable=True)  # Kategoriyi belirleyen anahtar kelime sürümü
+    duplicate_of = Column(Integer, nullable=True)  # Yakın-kopyası olduğu orijinal feedback id
 
     # İlişkiler
     city = relationship("City", back_populates="feedbacks")
     category_rel = relationship("FeedbackCategory", back_populates="feedbacks")
+
+
+class FeedbackCategoryCount(Base):
+    """Şehir / kategori / gün bazında feedback sayaçları - trigger'larla güncel tutulur"""
+    __tablename__ = "feedback_category_counts"
+
+    city_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class IdCounter(Base):
+    """Atomik artırılan numara sayaçları (ör. feedback kullanıcı numarası)"""
+    __tablename__ = "id_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False)
@@ -0,0 +1,92 @@
+"""
+Liste endpoint'leri için keyset (cursor) sayfalama
+
+offset(skip) SQLite'ta atlanan satırları tek tek okur; derin sayfalar giderek
+yavaşlar. Listeler birincil anahtar sırasıyla döner ve yanıttaki next_cursor son
+satırın anahtarını taşır. Sonraki istek cursor ile gönderildiğinde sorgu
+"anahtar > son anahtar" koşuluyla indeksten kaldığı yerden devam eder.
+
+skip geriye uyumluluk için desteklenir (cursor verilmişse yok sayılır). Sayfa
+boyutu SAYFA_LIMITI ile sınırlıdır.
+
+Önceden tüm satırları döndüren şehir listeleri azalan sırayla sayfalanır
+(azalan=True, "anahtar < son anahtar"): next_cursor'ı bilmeyen istemcinin
+aldığı ilk sayfa en yeni satırlardır.
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+from .utils import cursor_coz, cursor_olustur, error_response
+
+
+SAYFA_LIMITI = 1000
+
+
+def _deger(kolon, ham):
+    """Cursor'daki JSON değerini kolonun Python tipine çevir"""
+    tip = kolon.type.python_type
+    if tip is date:
+        return date.fromisoformat(ham)
+    if not isinstance(ham, tip):
+        raise ValueError(ham)
+    return ham
+
+
+def _konum(cursor: str, kolonlar: list) -> list:
+    try:
+        alanlar = cursor_coz(cursor)
+        return [_deger(kolon, alanlar[kolon.key]) for kolon in kolonlar]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=400,
+            detail=error_response("Geçersiz cursor", "INVALID_CURSOR")
+        )
+
+
+def _json(deger):
+    return deger.isoformat() if isinstance(deger, date) else deger
+
+
+def sayfa_getir(
+    sorgu,
+    kolonlar: list,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    azalan: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    Sorgunun bir sayfasını anahtar sırasıyla getir
+
+    Args:
+        sorgu: Filtreleri uygulanmış ORM sorgusu (sıralamasız)
+        kolonlar: Tekil sıralama anahtarı (ör. [city_id, date] veya [id])
+        cursor: Önceki yanıtın next_cursor değeri
+        azalan: En yeni (en büyük anahtarlı) satırlardan başla
+
+    Returns:
+        tuple: (satırlar, sonraki sayfa varsa next_cursor yoksa None)
+
+    Raises:
+        HTTPException: Cursor çözülemezse 400 INVALID_CURSOR
+    """
+    limit = max(1, min(limit, SAYFA_LIMITI))
+    sorgu = sorgu.order_by(*[kolon.desc() for kolon in kolonlar] if azalan else kolonlar)
+    if cursor:
+        konum = _konum(cursor, kolonlar)
+        sol = kolonlar[0] if len(kolonlar) == 1 else tuple_(*kolonlar)
+        sag = konum[0] if len(kolonlar) == 1 else tuple_(*konum)
+        sorgu = sorgu.filter(sol < sag if azalan else sol > sag)
+    elif skip > 0:
+        sorgu = sorgu.offset(skip)
+
+    satirlar = sorgu.limit(limit + 1).all()
+    sonraki = None
+    if len(satirlar) > limit:
+        satirlar = satirlar[:limit]
+        son = satirlar[-1]
+        sonraki = cursor_olustur(**{kolon.key: _json(getattr(son, kolon.key)) for kolon in kolonlar})
+    return satirlar, sonraki
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import heapq
 
 from ..database import get_db
-from .. import models
-from ..utils import success_response, error_response
+from .. import config, models
+from ..daily_rollup import bos_ozet, ortalama, pencere_ozetleri, sehir_anlik_ozeti
+from ..data_version import SureliOnbellek, SurumluOnbellek, veri_surumu
+from ..utils import success_response, error_response, etagli_yanit, json_serilestir
 
 
 router = APIRouter(
@@ -14,6 +16,54 @@ router = APIRouter(
     tags=["city_statistics"]
 )
 
+# Şehir anlık özetleri: (city_id, başlangıç, bitiş, feedback başlangıcı) -> özet
+sehir_ozeti_onbellegi = SurumluOnbellek(1024)
+
+
+def _feedback_baslangici(gun: Optional[int]) -> Optional[date]:
+    return datetime.now().date() - timedelta(days=gun) if gun else None
+
+
+def sehir_ozeti(db: Session, city_id: str, days: Optional[int] = None) -> Optional[dict]:
+    """
+    Şehrin son 7 günlük anlık özeti - haftalık, özet ve skor endpoint'lerinin ortak girdisi
+    
+    Şehir bilgileri, metrik pencere toplamları ve feedback sayıları tek ifadede
+    okunur. Sonuç (şehir, pencere) başına özet ve şehir veri sürümleriyle
+    önbelleğe alınır; ana ekranın art arda gelen istekleri aynı özeti kullanır,
+    herhangi bir yazma önbelleği boşaltır.
+    
+    Args:
+        days: Feedback sayıları için son kaç gün (None: tüm zamanlar)
+    
+    Returns:
+        dict: sehir_anlik_ozeti alanları, start_date ve end_date - şehir yoksa None
+    """
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=7)
+    feedback_baslangic = _feedback_baslangici(days)
+    
+    anahtar = (city_id, start_date, end_date, feedback_baslangic)
+    surum = veri_surumu(db, "city_daily_rollup", "cities")
+    ozet = sehir_ozeti_onbellegi.getir(anahtar, surum)
+    if ozet is None:
+        ozet = sehir_anlik_ozeti(db, city_id, start_date, end_date, feedback_baslangic)
+        if ozet is None:
+            return None
+        ozet["start_date"], ozet["end_date"] = start_date, end_date
+        sehir_ozeti_onbellegi.koy(anahtar, surum, ozet)
+    return ozet
+
+
+def _sehir_ozeti_veya_404(db: Session, city_id: str, days: Optional[int] = None) -> dict:
+    ozet = sehir_ozeti(db, city_id, days)
+    if ozet is None:
+        raise HTTPException(
+            status_code=404,
+            detail=error_response(f"Şehir ID {city_id} bulunamadı", "CITY_NOT_FOUND")
+        )
+    return ozet
+
 
 @router.get("/{city_id}")
 def get_city_weekly_statistics(city_id: str, db: Session = Depends(get_db)):
@@ -27,85 +77,41 @@ def get_city_weekly_statistics(city_id: str, db: Session = Depends(get_db)):
     - Hava kalitesi (ortalama)
     """
     try:
-        # Şehir var mı kontrol et
-        city = db.query(models.City).filter(models.City.city_id == city_id).first()
-        if not city:
-            raise HTTPException(
-                status_code=404,
-                detail=error_response(f"Şehir ID {city_id} bulunamadı", "CITY_NOT_FOUND")
-            )
+        # Şehir ve son 1 haftanın tüm metrik toplamları ortak anlık özetten
+        ozet = _sehir_ozeti_veya_404(db, city_id)
+        start_date, end_date = ozet["start_date"], ozet["end_date"]
         
-        # Son 1 haftalık tarih aralığını hesapla
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=7)
+        def yuvarla(metrik: str) -> float:
+            deger = ortalama(ozet, metrik)
+            return round(deger, 2) if deger else 0
         
         # ==================== AĞ İSTATİSTİKLERİ ====================
-        stats_query = db.query(
-            func.avg(models.CityStats.signal_strength).label('avg_signal'),
-            func.avg(models.CityStats.traffic_gb).label('avg_traffic'),
-            func.count(models.CityStats.date).label('data_count')
-        ).filter(
-            models.CityStats.city_id == city_id,
-            models.CityStats.date >= start_date,
-            models.CityStats.date <= end_date
-        ).first()
-        
-        avg_signal_strength = round(float(stats_query.avg_signal), 2) if stats_query.avg_signal else 0
-        avg_traffic_gb = round(float(stats_query.avg_traffic), 2) if stats_query.avg_traffic else 0
-        stats_data_count = stats_query.data_count if stats_query.data_count else 0
+        avg_signal_strength = yuvarla("signal_strength")
+        avg_traffic_gb = yuvarla("traffic_gb")
+        stats_data_count = ozet["stats_rows"]
         
         # ==================== PAYCELL İSTATİSTİKLERİ ====================
-        paycell_query = db.query(
-            func.avg(models.PaycellStats.transactions_count).label('avg_transactions'),
-            func.avg(models.PaycellStats.total_amount).label('avg_amount'),
-            func.count(models.PaycellStats.date).label('data_count')
-        ).filter(
-            models.PaycellStats.city_id == city_id,
-            models.PaycellStats.date >= start_date,
-            models.PaycellStats.date <= end_date
-        ).first()
-        
-        avg_daily_transactions = round(float(paycell_query.avg_transactions), 2) if paycell_query.avg_transactions else 0
-        avg_daily_amount = round(float(paycell_query.avg_amount), 2) if paycell_query.avg_amount else 0
-        paycell_data_count = paycell_query.data_count if paycell_query.data_count else 0
+        avg_daily_transactions = yuvarla("transactions_count")
+        avg_daily_amount = yuvarla("total_amount")
+        paycell_data_count = ozet["paycell_rows"]
         
         # ==================== HAVA DURUMU İSTATİSTİKLERİ ====================
-        weather_query = db.query(
-            func.avg(models.CityWeather.temp_c).label('avg_temp'),
-            func.avg(models.CityWeather.air_quality).label('avg_air_quality'),
-            func.count(models.CityWeather.date).label('data_count')
-        ).filter(
-            models.CityWeather.city_id == city_id,
-            models.CityWeather.date >= start_date,
-            models.CityWeather.date <= end_date
-        ).first()
-        
-        avg_temperature = round(float(weather_query.avg_temp), 2) if weather_query.avg_temp else 0
-        avg_air_quality = round(float(weather_query.avg_air_quality), 2) if weather_query.avg_air_quality else 0
-        weather_data_count = weather_query.data_count if weather_query.data_count else 0
+        avg_temperature = yuvarla("temp_c")
+        avg_air_quality = yuvarla("air_quality")
+        weather_data_count = ozet["weather_rows"]
         
         # ==================== SKORLAR ====================
-        scores_query = db.query(
-            func.avg(models.CityScore.eco_score).label('avg_eco_score'),
-            func.avg(models.CityScore.alerts_count).label('avg_alerts'),
-            func.count(models.CityScore.date).label('data_count')
-        ).filter(
-            models.CityScore.city_id == city_id,
-            models.CityScore.date >= start_date,
-            models.CityScore.date <= end_date
-        ).first()
-        
-        avg_eco_score = round(float(scores_query.avg_eco_score), 2) if scores_query.avg_eco_score else 0
-        avg_alerts = round(float(scores_query.avg_alerts), 2) if scores_query.avg_alerts else 0
-        scores_data_count = scores_query.data_count if scores_query.data_count else 0
+        avg_eco_score = yuvarla("eco_score")
+        avg_alerts = yuvarla("alerts_count")
+        scores_data_count = ozet["scores_rows"]
         
         # ==================== RESPONSE HAZIRLA ====================
         response_data = {
             "city_info": {
-                "city_id": city.city_id,
-                "name": city.name,
-                "region": city.region,
-                "population": city.population
+                "city_id": ozet["city_id"],
+                "name": ozet["name"],
+                "region": ozet["region"],
+                "population": ozet["population"]
             },
             "period": {
                 "start_date": str(start_date),
@@ -148,7 +154,7 @@ def get_city_weekly_statistics(city_id: str, db: Session = Depends(get_db)):
         
         return success_response(
             data=response_data,
-            message=f"{city.name} şehri için son 7 günlük istatistikler hesaplandı"
+            message=f"{ozet['name']} şehri için son 7 günlük istatistikler hesaplandı"
         )
         
     except HTTPException:
@@ -166,45 +172,16 @@ def get_city_statistics_summary(city_id: str, db: Session = Depends(get_db)):
     Şehir için özet istatistikler - Flutter için optimize edilmiş basit format
     """
     try:
-        # Şehir var mı kontrol et
-        city = db.query(models.City).filter(models.City.city_id == city_id).first()
-        if not city:
-            raise HTTPException(
-                status_code=404,
-                detail=error_response(f"Şehir ID {city_id} bulunamadı", "CITY_NOT_FOUND")
-            )
-        
-        # Son 1 hafta
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=7)
-        
-        # Ortalama sinyal gücü
-        avg_signal = db.query(func.avg(models.CityStats.signal_strength)).filter(
-            models.CityStats.city_id == city_id,
-            models.CityStats.date >= start_date
-        ).scalar()
-        
-        # İnternet kullanımı
-        avg_traffic = db.query(func.avg(models.CityStats.traffic_gb)).filter(
-            models.CityStats.city_id == city_id,
-            models.CityStats.date >= start_date
-        ).scalar()
-        
-        # Paycell işlemleri
-        avg_transactions = db.query(func.avg(models.PaycellStats.transactions_count)).filter(
-            models.PaycellStats.city_id == city_id,
-            models.PaycellStats.date >= start_date
-        ).scalar()
-        
-        # Hava kalitesi
-        avg_air = db.query(func.avg(models.CityWeather.air_quality)).filter(
-            models.CityWeather.city_id == city_id,
-            models.CityWeather.date >= start_date
-        ).scalar()
+        # Son 1 hafta - haftalık istatistiklerle aynı anlık özet
+        ozet = _sehir_ozeti_veya_404(db, city_id)
+        avg_signal = ortalama(ozet, "signal_strength")
+        avg_traffic = ortalama(ozet, "traffic_gb")
+        avg_transactions = ortalama(ozet, "transactions_count")
+        avg_air = ortalama(ozet, "air_quality")
         
         return success_response(
             data={
-                "city_name": city.name,
+                "city_name": ozet["name"],
                 "avg_signal_strength": round(float(avg_signal), 2) if avg_signal else 0,
                 "avg_internet_usage_gb": round(float(avg_traffic), 2) if avg_traffic else 0,
                 "avg_daily_transactions": round(float(avg_transactions), 2) if avg_transactions else 0,
@@ -259,55 +236,90 @@ def calculate_city_sustainability_score(
     return round(score, 2)
 
 
+def feedback_sayilari(
+    db: Session,
+    city_ids: Optional[List[str]] = None,
+    gun: Optional[int] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Şehirlerin (toplam, çevre) feedback sayıları
+    
+    city_feedback yerine city_daily_rollup özetlerinden okunur; maliyet
+    feedback sayısıyla değil şehir x gün sayısıyla büyür.
+    Yakın-kopyalar sayılmaz.
+    
+    Args:
+        city_ids: Sadece bu şehirler (None: tüm şehirler)
+        gun: Son kaç günün feedback'leri (None: tüm zamanlar)
+    
+    Returns:
+        dict: {city_id: (toplam, çevre)} - özeti olmayan şehirler yer almaz
+    """
+    baslangic = _feedback_baslangici(gun)
+    city_id = city_ids[0] if city_ids is not None and len(city_ids) == 1 else None
+    ozetler = pencere_ozetleri(db, baslangic or date.min, feedback_baslangic=baslangic, city_id=city_id)
+    return {
+        sehir: (ozet["feedback_count"], ozet["eco_feedback_count"])
+        for sehir, ozet in ozetler.items()
+        if city_ids is None or sehir in city_ids
+    }
+
+
+def sehir_skor_girdileri(
+    db: Session,
+    baslangic: date,
+    gun: Optional[int] = None
+) -> List[Tuple[Any, float, float, float, int, int]]:
+    """
+    Tüm şehirlerin skor girdileri sabit sayıda sorguda
+    
+    Metrik ortalamaları ve feedback sayıları city_daily_rollup'tan şehir
+    bazında gruplanarak tek sorguda okunur; sorgu sayısı şehir sayısından
+    bağımsızdır.
+    
+    Args:
+        baslangic: Metrik ortalamalarının başlangıç tarihi
+        gun: Çevre mesaj oranı için son kaç gün (None: tüm zamanlar)
+    
+    Returns:
+        list: (şehir, ort. sinyal, ort. hava kalitesi, ort. trafik, toplam feedback,
+            çevre feedback) - verisi olmayan değerler 0
+    """
+    ozetler = pencere_ozetleri(db, baslangic, feedback_baslangic=_feedback_baslangici(gun))
+    girdiler = []
+    for city in db.query(models.City).all():
+        ozet = ozetler.get(city.city_id) or bos_ozet()
+        girdiler.append((
+            city,
+            float(ortalama(ozet, "signal_strength") or 0),
+            float(ortalama(ozet, "air_quality") or 0),
+            float(ortalama(ozet, "traffic_gb") or 0),
+            ozet["feedback_count"],
+            ozet["eco_feedback_count"]
+        ))
+    return girdiler
+
+
 @router.get("/{city_id}/sustainability-score")
-def get_city_sustainability_score(city_id: str, db: Session = Depends(get_db)):
+def get_city_sustainability_score(
+    city_id: str,
+    days: Optional[int] = Query(None, ge=1, description="Çevre mesaj oranı için son kaç gün (boş: tüm zamanlar)"),
+    db: Session = Depends(get_db)
+):
     """
     Belirli bir şehir için City Sustainability Score hesapla (0-100)
     
     Formül: (sinyal + hava_kalitesi + hız + çevre_mesaj_oranı) / 4
     """
     try:
-        # Şehir var mı kontrol et
-        city = db.query(models.City).filter(models.City.city_id == city_id).first()
-        if not city:
-            raise HTTPException(
-                status_code=404,
-                detail=error_response(f"Şehir ID {city_id} bulunamadı", "CITY_NOT_FOUND")
-            )
-        
-        # Son 1 hafta
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=7)
-        
-        # 1. Ortalama sinyal gücü
-        avg_signal = db.query(func.avg(models.CityStats.signal_strength)).filter(
-            models.CityStats.city_id == city_id,
-            models.CityStats.date >= start_date
-        ).scalar() or 0
-        
-        # 2. Ortalama hava kalitesi
-        avg_air_quality = db.query(func.avg(models.CityWeather.air_quality)).filter(
-            models.CityWeather.city_id == city_id,
-            models.CityWeather.date >= start_date
-        ).scalar() or 0
-        
-        # 3. Ortalama internet trafiği (hız göstergesi)
-        avg_traffic = db.query(func.avg(models.CityStats.traffic_gb)).filter(
-            models.CityStats.city_id == city_id,
-            models.CityStats.date >= start_date
-        ).scalar() or 0
-        
-        # 4. Çevre mesaj oranı hesapla
-        # Toplam feedback sayısı
-        total_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-            models.CityFeedback.city_id == city_id
-        ).scalar() or 0
-        
-        # Çevre kategorisindeki feedback sayısı
-        eco_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-            models.CityFeedback.city_id == city_id,
-            models.CityFeedback.category.in_(['Çevre', 'Yeşil', 'Sürdürülebilirlik', 'Enerji'])
-        ).scalar() or 0
+        # Son 1 haftanın metrik ortalamaları ve çevre mesaj oranı (yakın-kopyalar
+        # sayılmaz) anlık özetten; days verilmezse haftalık istatistiklerle aynı özet
+        ozet = _sehir_ozeti_veya_404(db, city_id, days)
+        start_date, end_date = ozet["start_date"], ozet["end_date"]
+        avg_signal = ortalama(ozet, "signal_strength") or 0
+        avg_air_quality = ortalama(ozet, "air_quality") or 0
+        avg_traffic = ortalama(ozet, "traffic_gb") or 0
+        total_feedback, eco_feedback = ozet["feedback_count"], ozet["eco_feedback_count"]
         
         # Oran hesapla (0-100)
         eco_feedback_ratio = (eco_feedback / total_feedback * 100) if total_feedback > 0 else 0
@@ -322,8 +334,8 @@ def get_city_sustainability_score(city_id: str, db: Session = Depends(get_db)):
         
         return success_response(
             data={
-                "city_id": city.city_id,
-                "city_name": city.name,
+                "city_id": ozet["city_id"],
+                "city_name": ozet["name"],
                 "sustainability_score": sustainability_score,
                 "score_details": {
                     "signal_strength": round(float(avg_signal), 2),
@@ -333,14 +345,15 @@ def get_city_sustainability_score(city_id: str, db: Session = Depends(get_db)):
                 },
                 "feedback_info": {
                     "total_feedbacks": total_feedback,
-                    "eco_feedbacks": eco_feedback
+                    "eco_feedbacks": eco_feedback,
+                    "window_days": days
                 },
                 "period": {
                     "start_date": str(start_date),
                     "end_date": str(end_date)
                 }
             },
-            message=f"{city.name} için sürdürülebilirlik skoru: {sustainability_score}/100"
+            message=f"{ozet['name']} için sürdürülebilirlik skoru: {sustainability_score}/100"
         )
         
     except HTTPException:
@@ -352,101 +365,100 @@ def get_city_sustainability_score(city_id: str, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/leaderboard/green-cities")
-def get_green_cities_leaderboard(db: Session = Depends(get_db)):
+def liderlik_tablosu_hesapla(db: Session, bugun: date, days: Optional[int] = None, limit: int = 3) -> dict:
     """
-    Haftanın Yeşil Şehri - En yüksek sürdürülebilirlik skoruna sahip 3 şehir
+    En yüksek sürdürülebilirlik skoruna sahip şehirler (response gövdesi)
     
-    Tüm şehirler için City Sustainability Score hesaplanır ve en yüksek 3 tanesi döndürülür.
+    Tüm şehirlerin skor girdileri tek sorguda okunur, skorlanır ve en yüksek
+    limit kadarı heap ile seçilir.
     """
-    try:
-        # Son 1 hafta
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=7)
-        
-        # Tüm şehirleri getir
-        cities = db.query(models.City).all()
-        
-        city_scores = []
-        
-        for city in cities:
-            # Her şehir için istatistikleri hesapla
-            avg_signal = db.query(func.avg(models.CityStats.signal_strength)).filter(
-                models.CityStats.city_id == city.city_id,
-                models.CityStats.date >= start_date
-            ).scalar() or 0
-            
-            avg_air_quality = db.query(func.avg(models.CityWeather.air_quality)).filter(
-                models.CityWeather.city_id == city.city_id,
-                models.CityWeather.date >= start_date
-            ).scalar() or 0
-            
-            avg_traffic = db.query(func.avg(models.CityStats.traffic_gb)).filter(
-                models.CityStats.city_id == city.city_id,
-                models.CityStats.date >= start_date
-            ).scalar() or 0
-            
-            total_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-                models.CityFeedback.city_id == city.city_id
-            ).scalar() or 0
-            
-            eco_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-                models.CityFeedback.city_id == city.city_id,
-                models.CityFeedback.category.in_(['Çevre', 'Yeşil', 'Sürdürülebilirlik', 'Enerji'])
-            ).scalar() or 0
-            
-            eco_feedback_ratio = (eco_feedback / total_feedback * 100) if total_feedback > 0 else 0
-            
-            # Skor hesapla
-            score = calculate_city_sustainability_score(
-                signal_strength=float(avg_signal),
-                air_quality=float(avg_air_quality),
-                traffic_gb=float(avg_traffic),
-                eco_feedback_ratio=eco_feedback_ratio
-            )
-            
-            city_scores.append({
-                "city_id": city.city_id,
-                "city_name": city.name,
-                "region": city.region,
-                "population": city.population,
-                "sustainability_score": score,
-                "score_breakdown": {
-                    "signal_strength": round(float(avg_signal), 2),
-                    "air_quality": round(float(avg_air_quality), 2),
-                    "internet_traffic": round(float(avg_traffic), 2),
-                    "eco_feedback_ratio": round(eco_feedback_ratio, 2)
-                }
-            })
-        
-        # Skora göre sırala (en yüksekten en düşüğe)
-        city_scores.sort(key=lambda x: x['sustainability_score'], reverse=True)
-        
-        # En iyi 3 şehri al
-        top_3_cities = city_scores[:3]
+    # Son 1 hafta
+    end_date = bugun
+    start_date = end_date - timedelta(days=7)
+    
+    city_scores = []
+    for city, avg_signal, avg_air_quality, avg_traffic, total_feedback, eco_feedback in sehir_skor_girdileri(
+        db, start_date, days
+    ):
+        eco_feedback_ratio = (eco_feedback / total_feedback * 100) if total_feedback > 0 else 0
         
-        # Sıralama ekle
-        for idx, city_data in enumerate(top_3_cities, start=1):
-            city_data['rank'] = idx
-            if idx == 1:
-                city_data['badge'] = '🥇 Haftanın En Yeşil Şehri'
-            elif idx == 2:
-                city_data['badge'] = '🥈 İkinci'
-            elif idx == 3:
-                city_data['badge'] = '🥉 Üçüncü'
+        # Skor hesapla
+        score = calculate_city_sustainability_score(
+            signal_strength=avg_signal,
+            air_quality=avg_air_quality,
+            traffic_gb=avg_traffic,
+            eco_feedback_ratio=eco_feedback_ratio
+        )
         
-        return success_response(
-            data={
-                "week_period": {
-                    "start_date": str(start_date),
-                    "end_date": str(end_date)
-                },
-                "top_3_green_cities": top_3_cities,
-                "all_cities_count": len(cities),
-                "evaluated_cities_count": len(city_scores)
+        city_scores.append({
+            "city_id": city.city_id,
+            "city_name": city.name,
+            "region": city.region,
+            "population": city.population,
+            "sustainability_score": score,
+            "score_breakdown": {
+                "signal_strength": round(avg_signal, 2),
+                "air_quality": round(avg_air_quality, 2),
+                "internet_traffic": round(avg_traffic, 2),
+                "eco_feedback_ratio": round(eco_feedback_ratio, 2)
+            }
+        })
+    
+    # En yüksek skorlu şehirler (eşit skorda şehir sırası korunur)
+    top_cities = heapq.nlargest(limit, city_scores, key=lambda x: x['sustainability_score'])
+    
+    # Sıralama ekle
+    for idx, city_data in enumerate(top_cities, start=1):
+        city_data['rank'] = idx
+        if idx == 1:
+            city_data['badge'] = '🥇 Haftanın En Yeşil Şehri'
+        elif idx == 2:
+            city_data['badge'] = '🥈 İkinci'
+        elif idx == 3:
+            city_data['badge'] = '🥉 Üçüncü'
+    
+    return success_response(
+        data={
+            "week_period": {
+                "start_date": str(start_date),
+                "end_date": str(end_date)
             },
-            message="Haftanın en yeşil 3 şehri"
+            # Anahtar adı geriye uyumluluk için; limit verilirse o kadar şehir içerir
+            "top_3_green_cities": top_cities,
+            "all_cities_count": len(city_scores),
+            "evaluated_cities_count": len(city_scores)
+        },
+        message=f"Haftanın en yeşil {len(top_cities)} şehri"
+    )
+
+
+# Serileştirilmiş liderlik tablosu yanıtları: (days, limit) -> (JSON bytes, ETag)
+liderlik_onbellegi = SureliOnbellek(config.LEADERBOARD_CACHE_TTL, config.LEADERBOARD_STALE_SECONDS)
+
+
+@router.get("/leaderboard/green-cities")
+def get_green_cities_leaderboard(
+    request: Request,
+    days: Optional[int] = Query(None, ge=1, description="Çevre mesaj oranı için son kaç gün (boş: tüm zamanlar)"),
+    limit: int = Query(3, ge=1, le=100, description="Döndürülecek şehir sayısı"),
+    db: Session = Depends(get_db)
+):
+    """
+    Haftanın Yeşil Şehri - En yüksek sürdürülebilirlik skoruna sahip şehirler (varsayılan 3)
+    
+    Sonuç process içinde önbelleğe alınır; metrik/feedback yazmaları (özet ve
+    şehir veri sürümleri), gün değişimi veya TTL ile geçersiz olur. Yeniden
+    hesaplama sürerken diğer istekler bayat sonucu alır. ETag ile If-None-Match
+    gönderen istemciye veri değişmediyse 304 döner.
+    """
+    try:
+        bugun = datetime.now().date()
+        surum = veri_surumu(db, "city_daily_rollup", "cities")
+        icerik, etag = liderlik_onbellegi.getir(
+            (days, limit), surum, bugun,
+            lambda: json_serilestir(liderlik_tablosu_hesapla(db, bugun, days, limit))
         )
+        return etagli_yanit(request, icerik, etag)
         
     except Exception as e:
         raise HTTPException(
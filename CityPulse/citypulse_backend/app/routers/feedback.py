@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import hmac
+import re
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, Callable, Dict, List, Optional, Tuple
 
 from ..database import get_db
-from .. import models, schemas
-from ..utils import success_response, error_response
-from ..feedback_classifier import kategori_bul, kategori_detayli_analiz
+from .. import config, models, schemas
+from ..utils import (
+    success_response, error_response, cursor_olustur, cursor_coz, etagli_yanit, json_serilestir
+)
+from ..classifier_pool import havuz, analiz_et, toplu_analiz_et
+from ..classification_queue import BEKLEMEDE_KATEGORISI, kuyruk
+from ..data_version import SurumluOnbellek, veri_surumu
+from ..duplicate_index import kopya_indeksi
+from ..feedback_classifier import anahtar_kelime_surumu, indeksi_yenile
+from ..feedback_ingest import NdjsonYaniti, ndjson_yukle
+from ..feedback_service import referanslar
+from ..idempotency import AnahtarHatasi, istek_ozeti, tekrar_anahtarlari
+from ..pagination import SAYFA_LIMITI, sayfa_getir
+from ..write_buffer import yazma_tamponu
+from .. import linear_classifier
 
 
 router = APIRouter(
@@ -23,10 +38,25 @@ class FeedbackFromFlutter(BaseModel):
     timestamp: Optional[str] = Field(None, description="Zaman damgası (opsiyonel)")
 
 
+# Tek istekte sınıflandırılabilecek en fazla mesaj sayısı
+TOPLU_SINIFLANDIRMA_LIMITI = 10000
+
+
+class FeedbackClassifyBatch(BaseModel):
+    """Toplu sınıflandırma isteği"""
+    messages: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=TOPLU_SINIFLANDIRMA_LIMITI,
+        description=f"Sınıflandırılacak mesajlar (en fazla {TOPLU_SINIFLANDIRMA_LIMITI})"
+    )
+
+
 @router.post("/submit")
 def submit_feedback_from_flutter(
     feedback: FeedbackFromFlutter,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Annotated[Optional[str], Header()] = None
 ):
     """
     Flutter'dan feedback al, kategoriyi otomatik belirle ve veritabanına kaydet
@@ -40,13 +70,59 @@ def submit_feedback_from_flutter(
     
     Backend otomatik olarak:
     - Kategoriyi belirler (Trafik, Çevre, Bağlantı, Öneri)
-    - User ID'yi oluşturur
-    - Veritabanına kaydeder
+    - User ID'yi atomik sayaçtan oluşturur
+    - Veritabanına tek transaction'da kaydeder
+    
+    CLASSIFIER_ASYNC açıksa mesaj "Beklemede" kategorisiyle kaydedilir ve
+    kategori arka plan kuyruğunda belirlenir.
+    
+    Aynı şehirde yakın zamanda çok benzer bir mesaj varsa (DUPLICATE_MODE):
+    - flag: kayıt duplicate_of ile orijinale bağlanır
+    - collapse: yeni kayıt oluşturulmaz, orijinal feedback döndürülür
+    
+    Idempotency-Key header'ı gönderilirse aynı anahtarla gelen tekrarlar yeni
+    kayıt oluşturmadan ilk yanıtı alır (IDEMPOTENCY_TTL_SECONDS boyunca).
+    """
+    if idempotency_key is None:
+        return _feedback_isle(feedback, db)
+    
+    ozet = istek_ozeti(feedback.city_id, feedback.message, feedback.timestamp)
+    try:
+        kayitli = tekrar_anahtarlari.ayir(db, idempotency_key, ozet)
+    except AnahtarHatasi as e:
+        raise HTTPException(status_code=e.durum, detail=error_response(str(e), e.kod))
+    if kayitli is not None:
+        return kayitli
+    
+    ayrilma = tekrar_anahtarlari.ayrilma_zamani(db, idempotency_key)
+    
+    def yanit_kaydet(yazma_db: Session, yanit: dict):
+        tekrar_anahtarlari.yanit_yaz(yazma_db, idempotency_key, ozet, ayrilma, yanit)
+    
+    try:
+        yanit = _feedback_isle(feedback, db, yanit_kaydet)
+    except BaseException:
+        tekrar_anahtarlari.birak(db, idempotency_key, ayrilma)
+        raise
+    tekrar_anahtarlari.tamamlandi(idempotency_key, ozet, yanit)
+    return yanit
+
+
+def _feedback_isle(
+    feedback: FeedbackFromFlutter,
+    db: Session,
+    yanit_kaydet: Optional[Callable[[Session, dict], None]] = None
+) -> dict:
+    """
+    Submit'in asıl işi: doğrula, sınıflandır, kaydet ve yanıtı oluştur
+    
+    yanit_kaydet verilirse yanıt, feedback satırıyla aynı transaction'da
+    (yazan oturumla) ona verilir; yeni kayıt oluşturulmadıysa ayrı commit edilir.
     """
     try:
-        # 1. Şehir var mı kontrol et
-        city = db.query(models.City).filter(models.City.city_id == feedback.city_id).first()
-        if not city:
+        # 1. Şehir var mı kontrol et (process içi önbellek)
+        city_name = referanslar.sehir_adi(db, feedback.city_id)
+        if city_name is None:
             raise HTTPException(
                 status_code=404,
                 detail=error_response(
@@ -55,29 +131,44 @@ def submit_feedback_from_flutter(
                 )
             )
         
-        # 2. Mesajdan kategori belirle (Kural tabanlı NLP)
-        kategori_analizi = kategori_detayli_analiz(feedback.message)
-        belirlenen_kategori = kategori_analizi['kategori']
-        
-        # 3. Kategori veritabanında var mı kontrol et, yoksa oluştur
-        category_obj = db.query(models.FeedbackCategory).filter(
-            models.FeedbackCategory.category == belirlenen_kategori
-        ).first()
+        # 2. Yakın-kopya kontrolü (şehrin son feedback'leri, bellek içi LSH indeksi)
+        kopya = None
+        if config.DUPLICATE_MODE != "off":
+            kopya = kopya_indeksi.bul(feedback.city_id, feedback.message)
         
-        if not category_obj:
-            # Kategori yoksa oluştur
-            category_obj = models.FeedbackCategory(
-                category=belirlenen_kategori,
-                description=f"{belirlenen_kategori} kategorisi için feedback'ler"
-            )
-            db.add(category_obj)
-            db.commit()
+        if kopya is not None and config.DUPLICATE_MODE == "collapse":
+            orijinal = db.get(models.CityFeedback, kopya[0])
+            if orijinal is not None:
+                yanit = success_response(
+                    data={
+                        "id": orijinal.id,
+                        "city_id": orijinal.city_id,
+                        "city_name": city_name,
+                        "user": orijinal.user,
+                        "message": orijinal.message,
+                        "category": orijinal.category,
+                        "timestamp": str(orijinal.timestamp),
+                        "duplicate_of": orijinal.id,
+                        "duplicate_similarity": round(kopya[1], 3)
+                    },
+                    message="Benzer bir feedback zaten kayıtlı, yeni kayıt oluşturulmadı"
+                )
+                if yanit_kaydet is not None:
+                    yanit_kaydet(db, yanit)
+                    db.commit()
+                return yanit
+            kopya = None
         
-        # 4. Otomatik user ID oluştur (feedback sayısına göre)
-        feedback_count = db.query(models.CityFeedback).count()
-        auto_user = f"user_{feedback_count + 1}"
+        # 3. Mesajdan kategori belirle (Kural tabanlı NLP)
+        #    Asenkron modda sınıflandırma arka plan kuyruğuna bırakılır
+        if config.CLASSIFIER_ASYNC:
+            kategori_analizi, anahtar_kelime_surum = None, None
+            belirlenen_kategori = BEKLEMEDE_KATEGORISI
+        else:
+            kategori_analizi, anahtar_kelime_surum = analiz_et(feedback.message)
+            belirlenen_kategori = kategori_analizi['kategori']
         
-        # 5. Timestamp'i işle
+        # 4. Timestamp'i işle
         if feedback.timestamp:
             try:
                 # String'den datetime'a çevir
@@ -93,38 +184,72 @@ def submit_feedback_from_flutter(
         else:
             feedback_timestamp = datetime.now()
         
-        # 6. Feedback'i veritabanına kaydet
-        new_feedback = models.CityFeedback(
+        # Response kaydedilen satırdan oluşturulur (saklanan idempotency yanıtı da aynıdır)
+        def yanit_olustur(new_feedback: dict) -> dict:
+            data = {
+                "id": new_feedback["id"],
+                "city_id": new_feedback["city_id"],
+                "city_name": city_name,
+                "user": new_feedback["user"],
+                "message": new_feedback["message"],
+                "category": new_feedback["category"],
+                "timestamp": str(new_feedback["timestamp"]),
+                "duplicate_of": new_feedback["duplicate_of"]
+            }
+            if kopya is not None:
+                data["duplicate_similarity"] = round(kopya[1], 3)
+            
+            if kategori_analizi is None:
+                data["category_analysis"] = {"status": "pending"}
+                return success_response(
+                    data=data,
+                    message="Feedback kaydedildi, kategori arka planda belirlenecek"
+                )
+            
+            data["category_analysis"] = {
+                "detected_category": belirlenen_kategori,
+                "confidence_score": kategori_analizi['guven_skoru'],
+                "matched_keywords": kategori_analizi['bulunan_kelimeler'][:5],
+                "keyword_version": new_feedback["keyword_version"]
+            }
+            return success_response(
+                data=data,
+                message="Feedback başarıyla kaydedildi ve kategorize edildi"
+            )
+        
+        sonrasi = None
+        if yanit_kaydet is not None:
+            def sonrasi(yazma_db: Session, satir: dict):
+                yanit_kaydet(yazma_db, yanit_olustur(satir))
+        
+        # 5. Tek transaction: kullanıcı numarası, (gerekirse) kategori, feedback ve
+        #    (Idempotency-Key varsa) saklanan yanıt
+        #    FEEDBACK_GROUP_COMMIT açıksa diğer isteklerle aynı commit'te yazılır
+        new_feedback = yazma_tamponu.kaydet(
+            db,
             city_id=feedback.city_id,
-            user=auto_user,
-            message=feedback.message,
-            category=belirlenen_kategori,
-            timestamp=feedback_timestamp
+            mesaj=feedback.message,
+            kategori=belirlenen_kategori,
+            zaman=feedback_timestamp,
+            anahtar_kelime_surumu=anahtar_kelime_surum,
+            duplicate_of=kopya[0] if kopya else None,
+            sonrasi=sonrasi
         )
         
-        db.add(new_feedback)
-        db.commit()
-        db.refresh(new_feedback)
+        # Sadece orijinaller indekse girer - kopyalar hep ilk mesaja bağlanır
+        if kopya is None and config.DUPLICATE_MODE != "off":
+            kopya_indeksi.ekle(
+                new_feedback["city_id"], new_feedback["id"], new_feedback["message"], new_feedback["timestamp"]
+            )
+        if kategori_analizi is None:
+            kuyruk.bildir(new_feedback["id"])
         
-        # 7. Response döndür
-        return success_response(
-            data={
-                "id": new_feedback.id,
-                "city_id": new_feedback.city_id,
-                "city_name": city.name,
-                "user": new_feedback.user,
-                "message": new_feedback.message,
-                "category": new_feedback.category,
-                "timestamp": str(new_feedback.timestamp),
-                "category_analysis": {
-                    "detected_category": belirlenen_kategori,
-                    "confidence_score": kategori_analizi['guven_skoru'],
-                    "matched_keywords": kategori_analizi['bulunan_kelimeler'][:5]
-                }
-            },
-            message="Feedback başarıyla kaydedildi ve kategorize edildi"
-        )
+        # 6. Response döndür
+        return yanit_olustur(new_feedback)
         
+    except AnahtarHatasi as e:
+        # Anahtar başka bir isteğe devredilmiş: satır da yazılmadı
+        raise HTTPException(status_code=e.durum, detail=error_response(str(e), e.kod))
     except HTTPException:
         raise
     except Exception as e:
@@ -138,11 +263,421 @@ def submit_feedback_from_flutter(
         )
 
 
+@router.post("/bulk")
+async def bulk_ingest_feedback(request: Request):
+    """
+    NDJSON toplu feedback yükleme (çevrimdışı kuyruklar, kanal dışa aktarımları)
+    
+    Her satır submit gövdesiyle aynıdır:
+    {"city_id": "06", "message": "Sinyal yok", "timestamp": "2025-11-20 10:00:00"}
+    
+    Gövde gzip'li gönderilebilir (Content-Encoding: gzip). Satırlar
+    BULK_INGEST_CHUNK_SIZE'lık partiler halinde sınıflandırılıp yazılır; yanıt
+    (application/x-ndjson) girdi sırasıyla her satır için {"line", "id", ...}
+    veya {"line", "error", "error_code"} ve en sonda {"summary": {...}} içerir.
+    """
+    kodlama = request.headers.get("content-encoding", "").lower()
+    if kodlama not in ("", "identity", "gzip"):
+        raise HTTPException(
+            status_code=415,
+            detail=error_response(f"Desteklenmeyen Content-Encoding: {kodlama}", "UNSUPPORTED_ENCODING")
+        )
+    return NdjsonYaniti(ndjson_yukle(request.stream(), gzipli=kodlama == "gzip"))
+
+
+@router.post("/classify-batch")
+def classify_feedback_batch(batch: FeedbackClassifyBatch):
+    """
+    Mesajları veritabanına yazmadan toplu olarak kategorize et
+    
+    Request Body:
+    {
+        "messages": ["İnternet çekmiyor", "Cadde üzerinde çukur var"]
+    }
+    
+    Her mesaj için girdi sırasıyla kategori, güven skoru ve bulunan kelimeler döner.
+    """
+    try:
+        analizler = toplu_analiz_et(batch.messages)
+        sonuclar = [
+            {
+                "category": analiz['kategori'],
+                "confidence": analiz['guven_skoru'],
+                "matched_keywords": analiz['bulunan_kelimeler']
+            }
+            for analiz in analizler
+        ]
+        return success_response(
+            data=sonuclar,
+            message=f"{len(sonuclar)} mesaj kategorize edildi"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(f"Mesajlar kategorize edilirken hata: {str(e)}", "CLASSIFICATION_ERROR")
+        )
+
+
+@router.get("/classifier/metrics")
+def get_classifier_metrics():
+    """Sınıflandırıcı çalışma modu, process havuzu, arka plan kuyruğu ve grup commit metrikleri"""
+    return success_response(
+        data={
+            "keyword_version": anahtar_kelime_surumu(),
+            **linear_classifier.metrikler(),
+            **havuz.metrikler(),
+            "queue": kuyruk.metrikler(),
+            "duplicates": kopya_indeksi.metrikler(),
+            "group_commit": yazma_tamponu.metrikler(),
+            "idempotency": tekrar_anahtarlari.metrikler()
+        },
+        message="Sınıflandırıcı metrikleri"
+    )
+
+
+@router.post("/classifier/reload")
+def reload_classifier_keywords(x_admin_token: Optional[str] = Header(None)):
+    """
+    Anahtar kelime dosyasını yeniden yükle (yönetim endpoint'i)
+    
+    Yeni indeks derlenirken sınıflandırma eski indeksle devam eder.
+    X-Admin-Token header'ı ADMIN_TOKEN ile eşleşmelidir; ADMIN_TOKEN
+    tanımlı değilse endpoint kapalıdır (503).
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=503,
+            detail=error_response("Yönetim endpoint'i kapalı (ADMIN_TOKEN tanımlı değil)", "ADMIN_DISABLED")
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=403,
+            detail=error_response("Yetkisiz işlem", "FORBIDDEN")
+        )
+    try:
+        sonuc = indeksi_yenile(zorla=True)
+        return success_response(
+            data=sonuc,
+            message=f"Anahtar kelime indeksi sürümü: {sonuc['version']}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=error_response(f"Anahtar kelime dosyası yüklenemedi: {str(e)}", "KEYWORDS_RELOAD_ERROR")
+        )
+
+
+# Arama sorgusundaki kelimeler (FTS5 sözdizimi kullanıcıya açılmaz)
+_ARAMA_KELIMESI = re.compile(r"\w+")
+
+ARAMA_SAYFA_LIMITI = 100
+
+
+def _fts_sorgusu(q: str) -> str:
+    """Kullanıcı sorgusunu kelime önekleriyle AND aramasına çevir ('çukur' -> "cukur"*)"""
+    kelimeler = _ARAMA_KELIMESI.findall(q.replace('ı', 'i'))
+    return " ".join(f'"{kelime}"*' for kelime in kelimeler)
+
+
+def _arama_sorgusu(sort: str, kosullar: List[str], sayfa_kosulu: str = "") -> str:
+    if sort == "relevance":
+        return f"""
+            SELECT * FROM (
+                SELECT f.id, f.city_id, f.user, f.message, f.category, f.timestamp,
+                       f.duplicate_of, bm25(city_feedback_fts) AS skor
+                FROM city_feedback_fts
+                JOIN city_feedback f ON f.id = city_feedback_fts.rowid
+                WHERE {" AND ".join(kosullar)}
+            )
+            {sayfa_kosulu}
+            ORDER BY skor, id
+            LIMIT :limit
+        """
+    # bm25 hesaplanmaz; FTS5 eşleşmeleri rowid sırasıyla akıtır ve limitte durur
+    # (tüm eşleşmeleri okuyup sıralamak yerine)
+    return f"""
+        SELECT f.id, f.city_id, f.user, f.message, f.category, f.timestamp,
+               f.duplicate_of, NULL AS skor
+        FROM city_feedback_fts
+        JOIN city_feedback f ON f.id = city_feedback_fts.rowid
+        WHERE {" AND ".join(kosullar)}
+        ORDER BY city_feedback_fts.rowid DESC
+        LIMIT :limit
+    """
+
+
+@router.get("/search")
+def search_feedback(
+    q: str = Query(..., min_length=1, description="Aranacak kelimeler (hepsi geçmeli, önek eşleşir)"),
+    city_id: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = Query(None, description="Başlangıç tarihi (YYYY-MM-DD, dahil)"),
+    date_to: Optional[date] = Query(None, description="Bitiş tarihi (YYYY-MM-DD, dahil)"),
+    sort: str = Query("relevance", pattern="^(relevance|recent)$"),
+    limit: int = Query(20, ge=1, le=ARAMA_SAYFA_LIMITI),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Feedback mesajlarında tam metin arama (SQLite FTS5)
+    
+    Türkçe karakterler katlanır: "cukur" ve "çukur" aynı sonuçları verir.
+    sort=relevance BM25 skoruna, sort=recent id'ye göre (yeniden eskiye) sıralar;
+    recent'te relevance hesaplanmaz (null). Sonraki sayfa
+    için yanıttaki next_cursor değeri cursor parametresiyle gönderilir.
+    """
+    try:
+        fts_sorgusu = _fts_sorgusu(q)
+        if not fts_sorgusu:
+            raise HTTPException(
+                status_code=400,
+                detail=error_response("Arama sorgusunda kelime bulunamadı", "INVALID_QUERY")
+            )
+        
+        kosullar = ["city_feedback_fts MATCH :sorgu"]
+        parametreler = {"sorgu": fts_sorgusu, "limit": limit + 1}
+        if city_id:
+            kosullar.append("f.city_id = :city_id")
+            parametreler["city_id"] = city_id
+        if category:
+            kosullar.append("f.category = :category")
+            parametreler["category"] = category
+        if date_from:
+            kosullar.append("f.timestamp >= :baslangic")
+            parametreler["baslangic"] = str(date_from)
+        if date_to:
+            kosullar.append("f.timestamp < :bitis")
+            parametreler["bitis"] = str(date_to + timedelta(days=1))
+        
+        # Keyset sayfalama: son görülen (skor, id) veya id'den sonrası
+        sayfa_kosulu = ""
+        if cursor:
+            try:
+                konum = cursor_coz(cursor)
+                if konum.get("sort") != sort:
+                    raise ValueError(sort)
+                parametreler["c_id"] = int(konum["id"])
+                if sort == "relevance":
+                    parametreler["c_skor"] = float(konum["skor"])
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(
+                    status_code=400,
+                    detail=error_response("Geçersiz cursor", "INVALID_CURSOR")
+                )
+            if sort == "relevance":
+                sayfa_kosulu = "WHERE skor > :c_skor OR (skor = :c_skor AND id > :c_id)"
+            else:
+                kosullar.append("city_feedback_fts.rowid < :c_id")
+        
+        sorgu = _arama_sorgusu(sort, kosullar, sayfa_kosulu)
+        satirlar = db.execute(text(sorgu), parametreler).all()
+        
+        sonraki = None
+        if len(satirlar) > limit:
+            satirlar = satirlar[:limit]
+            son = satirlar[-1]
+            sonraki = (
+                cursor_olustur(sort=sort, skor=son.skor, id=son.id)
+                if sort == "relevance" else cursor_olustur(sort=sort, id=son.id)
+            )
+        
+        sonuclar = [
+            {
+                "id": f.id,
+                "city_id": f.city_id,
+                "user": f.user,
+                "message": f.message,
+                "category": f.category,
+                "timestamp": str(f.timestamp),
+                "duplicate_of": f.duplicate_of,
+                "relevance": round(-f.skor, 4) if f.skor is not None else None
+            }
+            for f in satirlar
+        ]
+        return success_response(
+            data=sonuclar,
+            message=f"{len(sonuclar)} feedback bulundu",
+            next_cursor=sonraki
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(f"Arama yapılırken hata: {str(e)}", "SEARCH_ERROR")
+        )
+
+
+# Analitik: tek istekte dönebilecek en fazla zaman kovası (gün/hafta/saat)
+ANALITIK_EN_FAZLA_KOVA = 2000
+
+# Sayılan feedback: yakın-kopya olmayan ve sınıflandırılmış (sayaçlarla aynı kural)
+_ANALITIK_SORGULARI = {
+    "day": """
+        SELECT day AS kova, category, SUM(count) AS adet FROM feedback_category_counts
+        WHERE day >= :bas AND day <= :bit {sehir}
+        GROUP BY kova, category HAVING adet > 0
+    """,
+    "week": """
+        SELECT date(day, 'weekday 0', '-6 days') AS kova, category, SUM(count) AS adet
+        FROM feedback_category_counts
+        WHERE day >= :bas AND day <= :bit {sehir}
+        GROUP BY kova, category HAVING adet > 0
+    """,
+    "hour": """
+        SELECT strftime('%Y-%m-%d %H:00', timestamp) AS kova, category, COUNT(*) AS adet
+        FROM city_feedback
+        WHERE timestamp >= :bas AND timestamp < :bit_sonrasi {sehir}
+          AND duplicate_of IS NULL AND category != :beklemede
+        GROUP BY kova, category
+    """,
+}
+
+analitik_onbellegi = SurumluOnbellek(256)
+
+
+def _analitik_kovalari(granularity: str, bas: date, bit: date) -> List[str]:
+    """Aralıktaki tüm kova etiketleri (boş kovalar dahil, grafik için)"""
+    if granularity == "hour":
+        zaman = datetime.combine(bas, datetime.min.time())
+        son = datetime.combine(bit + timedelta(days=1), datetime.min.time())
+        adim = timedelta(hours=1)
+        bicim = "%Y-%m-%d %H:00"
+    else:
+        zaman, son = bas, bit + timedelta(days=1)
+        if granularity == "week":
+            zaman = bas - timedelta(days=bas.weekday())
+        adim = timedelta(days=7 if granularity == "week" else 1)
+        bicim = "%Y-%m-%d"
+    kovalar = []
+    while zaman < son:
+        kovalar.append(zaman.strftime(bicim))
+        zaman += adim
+    return kovalar
+
+
+def _analitik_hesapla(db: Session, granularity: str, bas: date, bit: date, sehirler: Optional[List[str]]) -> dict:
+    kovalar = _analitik_kovalari(granularity, bas, bit)
+    parametreler = {
+        "bas": str(bas),
+        "bit": str(bit),
+        "bit_sonrasi": str(bit + timedelta(days=1)),
+        "beklemede": BEKLEMEDE_KATEGORISI
+    }
+    sehir_kosulu = ""
+    if sehirler:
+        sehir_kosulu = "AND city_id IN ({})".format(", ".join(f":s{i}" for i in range(len(sehirler))))
+        parametreler.update({f"s{i}": city_id for i, city_id in enumerate(sehirler)})
+    satirlar = db.execute(
+        text(_ANALITIK_SORGULARI[granularity].format(sehir=sehir_kosulu)), parametreler
+    ).all()
+
+    kategoriler = sorted({s.category for s in satirlar})
+    kova_sirasi = {kova: i for i, kova in enumerate(kovalar)}
+    kategori_sirasi = {kategori: i for i, kategori in enumerate(kategoriler)}
+    sayilar = [[0] * len(kovalar) for _ in kategoriler]
+    for s in satirlar:
+        j = kova_sirasi.get(s.kova)
+        if j is not None:
+            sayilar[kategori_sirasi[s.category]][j] += s.adet
+    toplamlar = [sum(satir) for satir in sayilar]
+    return {
+        "granularity": granularity,
+        "date_from": str(bas),
+        "date_to": str(bit),
+        "city_ids": sehirler,
+        "buckets": kovalar,
+        "categories": kategoriler,
+        "counts": sayilar,
+        "totals": toplamlar,
+        "total": sum(toplamlar)
+    }
+
+
+@router.get("/analytics")
+def get_feedback_analytics(
+    city_id: Optional[List[str]] = Query(None, description="Şehir ID'leri (tekrarlanabilir veya virgülle ayrılmış, boşsa tümü)"),
+    date_from: Optional[date] = Query(None, description="Başlangıç tarihi (YYYY-MM-DD, dahil; varsayılan: son 30 gün)"),
+    date_to: Optional[date] = Query(None, description="Bitiş tarihi (YYYY-MM-DD, dahil; varsayılan: bugün)"),
+    granularity: str = Query("day", pattern="^(day|week|hour)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Kategori x zaman kovası feedback sayıları
+
+    Yanıt sütun düzenindedir: counts[i][j], categories[i] kategorisinin
+    buckets[j] kovasındaki sayısıdır. Gün ve hafta kovaları şehir/kategori/gün
+    sayaçlarından, saat kovaları tek bir GROUP BY ile hesaplanır. Yakın-kopyalar
+    ve sınıflandırılmayı bekleyenler sayılmaz. Sonuç, feedback verisi
+    değişene kadar önbellekten döner.
+    """
+    try:
+        bit = date_to or date.today()
+        bas = date_from or (bit - timedelta(days=29))
+        if bas > bit:
+            raise HTTPException(
+                status_code=400,
+                detail=error_response("date_from, date_to'dan sonra olamaz", "INVALID_RANGE")
+            )
+        kova_sayisi = (bit - bas).days + 1
+        if granularity == "hour":
+            kova_sayisi *= 24
+        elif granularity == "week":
+            kova_sayisi = kova_sayisi // 7 + 2
+        if kova_sayisi > ANALITIK_EN_FAZLA_KOVA:
+            raise HTTPException(
+                status_code=400,
+                detail=error_response(
+                    f"Tarih aralığı çok geniş (en fazla {ANALITIK_EN_FAZLA_KOVA} kova)", "RANGE_TOO_LARGE"
+                )
+            )
+
+        sehirler = sorted({
+            parca.strip() for deger in (city_id or []) for parca in deger.split(",") if parca.strip()
+        }) or None
+        for sehir in sehirler or []:
+            if referanslar.sehir_adi(db, sehir) is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=error_response(f"Şehir ID {sehir} bulunamadı", "CITY_NOT_FOUND")
+                )
+
+        surum = veri_surumu(db, "city_feedback")
+        anahtar = (granularity, bas, bit, tuple(sehirler or ()))
+        sonuc = analitik_onbellegi.getir(anahtar, surum)
+        if sonuc is None:
+            sonuc = {**_analitik_hesapla(db, granularity, bas, bit, sehirler), "data_version": surum[0]}
+            analitik_onbellegi.koy(anahtar, surum, sonuc)
+        return success_response(
+            data=sonuc,
+            message=f"{sonuc['total']} feedback, {len(sonuc['buckets'])} kova"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(f"Analitik hesaplanırken hata: {str(e)}", "ANALYTICS_ERROR")
+        )
+
+
 @router.get("/")
-def get_all_feedback(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Tüm feedback'leri listele"""
+def get_all_feedback(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tüm feedback'leri listele (id sırasıyla)
+
+    Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle
+    gönderilir; skip geriye uyumluluk içindir.
+    """
     try:
-        feedbacks = db.query(models.CityFeedback).offset(skip).limit(limit).all()
+        feedbacks, sonraki = sayfa_getir(
+            db.query(models.CityFeedback), [models.CityFeedback.id], cursor, skip, limit
+        )
         feedback_list = [
             {
                 "id": f.id,
@@ -150,14 +685,18 @@ def get_all_feedback(skip: int = 0, limit: int = 100, db: Session = Depends(get_
                 "user": f.user,
                 "message": f.message,
                 "category": f.category,
-                "timestamp": str(f.timestamp)
+                "timestamp": str(f.timestamp),
+                "duplicate_of": f.duplicate_of
             }
             for f in feedbacks
         ]
         return success_response(
             data=feedback_list,
-            message=f"{len(feedback_list)} feedback bulundu"
+            message=f"{len(feedback_list)} feedback bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -183,7 +722,8 @@ def get_feedback(feedback_id: int, db: Session = Depends(get_db)):
                 "user": feedback.user,
                 "message": feedback.message,
                 "category": feedback.category,
-                "timestamp": str(feedback.timestamp)
+                "timestamp": str(feedback.timestamp),
+                "duplicate_of": feedback.duplicate_of
             },
             message="Feedback bulundu"
         )
@@ -197,12 +737,18 @@ def get_feedback(feedback_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/city/{city_id}")
-def get_city_feedback(city_id: str, db: Session = Depends(get_db)):
-    """Belirli bir şehrin tüm feedback'lerini getir"""
+def get_city_feedback(
+    city_id: str,
+    limit: int = SAYFA_LIMITI,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Belirli bir şehrin tüm feedback'lerini getir (en yeniden eskiye, sayfalı)"""
     try:
-        feedbacks = db.query(models.CityFeedback).filter(
-            models.CityFeedback.city_id == city_id
-        ).all()
+        feedbacks, sonraki = sayfa_getir(
+            db.query(models.CityFeedback).filter(models.CityFeedback.city_id == city_id),
+            [models.CityFeedback.id], cursor, limit=limit, azalan=True
+        )
         
         feedback_list = [
             {
@@ -211,15 +757,19 @@ def get_city_feedback(city_id: str, db: Session = Depends(get_db)):
                 "user": f.user,
                 "message": f.message,
                 "category": f.category,
-                "timestamp": str(f.timestamp)
+                "timestamp": str(f.timestamp),
+                "duplicate_of": f.duplicate_of
             }
             for f in feedbacks
         ]
         
         return success_response(
             data=feedback_list,
-            message=f"{len(feedback_list)} feedback bulundu"
+            message=f"{len(feedback_list)} feedback bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -227,6 +777,63 @@ def get_city_feedback(city_id: str, db: Session = Depends(get_db)):
         )
 
 
+@router.get("/city/{city_id}/duplicates")
+def get_city_duplicates(city_id: str, limit: int = 50, db: Session = Depends(get_db)):
+    """
+    Şehirde yakın-kopyası olan feedback'ler
+    
+    Her orijinal feedback için kopya sayısı ve kopya id'leri döner,
+    en çok tekrarlanan şikâyet en üstte.
+    """
+    try:
+        limit = max(1, min(limit, 500))
+        kopyalar = db.query(
+            models.CityFeedback.duplicate_of,
+            func.count(models.CityFeedback.id).label("adet"),
+            func.group_concat(models.CityFeedback.id).label("idler")
+        ).filter(
+            models.CityFeedback.city_id == city_id,
+            models.CityFeedback.duplicate_of.isnot(None)
+        ).group_by(
+            models.CityFeedback.duplicate_of
+        ).order_by(
+            func.count(models.CityFeedback.id).desc()
+        ).limit(limit).all()
+        
+        orijinaller = {
+            f.id: f
+            for f in db.query(models.CityFeedback).filter(
+                models.CityFeedback.id.in_([k.duplicate_of for k in kopyalar])
+            )
+        }
+        
+        gruplar = []
+        for k in kopyalar:
+            orijinal = orijinaller.get(k.duplicate_of)
+            if orijinal is None:
+                continue
+            gruplar.append({
+                "id": orijinal.id,
+                "city_id": orijinal.city_id,
+                "user": orijinal.user,
+                "message": orijinal.message,
+                "category": orijinal.category,
+                "timestamp": str(orijinal.timestamp),
+                "duplicate_count": k.adet,
+                "duplicate_ids": sorted(int(i) for i in k.idler.split(","))
+            })
+        
+        return success_response(
+            data=gruplar,
+            message=f"{len(gruplar)} tekrarlanan feedback bulundu"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(f"Kopya feedback'ler getirilirken hata: {str(e)}", "FETCH_ERROR")
+        )
+
+
 # DELETE kaldırıldı - READ-ONLY mod
 
 
@@ -239,22 +846,41 @@ categories_router = APIRouter(
 # CREATE kaldırıldı - READ-ONLY mod
 
 
+# Kategori haritasından önceden serileştirilmiş yanıtlar:
+# (harita, liste yanıtı, kategori -> tekil yanıt); yanıt = (JSON bytes, ETag)
+_hazir_kategori_yanitlari: Optional[tuple] = None
+
+
+def _kategori_yanitlari() -> Tuple[Tuple[bytes, str], Dict[str, Tuple[bytes, str]]]:
+    """Güncel haritanın hazır yanıtları - harita değişince bir kez yeniden serileştirilir"""
+    global _hazir_kategori_yanitlari
+    harita = referanslar.kategori_haritasi()
+    hazir = _hazir_kategori_yanitlari
+    if hazir is None or hazir[0] is not harita:
+        # Arka plan kuyruğunun bekleme kategorisi foreign key için tabloda durur, listelenmez
+        kategoriler = [
+            {"category": kategori, "description": aciklama}
+            for kategori, aciklama in harita.items()
+            if kategori != BEKLEMEDE_KATEGORISI
+        ]
+        liste = json_serilestir(success_response(
+            data=kategoriler,
+            message=f"{len(kategoriler)} kategori bulundu"
+        ))
+        tekiller = {
+            k["category"]: json_serilestir(success_response(data=k, message="Kategori bulundu"))
+            for k in kategoriler
+        }
+        hazir = _hazir_kategori_yanitlari = (harita, liste, tekiller)
+    return hazir[1], hazir[2]
+
+
 @categories_router.get("/")
-def get_all_categories(db: Session = Depends(get_db)):
-    """Tüm kategorileri listele"""
+def get_all_categories(request: Request):
+    """Tüm kategorileri listele (bellekteki haritadan, ETag ile)"""
     try:
-        categories = db.query(models.FeedbackCategory).all()
-        category_list = [
-            {
-                "category": c.category,
-                "description": c.description
-            }
-            for c in categories
-        ]
-        return success_response(
-            data=category_list,
-            message=f"{len(category_list)} kategori bulundu"
-        )
+        liste, _ = _kategori_yanitlari()
+        return etagli_yanit(request, *liste)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -263,26 +889,23 @@ def get_all_categories(db: Session = Depends(get_db)):
 
 
 @categories_router.get("/{category_name}")
-def get_category(category_name: str, db: Session = Depends(get_db)):
-    """Belirli bir kategoriyi getir"""
+def get_category(category_name: str, request: Request):
+    """Belirli bir kategoriyi getir (bellekteki haritadan, ETag ile)"""
     try:
-        category = db.query(models.FeedbackCategory).filter(
-            models.FeedbackCategory.category == category_name
-        ).first()
-        
-        if category is None:
+        _, tekiller = _kategori_yanitlari()
+        yanit = tekiller.get(category_name)
+        if yanit is None and referanslar.kategori_aciklamasi(category_name) is not None:
+            # Başka bir worker process eklemişti, harita güncellendi
+            _, tekiller = _kategori_yanitlari()
+            yanit = tekiller.get(category_name)
+
+        if yanit is None:
             raise HTTPException(
                 status_code=404,
                 detail=error_response(f"Kategori '{category_name}' bulunamadı", "NOT_FOUND")
             )
-        
-        return success_response(
-            data={
-                "category": category.category,
-                "description": category.description
-            },
-            message="Kategori bulundu"
-        )
+
+        return etagli_yanit(request, *yanit)
     except HTTPException:
         raise
     except Exception as e:
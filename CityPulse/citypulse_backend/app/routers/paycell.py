@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Optional
 
 from ..database import get_db
 from .. import models, schemas
+from ..pagination import SAYFA_LIMITI, sayfa_getir
 from ..utils import success_response, error_response
 
 
@@ -16,10 +18,24 @@ router = APIRouter(
 
 
 @router.get("/")
-def get_all_paycell(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Tüm Paycell verilerini listele"""
+def get_all_paycell(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tüm Paycell verilerini listele
+
+    Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle
+    gönderilir; skip geriye uyumluluk içindir.
+    """
     try:
-        paycell_data = db.query(models.PaycellStats).offset(skip).limit(limit).all()
+        paycell_data, sonraki = sayfa_getir(
+            db.query(models.PaycellStats),
+            [models.PaycellStats.city_id, models.PaycellStats.date],
+            cursor, skip, limit
+        )
         paycell_list = [
             {
                 "city_id": p.city_id,
@@ -31,8 +47,11 @@ def get_all_paycell(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
         ]
         return success_response(
             data=paycell_list,
-            message=f"{len(paycell_list)} Paycell verisi bulundu"
+            message=f"{len(paycell_list)} Paycell verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -41,12 +60,18 @@ def get_all_paycell(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
 
 
 @router.get("/{city_id}")
-def get_city_paycell(city_id: str, db: Session = Depends(get_db)):
-    """Belirli bir şehrin tüm Paycell verilerini getir"""
+def get_city_paycell(
+    city_id: str,
+    limit: int = SAYFA_LIMITI,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Belirli bir şehrin tüm Paycell verilerini getir (en yeni tarihten eskiye, sayfalı)"""
     try:
-        paycell_data = db.query(models.PaycellStats).filter(
-            models.PaycellStats.city_id == city_id
-        ).all()
+        paycell_data, sonraki = sayfa_getir(
+            db.query(models.PaycellStats).filter(models.PaycellStats.city_id == city_id),
+            [models.PaycellStats.date], cursor, limit=limit, azalan=True
+        )
         
         paycell_list = [
             {
@@ -60,8 +85,11 @@ def get_city_paycell(city_id: str, db: Session = Depends(get_db)):
         
         return success_response(
             data=paycell_list,
-            message=f"{len(paycell_list)} Paycell verisi bulundu"
+            message=f"{len(paycell_list)} Paycell verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
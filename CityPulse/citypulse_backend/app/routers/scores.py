@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Optional
 
 from ..database import get_db
 from .. import models, schemas
+from ..pagination import SAYFA_LIMITI, sayfa_getir
 from ..utils import success_response, error_response
 
 
@@ -16,10 +18,24 @@ router = APIRouter(
 
 
 @router.get("/")
-def get_all_scores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Tüm skor verilerini listele"""
+def get_all_scores(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tüm skor verilerini listele
+
+    Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle
+    gönderilir; skip geriye uyumluluk içindir.
+    """
     try:
-        scores = db.query(models.CityScore).offset(skip).limit(limit).all()
+        scores, sonraki = sayfa_getir(
+            db.query(models.CityScore),
+            [models.CityScore.city_id, models.CityScore.date],
+            cursor, skip, limit
+        )
         scores_list = [
             {
                 "city_id": s.city_id,
@@ -31,8 +47,11 @@ def get_all_scores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
         ]
         return success_response(
             data=scores_list,
-            message=f"{len(scores_list)} skor verisi bulundu"
+            message=f"{len(scores_list)} skor verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -41,12 +60,18 @@ def get_all_scores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
 
 
 @router.get("/{city_id}")
-def get_city_scores(city_id: str, db: Session = Depends(get_db)):
-    """Belirli bir şehrin tüm skor verilerini getir"""
+def get_city_scores(
+    city_id: str,
+    limit: int = SAYFA_LIMITI,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Belirli bir şehrin tüm skor verilerini getir (en yeni tarihten eskiye, sayfalı)"""
     try:
-        scores = db.query(models.CityScore).filter(
-            models.CityScore.city_id == city_id
-        ).all()
+        scores, sonraki = sayfa_getir(
+            db.query(models.CityScore).filter(models.CityScore.city_id == city_id),
+            [models.CityScore.date], cursor, limit=limit, azalan=True
+        )
         
         scores_list = [
             {
@@ -60,8 +85,11 @@ def get_city_scores(city_id: str, db: Session = Depends(get_db)):
         
         return success_response(
             data=scores_list,
-            message=f"{len(scores_list)} skor verisi bulundu"
+            message=f"{len(scores_list)} skor verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 
 from ..database import get_db
 from .. import models, schemas
+from ..pagination import SAYFA_LIMITI, sayfa_getir
 from ..utils import success_response, error_response
 
 
@@ -66,10 +67,24 @@ def _create_stats_disabled(stats: schemas.CityStatsCreate, db: Session = Depends
 
 
 @router.get("/")
-def get_all_stats(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Tüm ağ verilerini listele"""
+def get_all_stats(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tüm ağ verilerini listele
+
+    Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle
+    gönderilir; skip geriye uyumluluk içindir.
+    """
     try:
-        stats = db.query(models.CityStats).offset(skip).limit(limit).all()
+        stats, sonraki = sayfa_getir(
+            db.query(models.CityStats),
+            [models.CityStats.city_id, models.CityStats.date],
+            cursor, skip, limit
+        )
         stats_list = [
             {
                 "city_id": s.city_id,
@@ -81,8 +96,11 @@ def get_all_stats(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
         ]
         return success_response(
             data=stats_list,
-            message=f"{len(stats_list)} ağ verisi bulundu"
+            message=f"{len(stats_list)} ağ verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -91,10 +109,18 @@ def get_all_stats(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
 
 
 @router.get("/{city_id}")
-def get_city_stats(city_id: str, db: Session = Depends(get_db)):
-    """Belirli bir şehrin tüm ağ verilerini getir"""
+def get_city_stats(
+    city_id: str,
+    limit: int = SAYFA_LIMITI,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Belirli bir şehrin tüm ağ verilerini getir (en yeni tarihten eskiye, sayfalı)"""
     try:
-        stats = db.query(models.CityStats).filter(models.CityStats.city_id == city_id).all()
+        stats, sonraki = sayfa_getir(
+            db.query(models.CityStats).filter(models.CityStats.city_id == city_id),
+            [models.CityStats.date], cursor, limit=limit, azalan=True
+        )
         stats_list = [
             {
                 "city_id": s.city_id,
@@ -106,8 +132,11 @@ def get_city_stats(city_id: str, db: Session = Depends(get_db)):
         ]
         return success_response(
             data=stats_list,
-            message=f"{len(stats_list)} ağ verisi bulundu"
+            message=f"{len(stats_list)} ağ verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Optional
+
+from ..city_stream import AkisDolu, canli_akis
+from ..database import SessionLocal
+from ..feedback_service import referanslar
+from ..utils import success_response, error_response
+
+
+router = APIRouter(
+    prefix="/api/stream",
+    tags=["stream"]
+)
+
+# Bağlantı koparsa EventSource'un yeniden bağlanmadan önce beklediği süre (ms)
+_YENIDEN_BAGLANMA_MS = 3000
+
+
+def _sehir_var_mi(city_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        return referanslar.sehir_adi(db, city_id) is not None
+    finally:
+        db.close()
+
+
+@router.get("/city/{city_id}")
+async def stream_city(
+    city_id: str,
+    request: Request,
+    last_event_id: Annotated[Optional[str], Header()] = None
+):
+    """
+    Şehrin canlı güncellemeleri (text/event-stream)
+
+    Olaylar:
+    - feedback: yeni (veya kategorisi değişen) feedback satırı
+    - metric: city_stats, city_weather veya paycell_stats satırı (source alanında tablo)
+    - score: yeniden hesaplanan city_scores satırı
+    - resync: yavaş bağlantıda olay düştü, ekran baştan yüklenmeli
+
+    Olay yokken heartbeat yorum satırı gönderilir. Yeniden bağlanırken
+    Last-Event-ID header'ı gönderilirse kaçırılan olaylar önce gelir.
+    """
+    if not await run_in_threadpool(_sehir_var_mi, city_id):
+        raise HTTPException(
+            status_code=404,
+            detail=error_response(f"Şehir '{city_id}' bulunamadı", "NOT_FOUND")
+        )
+    try:
+        son_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        son_id = None
+    try:
+        abone = canli_akis.abone_ol(city_id)
+    except AkisDolu as e:
+        raise HTTPException(
+            status_code=503,
+            detail=error_response(f"Canlı akış dolu: {str(e)}", "STREAM_FULL")
+        )
+
+    async def olaylar():
+        try:
+            yield f"retry: {_YENIDEN_BAGLANMA_MS}\n\n"
+            if son_id is not None:
+                gecmis = await canli_akis.gecmis(city_id, son_id)
+                if gecmis:
+                    yield "".join(gecmis)
+            while True:
+                cerceveler = await abone.bekle(canli_akis.kalp_atisi)
+                if cerceveler:
+                    yield "".join(cerceveler)
+                    continue
+                # Boşta bekleyen bağlantının kopup kopmadığı heartbeat zamanında anlaşılır
+                if await request.is_disconnected():
+                    return
+                yield ": heartbeat\n\n"
+        finally:
+            canli_akis.ayril(abone)
+
+    return StreamingResponse(
+        olaylar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/metrics")
+def get_stream_metrics():
+    """Abone sayısı, dağıtılan ve düşen olaylar"""
+    return success_response(data=canli_akis.metrikler(), message="Canlı akış metrikleri")
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Optional
 
 from ..database import get_db
 from .. import models, schemas
+from ..pagination import SAYFA_LIMITI, sayfa_getir
 from ..utils import success_response, error_response
 
 
@@ -16,10 +18,24 @@ router = APIRouter(
 
 
 @router.get("/")
-def get_all_weather(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Tüm hava durumu verilerini listele"""
+def get_all_weather(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tüm hava durumu verilerini listele
+
+    Sonraki sayfa için yanıttaki next_cursor değeri cursor parametresiyle
+    gönderilir; skip geriye uyumluluk içindir.
+    """
     try:
-        weather_data = db.query(models.CityWeather).offset(skip).limit(limit).all()
+        weather_data, sonraki = sayfa_getir(
+            db.query(models.CityWeather),
+            [models.CityWeather.city_id, models.CityWeather.date],
+            cursor, skip, limit
+        )
         weather_list = [
             {
                 "city_id": w.city_id,
@@ -31,8 +47,11 @@ def get_all_weather(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
         ]
         return success_response(
             data=weather_list,
-            message=f"{len(weather_list)} hava durumu verisi bulundu"
+            message=f"{len(weather_list)} hava durumu verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -41,12 +60,18 @@ def get_all_weather(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
 
 
 @router.get("/{city_id}")
-def get_city_weather(city_id: str, db: Session = Depends(get_db)):
-    """Belirli bir şehrin tüm hava durumu verilerini getir"""
+def get_city_weather(
+    city_id: str,
+    limit: int = SAYFA_LIMITI,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Belirli bir şehrin tüm hava durumu verilerini getir (en yeni tarihten eskiye, sayfalı)"""
     try:
-        weather_data = db.query(models.CityWeather).filter(
-            models.CityWeather.city_id == city_id
-        ).all()
+        weather_data, sonraki = sayfa_getir(
+            db.query(models.CityWeather).filter(models.CityWeather.city_id == city_id),
+            [models.CityWeather.date], cursor, limit=limit, azalan=True
+        )
         
         weather_list = [
             {
@@ -60,8 +85,11 @@ def get_city_weather(city_id: str, db: Session = Depends(get_db)):
         
         return success_response(
             data=weather_list,
-            message=f"{len(weather_list)} hava durumu verisi bulundu"
+            message=f"{len(weather_list)} hava durumu verisi bulundu",
+            next_cursor=sonraki
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,335 @@
+"""
+Var olan veritabanına sonradan eklenen şema değişiklikleri
+
+Veritabanı hazır geldiği için create_all kullanılmıyor; yeni kolon ve tablolar
+uygulama açılışında, yoksa eklenir. Her adım tekrar çalıştırılabilir.
+
+İlk adımlar nesnenin varlığına bakar. Sonrakiler GOCLER listesinde numaralıdır:
+uygulanan sürümler schema_migrations tablosuna yazılır, her göç bir kez ve
+sırayla çalışır. Yeni şema değişikliği listenin sonuna yeni sürüm olarak eklenir;
+uygulanmış göçler değiştirilmez.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from .daily_rollup import tablo_ifadesi, tetikleyici_ifadeleri, yeniden_olustur_ifadeleri
+from .database import engine
+
+
+def _kolon_ekle(tablo: str, kolon: str, tanim: str):
+    """Kolon yoksa ekle - birden fazla worker aynı anda denerse hatayı yut"""
+    mevcut = {k["name"] for k in inspect(engine).get_columns(tablo)}
+    if kolon in mevcut:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {tablo} ADD COLUMN {kolon} {tanim}"))
+    except OperationalError:
+        mevcut = {k["name"] for k in inspect(engine).get_columns(tablo)}
+        if kolon not in mevcut:
+            raise
+
+
+def _indeks_olustur(ad: str, tanim: str):
+    """İndeks yoksa oluştur"""
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {ad} ON {tanim}"))
+
+
+def _tablo_var_mi(baglanti, ad: str) -> bool:
+    return baglanti.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (ad,)
+    ).fetchone() is not None
+
+
+def _kilitli_olustur(ad: str, ifadeler: list):
+    """
+    Nesne yoksa ifadeleri tek bir yazma kilidi altında çalıştır
+
+    BEGIN IMMEDIATE ile kilit alındıktan sonra tekrar kontrol edilir; aynı anda
+    açılan worker'lardan sadece biri oluşturur, diğerleri hazır nesneyi görür.
+    Tablo, trigger'lar ve doldurma birlikte commit edilir.
+    """
+    baglanti = engine.raw_connection()
+    try:
+        if _tablo_var_mi(baglanti, ad):
+            return
+        baglanti.execute("BEGIN IMMEDIATE")
+        try:
+            if not _tablo_var_mi(baglanti, ad):
+                for ifade in ifadeler:
+                    baglanti.execute(ifade)
+            baglanti.commit()
+        except Exception:
+            baglanti.rollback()
+            raise
+    finally:
+        baglanti.close()
+
+
+# Tam metin arama: temizle_metin gibi ığüşöç harfleri katlanır (remove_diacritics),
+# 'ı' ayrıca 'i'ye çevrilir. Mesaj metni tekrar saklanmaz (contentless).
+FEEDBACK_FTS = [
+    """CREATE VIRTUAL TABLE city_feedback_fts USING fts5(
+        message, content='', tokenize="unicode61 remove_diacritics 2"
+    )""",
+    """CREATE TRIGGER city_feedback_fts_ai AFTER INSERT ON city_feedback BEGIN
+        INSERT INTO city_feedback_fts(rowid, message) VALUES (new.id, replace(new.message, 'ı', 'i'));
+    END""",
+    """CREATE TRIGGER city_feedback_fts_ad AFTER DELETE ON city_feedback BEGIN
+        INSERT INTO city_feedback_fts(city_feedback_fts, rowid, message)
+        VALUES ('delete', old.id, replace(old.message, 'ı', 'i'));
+    END""",
+    """CREATE TRIGGER city_feedback_fts_au AFTER UPDATE OF message ON city_feedback BEGIN
+        INSERT INTO city_feedback_fts(city_feedback_fts, rowid, message)
+        VALUES ('delete', old.id, replace(old.message, 'ı', 'i'));
+        INSERT INTO city_feedback_fts(rowid, message) VALUES (new.id, replace(new.message, 'ı', 'i'));
+    END""",
+    # Var olan mesajları indeksle
+    """INSERT INTO city_feedback_fts(rowid, message)
+        SELECT id, replace(message, 'ı', 'i') FROM city_feedback""",
+]
+
+
+# Şehir/kategori/gün sayaçları: city_feedback'e yazan her işlem (submit, arka plan
+# sınıflandırma, reclassify scripti) aynı transaction içinde sayaçları günceller.
+FEEDBACK_SAYACLARI = [
+    """CREATE TABLE feedback_category_counts (
+        city_id VARCHAR NOT NULL,
+        category VARCHAR NOT NULL,
+        day DATE NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (city_id, day, category)
+    )""",
+]
+
+# Sayılan satır: yakın-kopya değil (duplicate_of boş) ve sınıflandırılmış (arka plan
+# kuyruğunda bekleyen 'Beklemede' satırları kategorileri belirlenince sayılır).
+# İlk sürümün trigger'ları bekleyen satırları da sayıyordu; değiştirilip sayaçlar
+# yeniden hesaplanır. Son trigger'ın adı adımın yapıldığını gösterir.
+FEEDBACK_SAYAC_TETIKLEYICILERI = [
+    "DROP TRIGGER IF EXISTS feedback_category_counts_ai",
+    "DROP TRIGGER IF EXISTS feedback_category_counts_ad",
+    "DROP TRIGGER IF EXISTS feedback_category_counts_au",
+    """CREATE TRIGGER feedback_category_counts_ai_v2 AFTER INSERT ON city_feedback
+    WHEN new.duplicate_of IS NULL AND new.category != 'Beklemede' BEGIN
+        INSERT INTO feedback_category_counts(city_id, category, day, count)
+        VALUES (new.city_id, new.category, date(new.timestamp), 1)
+        ON CONFLICT(city_id, day, category) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER feedback_category_counts_ad_v2 AFTER DELETE ON city_feedback
+    WHEN old.duplicate_of IS NULL AND old.category != 'Beklemede' BEGIN
+        UPDATE feedback_category_counts SET count = count - 1
+        WHERE city_id = old.city_id AND day = date(old.timestamp) AND category = old.category;
+    END""",
+    """CREATE TRIGGER feedback_category_counts_au_v2
+    AFTER UPDATE OF city_id, category, timestamp, duplicate_of ON city_feedback BEGIN
+        UPDATE feedback_category_counts SET count = count - 1
+        WHERE old.duplicate_of IS NULL AND old.category != 'Beklemede'
+          AND city_id = old.city_id AND day = date(old.timestamp) AND category = old.category;
+        INSERT INTO feedback_category_counts(city_id, category, day, count)
+        SELECT new.city_id, new.category, date(new.timestamp), 1
+        WHERE new.duplicate_of IS NULL AND new.category != 'Beklemede'
+        ON CONFLICT(city_id, day, category) DO UPDATE SET count = count + 1;
+    END""",
+    # Var olan feedback'leri yeniden say
+    "DELETE FROM feedback_category_counts",
+    """INSERT INTO feedback_category_counts(city_id, category, day, count)
+        SELECT city_id, category, date(timestamp), COUNT(*) FROM city_feedback
+        WHERE duplicate_of IS NULL AND category != 'Beklemede'
+        GROUP BY city_id, category, date(timestamp)""",
+]
+
+
+# Submit'in kullanıcı numarası sayacı: eski "user_{feedback sayısı + 1}" şemasıyla
+# çakışmaması için mevcut en büyük numaradan (veya satır sayısından) devam eder.
+ID_SAYACLARI = [
+    """CREATE TABLE id_counters (
+        name VARCHAR PRIMARY KEY,
+        value INTEGER NOT NULL
+    )""",
+    """INSERT INTO id_counters(name, value)
+        SELECT 'feedback_user', MAX(
+            COALESCE((SELECT MAX(CAST(substr(user, 6) AS INTEGER)) FROM city_feedback
+                      WHERE user GLOB 'user_[0-9]*'), 0),
+            (SELECT COUNT(*) FROM city_feedback)
+        )""",
+]
+
+
+def veri_surumu_ifadeleri(tablo: str) -> list:
+    """Tablo her değiştiğinde data_versions'taki sayacını artıran trigger'lar"""
+    return [
+        f"INSERT OR IGNORE INTO data_versions(name, version) VALUES ('{tablo}', 0)",
+        *[
+            f"""CREATE TRIGGER IF NOT EXISTS {tablo}_data_version_{ek} AFTER {olay} ON {tablo} BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = '{tablo}';
+            END"""
+            for ek, olay in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+        ],
+    ]
+
+
+def degisiklik_ifadeleri(tablo: str, olay: str, kolonlar: list, tetikler: list = None) -> list:
+    """
+    Tabloya yazılan satırı city_changes'e (canlı akış) ekleyen trigger'lar
+
+    tetikler: (ek, tetikleyici tanımı, WHEN koşulu) üçlüleri; verilmezse her
+    eklemede ve değeri değişen her güncellemede yazılır
+    """
+    alanlar = ", ".join(f"'{kolon}', NEW.{kolon}" for kolon in kolonlar)
+    if tetikler is None:
+        degisti = " OR ".join(f"NEW.{kolon} IS NOT OLD.{kolon}" for kolon in kolonlar)
+        tetikler = [("ai", "AFTER INSERT", ""), ("au", "AFTER UPDATE", f"WHEN {degisti}")]
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {tablo}_changes_{ek} {tanim} ON {tablo} {kosul} BEGIN
+            INSERT INTO city_changes(city_id, event, payload, created_at)
+            VALUES (NEW.city_id, '{olay}', json_object('source', '{tablo}', {alanlar}),
+                    (julianday('now') - 2440587.5) * 86400.0);
+        END"""
+        for ek, tanim, kosul in tetikler
+    ]
+
+
+# Sürümlü göçler: (sürüm, açıklama, ifadeler)
+GOCLER = [
+    (1, "city_feedback sorgu indeksleri", [
+        # Şehrin feedback listesi (id sırasıyla sayfalı)
+        "CREATE INDEX IF NOT EXISTS ix_city_feedback_city_id ON city_feedback (city_id, id)",
+        # Şehir + tarih aralığı sorguları ve sayaçların yeniden hesaplanması
+        "CREATE INDEX IF NOT EXISTS ix_city_feedback_city_timestamp ON city_feedback (city_id, timestamp)",
+        # Şehrin kategori dağılımı
+        "CREATE INDEX IF NOT EXISTS ix_city_feedback_city_category ON city_feedback (city_id, category)",
+        # Sorgu planlayıcı yeni indeksleri seçebilsin diye istatistikleri topla
+        "ANALYZE",
+    ]),
+    (2, "veri sürümleri ve saatlik analitik indeksi", [
+        # Sonuç önbellekleri tablonun sürümü değişince geçersiz olur
+        """CREATE TABLE IF NOT EXISTS data_versions (
+            name VARCHAR PRIMARY KEY,
+            version INTEGER NOT NULL
+        )""",
+        *veri_surumu_ifadeleri("city_feedback"),
+        # Tüm şehirler için saatlik kategori dağılımı
+        "CREATE INDEX IF NOT EXISTS ix_city_feedback_timestamp ON city_feedback (timestamp)",
+    ]),
+    (3, "submit idempotency anahtarları", [
+        # created_at: unix zamanı (saniye); response boşsa ilk istek hâlâ işleniyor
+        """CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key VARCHAR PRIMARY KEY,
+            request_hash VARCHAR NOT NULL,
+            response TEXT,
+            created_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys (created_at)",
+    ]),
+    (4, "canlı akış değişiklik kaydı", [
+        # seq AUTOINCREMENT: eski kayıtlar silinse de numara tekrar verilmez (Last-Event-ID)
+        """CREATE TABLE IF NOT EXISTS city_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            city_id VARCHAR NOT NULL,
+            event VARCHAR NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )""",
+        # Feedback kategorisi belli olunca yayınlanır (arka plan kuyruğunda güncellemeyle)
+        *degisiklik_ifadeleri(
+            "city_feedback", "feedback",
+            ["id", "city_id", "user", "message", "category", "timestamp", "duplicate_of"],
+            [
+                ("ai", "AFTER INSERT", "WHEN NEW.category != 'Beklemede'"),
+                ("au", "AFTER UPDATE OF category",
+                 "WHEN NEW.category IS NOT OLD.category AND NEW.category != 'Beklemede'"),
+            ]
+        ),
+        *degisiklik_ifadeleri("city_stats", "metric", ["city_id", "date", "signal_strength", "traffic_gb"]),
+        *degisiklik_ifadeleri("city_weather", "metric", ["city_id", "date", "temp_c", "air_quality"]),
+        *degisiklik_ifadeleri(
+            "paycell_stats", "metric", ["city_id", "date", "transactions_count", "total_amount"]
+        ),
+        *degisiklik_ifadeleri("city_scores", "score", ["city_id", "date", "eco_score", "alerts_count"]),
+    ]),
+    (5, "şehir x gün özet tablosu", [
+        # İstatistik endpoint'leri pencere toplamlarını buradan okur (bkz. daily_rollup)
+        tablo_ifadesi(),
+        *tetikleyici_ifadeleri(),
+        # Mevcut verilerin özetleri
+        *yeniden_olustur_ifadeleri(aralikli=False),
+    ]),
+    (6, "özet ve şehir veri sürümleri", [
+        # Metrik ve feedback yazmaları özet trigger'larıyla city_daily_rollup'a yansır;
+        # liderlik tablosu önbelleği bu iki sayaçla geçersiz olur
+        *veri_surumu_ifadeleri("city_daily_rollup"),
+        *veri_surumu_ifadeleri("cities"),
+    ]),
+]
+
+GOC_TABLOSU = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+)"""
+
+
+def _son_surum(baglanti) -> int:
+    return baglanti.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def gocleri_uygula(gocler: list = GOCLER) -> int:
+    """
+    Uygulanmamış göçleri sırayla çalıştır
+
+    Göçler BEGIN IMMEDIATE ile tek yazma kilidi altında, sürüm kaydıyla birlikte
+    commit edilir. Aynı anda açılan worker'lardan biri uygular, diğerleri kilidi
+    bekleyip sürümün güncel olduğunu görür.
+
+    Returns:
+        int: Veritabanının göç sonrası sürümü
+    """
+    hedef = max((surum for surum, _, _ in gocler), default=0)
+    baglanti = engine.raw_connection()
+    try:
+        baglanti.execute(GOC_TABLOSU)
+        baglanti.commit()
+        if _son_surum(baglanti) >= hedef:
+            return _son_surum(baglanti)
+        baglanti.execute("BEGIN IMMEDIATE")
+        try:
+            mevcut = _son_surum(baglanti)
+            for surum, aciklama, ifadeler in gocler:
+                if surum <= mevcut:
+                    continue
+                for ifade in ifadeler:
+                    baglanti.execute(ifade)
+                baglanti.execute(
+                    "INSERT INTO schema_migrations(version, description) VALUES (?, ?)",
+                    (surum, aciklama)
+                )
+            baglanti.commit()
+        except Exception:
+            baglanti.rollback()
+            raise
+        return _son_surum(baglanti)
+    finally:
+        baglanti.close()
+
+
+def sema_guncelle():
+    """Eksik şema değişikliklerini uygula"""
+    # Kategoriyi belirleyen anahtar kelime seti sürümü
+    _kolon_ekle("city_feedback", "keyword_version", "VARCHAR(20)")
+    # Arka plan sınıflandırma kuyruğu: sadece bekleyen satırları içeren kısmi indeks
+    _indeks_olustur("ix_city_feedback_beklemede", "city_feedback (id) WHERE category = 'Beklemede'")
+    # Yakın-kopya feedback'lerin orijinali
+    _kolon_ekle("city_feedback", "duplicate_of", "INTEGER")
+    _indeks_olustur("ix_city_feedback_duplicate_of", "city_feedback (duplicate_of) WHERE duplicate_of IS NOT NULL")
+    # Mesajlarda tam metin arama (FTS5)
+    _kilitli_olustur("city_feedback_fts", FEEDBACK_FTS)
+    # Çevre mesaj oranı için şehir/kategori/gün sayaçları
+    _kilitli_olustur("feedback_category_counts", FEEDBACK_SAYACLARI)
+    _kilitli_olustur("feedback_category_counts_au_v2", FEEDBACK_SAYAC_TETIKLEYICILERI)
+    # Submit'te tam tablo sayımı yerine atomik kullanıcı numarası sayacı
+    _kilitli_olustur("id_counters", ID_SAYACLARI)
+    # Numaralı göçler (indeksler vb.)
+    surum = gocleri_uygula()
+    print(f"✅ Şema sürümü: {surum}")
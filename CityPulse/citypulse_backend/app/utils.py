@@ -1,16 +1,60 @@
 """
 Genel yardımcı fonksiyonlar
 """
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+import base64
+import hashlib
+import json
 
+from fastapi import Request, Response
 
-def success_response(data: Any = None, message: str = "İşlem başarılı") -> Dict:
+
+def success_response(data: Any = None, message: str = "İşlem başarılı", next_cursor: Optional[str] = None) -> Dict:
     """Başarılı response formatı - Flutter'da kolayca parse edilebilir"""
-    return {
+    response = {
         "success": True,
         "message": message,
         "data": data
     }
+    # Sayfalı endpoint'lerde bir sonraki sayfa için
+    if next_cursor is not None:
+        response["next_cursor"] = next_cursor
+    return response
+
+
+def cursor_olustur(**alanlar) -> str:
+    """Keyset sayfalama konumunu istemciye verilecek opak metne çevir"""
+    ham = json.dumps(alanlar, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(ham).decode("ascii").rstrip("=")
+
+
+def cursor_coz(cursor: str) -> Dict:
+    """cursor_olustur çıktısını çöz - geçersizse ValueError"""
+    try:
+        ham = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        alanlar = json.loads(ham)
+    except Exception:
+        raise ValueError("Geçersiz cursor")
+    if not isinstance(alanlar, dict):
+        raise ValueError("Geçersiz cursor")
+    return alanlar
+
+
+def json_serilestir(govde: Any) -> Tuple[bytes, str]:
+    """Yanıt gövdesini JSON bytes'a çevir - (içerik, içerikten türetilen ETag)"""
+    icerik = json.dumps(govde, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return icerik, f'"{hashlib.sha256(icerik).hexdigest()[:32]}"'
+
+
+def etagli_yanit(request: Request, icerik: bytes, etag: str) -> Response:
+    """İstemcideki sürüm güncelse (If-None-Match) gövdesiz 304 döner"""
+    basliklar = {"ETag": etag, "Cache-Control": "no-cache"}
+    istenen = request.headers.get("if-none-match")
+    if istenen is not None:
+        etagler = [e.strip().removeprefix("W/") for e in istenen.split(",")]
+        if "*" in etagler or etag in etagler:
+            return Response(status_code=304, headers=basliklar)
+    return Response(content=icerik, media_type="application/json", headers=basliklar)
 
 
 def error_response(message: str = "Bir hata oluştu", error_code: str = None) -> Dict:
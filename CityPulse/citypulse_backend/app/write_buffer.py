@@ -0,0 +1,240 @@
+"""
+Feedback yazmaları için grup commit tamponu
+
+SQLite'ta her commit ayrı bir transaction ve disk senkronizasyonudur; yoğun
+anlarda submit istekleri birbirinin commit'ini bekler. FEEDBACK_GROUP_COMMIT
+açıkken submit satırı kendisi yazmaz, bir kuyruğa bırakıp bekler. Tek yazıcı
+thread kuyruktan en fazla FEEDBACK_GROUP_COMMIT_MAX_ROWS satır toplar (ilk
+satırdan sonra en fazla FEEDBACK_GROUP_COMMIT_MAX_WAIT_MS bekler) ve hepsini
+feedback_toplu_kaydet ile tek transaction'da yazar. İstek, satırı commit
+edildikten sonra döner; yanıt doğrudan yazmayla aynıdır.
+
+Grup yazılamazsa satırlar tek tek yeniden denenir, böylece hatalı bir satır
+aynı gruptaki diğer istekleri düşürmez. Tampon process'e özeldir.
+"""
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+import queue
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from . import config
+from .database import SessionLocal
+from .feedback_service import feedback_kaydet, feedback_toplu_kaydet
+
+
+# Commit edilmeyen satırın isteği en fazla bu kadar bekler (saniye)
+_YANIT_ZAMAN_ASIMI = 30.0
+
+
+class YazmaTamponu:
+    """Submit satırlarını toplayıp grup halinde commit eden yazıcı thread"""
+
+    def __init__(self, en_fazla_satir: int, en_fazla_bekleme_ms: float):
+        self.en_fazla_satir = max(1, en_fazla_satir)
+        self.en_fazla_bekleme = max(0.0, en_fazla_bekleme_ms) / 1000
+
+        self._kuyruk: "queue.Queue[Optional[Tuple[dict, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._kilit = threading.Lock()
+        # Son commit'lerin (zaman, satır sayısı, süre ms) örnekleri
+        self._commitler = deque(maxlen=1000)
+        self._sayaclar = {
+            "commits": 0,
+            "rows": 0,
+            "retried_rows": 0,
+            "errors": 0,
+            "max_commit_size": 0
+        }
+
+    @property
+    def aktif(self) -> bool:
+        return self._thread is not None
+
+    def baslat(self):
+        with self._kilit:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._calis, name="feedback-group-commit", daemon=True)
+            self._thread.start()
+
+    def durdur(self):
+        """Kuyruktaki satırları yazıp thread'i durdur"""
+        # Durdurma işareti kilit altında konur: sonrasında gelen istekler doğrudan yazar
+        with self._kilit:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._kuyruk.put(None)
+        thread.join(timeout=_YANIT_ZAMAN_ASIMI)
+        # Durdurulurken kuyruğa girmiş satırlar da yazılsın
+        kalanlar = []
+        while True:
+            try:
+                oge = self._kuyruk.get_nowait()
+            except queue.Empty:
+                break
+            if oge is not None:
+                kalanlar.append(oge)
+        if kalanlar:
+            self._yaz(kalanlar)
+
+    def kaydet(
+        self,
+        db: Session,
+        city_id: str,
+        mesaj: str,
+        kategori: str,
+        zaman: datetime,
+        anahtar_kelime_surumu: Optional[str] = None,
+        duplicate_of: Optional[int] = None,
+        sonrasi: Optional[Callable[[Session, dict], None]] = None
+    ) -> dict:
+        """
+        feedback_kaydet ile aynı: satır commit edilince alanlarını döndürür
+
+        Tampon çalışmıyorsa doğrudan yazar. sonrasi, grubun transaction'ında
+        satır eklendikten sonra çağrılır; hata verirse satır yazılmaz.
+        """
+        # Beklerken isteğin okuma bağlantısı havuza dönsün
+        if db.in_transaction():
+            db.commit()
+        sonuc: Future = Future()
+        with self._kilit:
+            calisiyor = self._thread is not None
+            if calisiyor:
+                self._kuyruk.put(({
+                    "city_id": city_id,
+                    "message": mesaj,
+                    "category": kategori,
+                    "timestamp": zaman,
+                    "keyword_version": anahtar_kelime_surumu,
+                    "duplicate_of": duplicate_of,
+                    "sonrasi": sonrasi
+                }, sonuc))
+        if not calisiyor:
+            return feedback_kaydet(
+                db, city_id, mesaj, kategori, zaman, anahtar_kelime_surumu, duplicate_of, sonrasi
+            )
+        return sonuc.result(timeout=_YANIT_ZAMAN_ASIMI)
+
+    def _calis(self):
+        while True:
+            ilk = self._kuyruk.get()
+            if ilk is None:
+                return
+            grup = [ilk]
+            son = time.monotonic() + self.en_fazla_bekleme
+            dur = False
+            while len(grup) < self.en_fazla_satir:
+                try:
+                    kalan = son - time.monotonic()
+                    oge = self._kuyruk.get(timeout=kalan) if kalan > 0 else self._kuyruk.get_nowait()
+                except queue.Empty:
+                    break
+                if oge is None:
+                    dur = True
+                    break
+                grup.append(oge)
+            try:
+                self._yaz(grup)
+            except Exception as e:
+                # Thread ayakta kalsın; bekleyen istekler hatayı alır
+                for _, sonuc in grup:
+                    if not sonuc.done():
+                        sonuc.set_exception(e)
+                with self._kilit:
+                    self._sayaclar["errors"] += len(grup)
+                print(f"❌ Grup commit hatası: {str(e)}")
+            if dur:
+                return
+
+    def _yaz(self, grup: List[Tuple[dict, Future]]):
+        t0 = time.perf_counter()
+        db = SessionLocal()
+        try:
+            try:
+                satirlar = feedback_toplu_kaydet(db, [kayit for kayit, _ in grup])
+                sonuclar = [(sonuc, satir, None) for (_, sonuc), satir in zip(grup, satirlar)]
+            except Exception:
+                # Hatalı satırı bulmak için tek tek dene
+                sonuclar = []
+                for kayit, sonuc in grup:
+                    try:
+                        sonuclar.append((sonuc, feedback_toplu_kaydet(db, [kayit])[0], None))
+                    except Exception as e:
+                        sonuclar.append((sonuc, None, e))
+                with self._kilit:
+                    self._sayaclar["retried_rows"] += len(grup)
+        finally:
+            db.close()
+        sure_ms = (time.perf_counter() - t0) * 1000
+
+        hatali = 0
+        for sonuc, satir, hata in sonuclar:
+            if hata is None:
+                sonuc.set_result(satir)
+            else:
+                hatali += 1
+                sonuc.set_exception(hata)
+        with self._kilit:
+            self._sayaclar["commits"] += 1
+            self._sayaclar["rows"] += len(grup) - hatali
+            self._sayaclar["errors"] += hatali
+            self._sayaclar["max_commit_size"] = max(self._sayaclar["max_commit_size"], len(grup))
+            self._commitler.append((time.monotonic(), len(grup), sure_ms))
+
+    def metrikler(self) -> dict:
+        """Kuyruk derinliği, commit boyutu ve yazma hızı"""
+        with self._kilit:
+            sayaclar = dict(self._sayaclar)
+            commitler = list(self._commitler)
+        boyutlar = sorted(boyut for _, boyut, _ in commitler)
+        sureler = sorted(sure for _, _, sure in commitler)
+        # Son commit örnekleri aralığındaki yazma hızı
+        aralik = commitler[-1][0] - commitler[0][0] if len(commitler) > 1 else 0
+
+        def yuzdelik(degerler: list, oran: float) -> float:
+            if not degerler:
+                return 0
+            return round(degerler[min(len(degerler) - 1, int(len(degerler) * oran))], 2)
+
+        return {
+            "enabled": config.FEEDBACK_GROUP_COMMIT,
+            "running": self.aktif,
+            "max_rows": self.en_fazla_satir,
+            "max_wait_ms": round(self.en_fazla_bekleme * 1000, 2),
+            "queue_depth": self._kuyruk.qsize(),
+            "rows_per_sec": round(sum(boyut for _, boyut, _ in commitler[1:]) / aralik, 1) if aralik > 0 else 0,
+            "commit_size": {
+                "samples": len(boyutlar),
+                "avg": round(sum(boyutlar) / len(boyutlar), 2) if boyutlar else 0,
+                "p50": yuzdelik(boyutlar, 0.50),
+                "p99": yuzdelik(boyutlar, 0.99)
+            },
+            "commit_ms": {
+                "p50": yuzdelik(sureler, 0.50),
+                "p99": yuzdelik(sureler, 0.99)
+            },
+            **sayaclar
+        }
+
+
+yazma_tamponu = YazmaTamponu(
+    en_fazla_satir=config.FEEDBACK_GROUP_COMMIT_MAX_ROWS,
+    en_fazla_bekleme_ms=config.FEEDBACK_GROUP_COMMIT_MAX_WAIT_MS
+)
+
+
+def tamponu_baslat():
+    """Uygulama açılışında çağrılır - FEEDBACK_GROUP_COMMIT kapalıysa bir şey yapmaz"""
+    if config.FEEDBACK_GROUP_COMMIT:
+        yazma_tamponu.baslat()
+
+
+def tamponu_durdur():
+    yazma_tamponu.durdur()
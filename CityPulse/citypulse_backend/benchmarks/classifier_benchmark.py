@@ -0,0 +1,219 @@
+"""
+Feedback sınıflandırıcı hız ve doğruluk benchmark'ı
+
+Sentetik Türkçe korpus (benchmarks/corpus.py) üzerinde temizle_metin,
+kategori_bul, kategori_detayli_analiz ve kategori_toplu_analiz için
+throughput, p50/p99 gecikme ve tepe bellek ölçer; kategori_bul doğruluğunu
+korpus etiketleriyle karşılaştırır. Rapor JSON olarak yazılır, iki commit
+arasındaki raporlar doğrudan diff'lenebilir.
+
+LRU sonuç önbelleği ölçüm süresince kapatılır (ham motor hızı ölçülür).
+
+Kullanım:
+    python -m benchmarks.classifier_benchmark
+    python -m benchmarks.classifier_benchmark --mesaj-sayisi 50000 --cikti rapor.json
+"""
+from typing import Callable, Dict, List, Tuple
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from app import feedback_classifier
+from app.feedback_classifier import (
+    anahtar_kelime_surumu,
+    kategori_bul,
+    kategori_detayli_analiz,
+    kategori_toplu_analiz,
+    temizle_metin,
+)
+from benchmarks.corpus import korpus_uret, etiket_dagilimi
+
+
+def _yuzdelik(sirali: List[int], oran: float) -> float:
+    if not sirali:
+        return 0
+    indeks = min(len(sirali) - 1, int(len(sirali) * oran))
+    return sirali[indeks] / 1000  # ns -> µs
+
+
+def tekil_olc(fonksiyon: Callable[[str], object], mesajlar: List[str]) -> Dict[str, float]:
+    """Mesaj başına çağrılan fonksiyonun throughput, gecikme ve tepe belleği"""
+    # Isınma
+    for mesaj in mesajlar[:100]:
+        fonksiyon(mesaj)
+
+    gecikmeler = []
+    saat = time.perf_counter_ns
+    baslangic = saat()
+    for mesaj in mesajlar:
+        t0 = saat()
+        fonksiyon(mesaj)
+        gecikmeler.append(saat() - t0)
+    toplam_ns = saat() - baslangic
+
+    # Bellek ölçümü ayrı çalıştırmada (tracemalloc zamanlamayı bozar)
+    tracemalloc.start()
+    for mesaj in mesajlar:
+        fonksiyon(mesaj)
+    _, tepe = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gecikmeler.sort()
+    return {
+        "messages_per_sec": round(len(mesajlar) / (toplam_ns / 1e9), 1),
+        "p50_us": round(_yuzdelik(gecikmeler, 0.50), 2),
+        "p99_us": round(_yuzdelik(gecikmeler, 0.99), 2),
+        "max_us": round(gecikmeler[-1] / 1000, 2) if gecikmeler else 0,
+        "peak_memory_kb": round(tepe / 1024, 1),
+    }
+
+
+def toplu_olc(mesajlar: List[str], parca_boyutu: int) -> Dict[str, float]:
+    """kategori_toplu_analiz için parça bazında throughput, gecikme ve tepe bellek"""
+    parcalar = [mesajlar[i:i + parca_boyutu] for i in range(0, len(mesajlar), parca_boyutu)]
+
+    gecikmeler = []
+    baslangic = time.perf_counter_ns()
+    for parca in parcalar:
+        t0 = time.perf_counter_ns()
+        kategori_toplu_analiz(parca)
+        gecikmeler.append(time.perf_counter_ns() - t0)
+    toplam_ns = time.perf_counter_ns() - baslangic
+
+    tracemalloc.start()
+    for parca in parcalar:
+        kategori_toplu_analiz(parca)
+    _, tepe = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gecikmeler.sort()
+    return {
+        "batch_size": parca_boyutu,
+        "messages_per_sec": round(len(mesajlar) / (toplam_ns / 1e9), 1),
+        "batch_p50_ms": round(_yuzdelik(gecikmeler, 0.50) / 1000, 3),
+        "batch_p99_ms": round(_yuzdelik(gecikmeler, 0.99) / 1000, 3),
+        "peak_memory_kb": round(tepe / 1024, 1),
+    }
+
+
+def dogruluk_olc(korpus: List[Tuple[str, str]]) -> Dict[str, object]:
+    """kategori_bul tahminlerini etiketlerle karşılaştır"""
+    dogru = 0
+    kategori_sayilari: Dict[str, Dict[str, int]] = {}
+
+    def sayac(kategori: str) -> Dict[str, int]:
+        return kategori_sayilari.setdefault(kategori, {"tp": 0, "fp": 0, "fn": 0})
+
+    karisiklik: Dict[str, Dict[str, int]] = {}
+    for mesaj, etiket in korpus:
+        tahmin = kategori_bul(mesaj)
+        satir = karisiklik.setdefault(etiket, {})
+        satir[tahmin] = satir.get(tahmin, 0) + 1
+        if tahmin == etiket:
+            dogru += 1
+            sayac(etiket)["tp"] += 1
+        else:
+            sayac(tahmin)["fp"] += 1
+            sayac(etiket)["fn"] += 1
+
+    kategoriler = {}
+    for kategori, s in sorted(kategori_sayilari.items()):
+        kesinlik = s["tp"] / (s["tp"] + s["fp"]) if s["tp"] + s["fp"] else 0
+        duyarlilik = s["tp"] / (s["tp"] + s["fn"]) if s["tp"] + s["fn"] else 0
+        kategoriler[kategori] = {
+            "precision": round(kesinlik, 4),
+            "recall": round(duyarlilik, 4),
+            "f1": round(2 * kesinlik * duyarlilik / (kesinlik + duyarlilik), 4) if kesinlik + duyarlilik else 0,
+        }
+
+    return {
+        "accuracy": round(dogru / len(korpus), 4) if korpus else 0,
+        "per_category": kategoriler,
+        "confusion": {etiket: dict(sorted(satir.items())) for etiket, satir in sorted(karisiklik.items())},
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "bilinmiyor"
+
+
+def rapor_olustur(args) -> dict:
+    korpus = korpus_uret(
+        args.mesaj_sayisi,
+        tohum=args.tohum,
+        en_az_kelime=args.en_az_kelime,
+        en_cok_kelime=args.en_cok_kelime,
+        dagilim=args.dagilim,
+    )
+    mesajlar = [mesaj for mesaj, _ in korpus]
+
+    # Ham motor hızını ölç - tekrarlanan mesajlar önbellekten dönmesin
+    onbellek_boyutu = feedback_classifier.onbellek.boyut
+    feedback_classifier.onbellek.boyut = 0
+    try:
+        throughput = {
+            "temizle_metin": tekil_olc(temizle_metin, mesajlar),
+            "kategori_bul": tekil_olc(kategori_bul, mesajlar),
+            "kategori_detayli_analiz": tekil_olc(kategori_detayli_analiz, mesajlar),
+            "kategori_toplu_analiz": toplu_olc(mesajlar, args.toplu_boyut),
+        }
+    finally:
+        feedback_classifier.onbellek.boyut = onbellek_boyutu
+
+    return {
+        "meta": {
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "keyword_version": anahtar_kelime_surumu(),
+            "corpus": {
+                "size": len(korpus),
+                "seed": args.tohum,
+                "min_words": args.en_az_kelime,
+                "max_words": args.en_cok_kelime,
+                "distribution": args.dagilim,
+                "avg_words": round(sum(len(m.split()) for m in mesajlar) / len(mesajlar), 2) if mesajlar else 0,
+                "labels": etiket_dagilimi(korpus),
+            },
+        },
+        "throughput": throughput,
+        "accuracy": dogruluk_olc(korpus),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback sınıflandırıcı benchmark'ı")
+    parser.add_argument("--mesaj-sayisi", type=int, default=20000)
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--en-az-kelime", type=int, default=3)
+    parser.add_argument("--en-cok-kelime", type=int, default=25)
+    parser.add_argument("--dagilim", choices=["uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--toplu-boyut", type=int, default=1000, help="kategori_toplu_analiz parça boyutu")
+    parser.add_argument("--cikti", help="JSON raporun yazılacağı dosya (varsayılan: stdout)")
+    args = parser.parse_args()
+
+    rapor = rapor_olustur(args)
+    metin = json.dumps(rapor, ensure_ascii=False, indent=2, sort_keys=True)
+
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(metin + "\n")
+        print(f"✅ Rapor yazıldı: {args.cikti}")
+        for ad, sonuc in rapor["throughput"].items():
+            print(f"   {ad:26} {sonuc['messages_per_sec']:>12,.0f} mesaj/sn")
+        print(f"   {'doğruluk':26} {rapor['accuracy']['accuracy']:.2%}")
+    else:
+        print(metin)
+
+
+if __name__ == "__main__":
+    main()
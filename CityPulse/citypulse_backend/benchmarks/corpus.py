@@ -0,0 +1,135 @@
+"""
+Sınıflandırıcı benchmark'ları için deterministik sentetik Türkçe feedback korpusu
+
+Her mesaj bir etiketle (Trafik, Çevre, Bağlantı veya Öneri) üretilir: etiket
+kategorisinden anahtar kelimeler seçilir ve kategori dışı dolgu kelimeleriyle
+istenen uzunluğa tamamlanır. Öneri mesajları hiç anahtar kelime içermez.
+Aynı tohum ve parametrelerle her çalıştırmada aynı korpus üretilir.
+"""
+from typing import Dict, List, Tuple
+import math
+import random
+
+from app.feedback_classifier import CATEGORY_KEYWORDS, temizle_metin
+
+
+ONERI_KATEGORISI = "Öneri"
+
+# Anahtar kelime içermeyen genel dolgu kelimeleri
+DOLGU_KELIMELERI = [
+    "bugün", "dün", "sabah", "akşam", "gece", "mahallede", "sokağımızda", "evimizin",
+    "önünde", "lütfen", "çok", "yine", "hâlâ", "neden", "bu", "bir", "var", "yok",
+    "ve", "ama", "gibi", "şikayet", "ediyorum", "durum", "sürekli", "acil", "artık",
+    "belediye", "ilgilenmiyor", "haftadır", "günlerdir", "herkes", "mağdur", "oluyor",
+    "rica", "ederim", "teşekkürler", "merkezde", "okulun", "yanında", "hastane",
+    "çarşı", "meydan", "mahalle", "sakinleri", "olarak", "bekliyoruz", "konusunda",
+    "İstanbul", "Ankara", "İzmir", "Kadıköy", "Çankaya", "Konak", "Beşiktaş",
+]
+
+# Öneri mesajları için kalıplar
+ONERI_KALIPLARI = [
+    "buraya bir {} yapılabilir mi",
+    "daha fazla {} olsa güzel olur",
+    "{} için bir etkinlik düzenlenebilir",
+    "şehirde yeni bir {} açılmalı",
+]
+ONERI_NESNELERI = [
+    "kütüphane", "spor salonu", "sergi", "konser", "festival", "kafe", "müze",
+    "oyun alanı", "bisiklet", "kurs", "pazar", "tiyatro",
+]
+
+NOKTALAMA = [".", "!", "?", ",", "...", ""]
+
+
+def _anahtar_kelime_icermeyenler(kelimeler: List[str]) -> List[str]:
+    """Normalize edildiğinde herhangi bir anahtar kelime token'ına denk gelen kelimeleri çıkar"""
+    anahtar_tokenlar = {
+        token
+        for liste in CATEGORY_KEYWORDS.values()
+        for kelime in liste
+        for token in temizle_metin(kelime).split()
+    }
+    return [
+        k for k in kelimeler
+        if not set(temizle_metin(k).split()) & anahtar_tokenlar
+    ]
+
+
+def _asciilestir(metin: str) -> str:
+    """Türkçe karakterleri klavye alışkanlığıyla ASCII'ye çevir ('çekmiyor' -> 'cekmiyor')"""
+    return metin.translate(str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU"))
+
+
+def _kelime_sayisi(rastgele: random.Random, dagilim: str, en_az: int, en_cok: int) -> int:
+    if dagilim == "lognormal":
+        # Kısa mesajlar ağırlıklı, uzun kuyruklu dağılım
+        orta = math.log(max(en_az, 1) + (en_cok - en_az) / 4)
+        sayi = int(round(rastgele.lognormvariate(orta, 0.5)))
+    else:
+        sayi = rastgele.randint(en_az, en_cok)
+    return min(max(sayi, en_az), en_cok)
+
+
+def korpus_uret(
+    adet: int,
+    tohum: int = 42,
+    en_az_kelime: int = 3,
+    en_cok_kelime: int = 25,
+    dagilim: str = "lognormal",
+    oneri_orani: float = 0.2
+) -> List[Tuple[str, str]]:
+    """
+    Etiketli sentetik feedback mesajları üret
+
+    Args:
+        adet: Mesaj sayısı
+        tohum: Rastgele sayı üreteci tohumu
+        en_az_kelime / en_cok_kelime: Mesaj uzunluğu sınırları (kelime)
+        dagilim: 'uniform' veya 'lognormal' uzunluk dağılımı
+        oneri_orani: Anahtar kelime içermeyen (Öneri) mesaj oranı
+
+    Returns:
+        list: [(mesaj, etiket), ...]
+    """
+    rastgele = random.Random(tohum)
+    dolgu = _anahtar_kelime_icermeyenler(DOLGU_KELIMELERI)
+    oneri_nesneleri = _anahtar_kelime_icermeyenler(ONERI_NESNELERI)
+    kategoriler = list(CATEGORY_KEYWORDS)
+    korpus = []
+
+    for _ in range(adet):
+        hedef_uzunluk = _kelime_sayisi(rastgele, dagilim, en_az_kelime, en_cok_kelime)
+
+        if rastgele.random() < oneri_orani:
+            etiket = ONERI_KATEGORISI
+            parcalar = rastgele.choice(ONERI_KALIPLARI).format(rastgele.choice(oneri_nesneleri)).split()
+        else:
+            etiket = rastgele.choice(kategoriler)
+            anahtar_sayisi = min(hedef_uzunluk, rastgele.choice([1, 1, 2, 2, 3]))
+            parcalar = rastgele.sample(CATEGORY_KEYWORDS[etiket], anahtar_sayisi)
+
+        while len(parcalar) < hedef_uzunluk:
+            parcalar.insert(rastgele.randint(0, len(parcalar)), rastgele.choice(dolgu))
+
+        mesaj = " ".join(parcalar) + rastgele.choice(NOKTALAMA)
+
+        # Gerçekçi yazım varyasyonları
+        sans = rastgele.random()
+        if sans < 0.15:
+            mesaj = _asciilestir(mesaj)
+        elif sans < 0.25:
+            mesaj = mesaj.upper()
+        elif sans < 0.6:
+            mesaj = mesaj[:1].upper() + mesaj[1:]
+
+        korpus.append((mesaj, etiket))
+
+    return korpus
+
+
+def etiket_dagilimi(korpus: List[Tuple[str, str]]) -> Dict[str, int]:
+    """Korpustaki etiket sayıları"""
+    dagilim: Dict[str, int] = {}
+    for _, etiket in korpus:
+        dagilim[etiket] = dagilim.get(etiket, 0) + 1
+    return dagilim
@@ -0,0 +1,197 @@
+"""
+Yeşil şehir liderlik tablosu benchmark scripti
+
+Değişiklik öncesi şehir başına sorgu atan döngü (her şehir için sinyal, hava
+kalitesi ve trafik ortalamaları ile city_feedback üzerinde toplam ve çevre
+feedback sayıları) ile gruplu tek sorgu + heap uygulamasını karşılaştırır. sql_app.db'nin geçici bir kopyasına sentetik şehirler (son 8
+günün metrikleri ve birkaç feedback ile) eklenerek şehir sayısı artırılır; her
+boyutta iki uygulamanın aynı ilk K şehri döndürdüğü doğrulanır, sorgu sayısı
+ve medyan gecikme raporlanır. Asıl veritabanına dokunulmaz.
+
+Kullanım:
+    python -m benchmarks.leaderboard_benchmark
+    python -m benchmarks.leaderboard_benchmark --sehir 81 500 2000 --tekrar 5
+"""
+from contextlib import closing
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+
+# ==================== ESKİ UYGULAMA (REFERANS) ====================
+def eski_liderlik(db, days=None, limit=3) -> list:
+    """Değişiklik öncesi get_green_cities_leaderboard döngüsü - (city_id, skor) listesi"""
+    from sqlalchemy import func
+    from app import models
+    from app.classification_queue import BEKLEMEDE_KATEGORISI
+    from app.daily_rollup import CEVRE_KATEGORILERI
+    from app.routers.city_statistics import calculate_city_sustainability_score
+
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=7)
+    cities = db.query(models.City).all()
+    # Sayım kuralları bugünkü endpoint'le aynı: yakın-kopyalar ve sınıflandırılmayı
+    # bekleyen satırlar sayılmaz
+    feedback_kosullari = [
+        models.CityFeedback.duplicate_of.is_(None),
+        models.CityFeedback.category != BEKLEMEDE_KATEGORISI
+    ]
+    if days:
+        feedback_kosullari.append(
+            models.CityFeedback.timestamp >= datetime.combine(end_date - timedelta(days=days), datetime.min.time())
+        )
+
+    city_scores = []
+    for city in cities:
+        avg_signal = db.query(func.avg(models.CityStats.signal_strength)).filter(
+            models.CityStats.city_id == city.city_id,
+            models.CityStats.date >= start_date
+        ).scalar() or 0
+        avg_air_quality = db.query(func.avg(models.CityWeather.air_quality)).filter(
+            models.CityWeather.city_id == city.city_id,
+            models.CityWeather.date >= start_date
+        ).scalar() or 0
+        avg_traffic = db.query(func.avg(models.CityStats.traffic_gb)).filter(
+            models.CityStats.city_id == city.city_id,
+            models.CityStats.date >= start_date
+        ).scalar() or 0
+        total_feedback = db.query(func.count(models.CityFeedback.id)).filter(
+            models.CityFeedback.city_id == city.city_id,
+            *feedback_kosullari
+        ).scalar() or 0
+        eco_feedback = db.query(func.count(models.CityFeedback.id)).filter(
+            models.CityFeedback.city_id == city.city_id,
+            models.CityFeedback.category.in_(CEVRE_KATEGORILERI),
+            *feedback_kosullari
+        ).scalar() or 0
+        eco_feedback_ratio = (eco_feedback / total_feedback * 100) if total_feedback > 0 else 0
+        score = calculate_city_sustainability_score(
+            signal_strength=float(avg_signal),
+            air_quality=float(avg_air_quality),
+            traffic_gb=float(avg_traffic),
+            eco_feedback_ratio=eco_feedback_ratio
+        )
+        city_scores.append((city.city_id, score))
+
+    city_scores.sort(key=lambda x: x[1], reverse=True)
+    return city_scores[:limit]
+
+
+def yeni_liderlik(db, days=None, limit=3) -> list:
+    from app.routers.city_statistics import liderlik_tablosu_hesapla
+
+    yanit = liderlik_tablosu_hesapla(db, datetime.now().date(), days=days, limit=limit)
+    return [(s["city_id"], s["sustainability_score"]) for s in yanit["data"]["top_3_green_cities"]]
+
+
+# ==================== VERİ ====================
+def sehirleri_ekle(yol: str, hedef: int, rastgele: random.Random) -> int:
+    """Şehir sayısı hedefe ulaşana kadar sentetik şehir ve verilerini ekle"""
+    kategoriler = ["Çevre", "Yeşil", "Enerji", "Ulaşım", "Altyapı", "Öneri"]
+    bugun = datetime.now().date()
+    with closing(sqlite3.connect(yol)) as baglanti:
+        mevcut = baglanti.execute("SELECT COUNT(*) FROM cities").fetchone()[0]
+        for i in range(mevcut, hedef):
+            city_id = f"B{i:05d}"
+            baglanti.execute(
+                "INSERT INTO cities(city_id, name, region, population) VALUES (?, ?, ?, ?)",
+                (city_id, f"Benchmark {i}", "Benchmark", rastgele.randint(10_000, 5_000_000))
+            )
+            gunler = [str(bugun - timedelta(days=g)) for g in range(8)]
+            baglanti.executemany(
+                "INSERT INTO city_stats(city_id, date, signal_strength, traffic_gb) VALUES (?, ?, ?, ?)",
+                [(city_id, gun, rastgele.randint(40, 100), rastgele.randint(500, 12000)) for gun in gunler]
+            )
+            baglanti.executemany(
+                "INSERT INTO city_weather(city_id, date, temp_c, air_quality) VALUES (?, ?, ?, ?)",
+                [(city_id, gun, rastgele.randint(-5, 35), rastgele.randint(20, 100)) for gun in gunler]
+            )
+            # Trigger'lar feedback_category_counts sayaçlarını günceller
+            baglanti.executemany(
+                "INSERT INTO city_feedback(city_id, user, message, category, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (city_id, f"bench_{i}_{j}", "benchmark", rastgele.choice(kategoriler),
+                     f"{bugun - timedelta(days=rastgele.randint(0, 30))} 12:00:00")
+                    for j in range(rastgele.randint(0, 8))
+                ]
+            )
+        baglanti.commit()
+        return baglanti.execute("SELECT COUNT(*) FROM cities").fetchone()[0]
+
+
+def olc(fonksiyon, tekrar: int):
+    """(sonuç, sorgu sayısı, medyan ms)"""
+    from sqlalchemy import event
+    from app.database import SessionLocal, engine
+
+    sorgular = []
+
+    def say(*_):
+        sorgular.append(1)
+
+    sureler = []
+    sonuc = None
+    event.listen(engine, "before_cursor_execute", say)
+    try:
+        for _ in range(tekrar):
+            sorgular.clear()
+            db = SessionLocal()
+            try:
+                t0 = time.perf_counter()
+                sonuc = fonksiyon(db)
+                sureler.append((time.perf_counter() - t0) * 1000)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", say)
+    return sonuc, len(sorgular), statistics.median(sureler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yeşil şehir liderlik tablosu benchmark")
+    parser.add_argument("--sehir", type=int, nargs="+", default=[81, 250, 500, 1000, 2000],
+                        help="Ölçülecek şehir sayıları")
+    parser.add_argument("--tekrar", type=int, default=5, help="Boyut başına ölçüm tekrarı")
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--veritabani", default="sql_app.db", help="Kopyalanacak kaynak veritabanı")
+    args = parser.parse_args()
+
+    rastgele = random.Random(args.tohum)
+    basarili = True
+    with tempfile.TemporaryDirectory() as klasor:
+        kopya = os.path.join(klasor, "leaderboard.db")
+        # WAL dosyasındaki commit'ler de kopyaya girsin diye backup API kullanılır
+        with closing(sqlite3.connect(args.veritabani)) as kaynak, closing(sqlite3.connect(kopya)) as hedef:
+            kaynak.backup(hedef)
+        # app modülleri kopyaya bağlansın diye import'lardan önce ayarlanır
+        os.environ["DATABASE_URL"] = f"sqlite:///{kopya}"
+        from app.schema import sema_guncelle
+        sema_guncelle()
+
+        print("=" * 78)
+        print(f"{'şehir':>6} | {'önce: sorgu':>11} {'ms':>9} | {'sonra: sorgu':>12} {'ms':>9} | {'hız':>6}")
+        print("-" * 78)
+        for hedef in sorted(args.sehir):
+            sayi = sehirleri_ekle(kopya, hedef, rastgele)
+            eski, eski_sorgu, eski_ms = olc(lambda db: eski_liderlik(db, limit=args.limit), args.tekrar)
+            yeni, yeni_sorgu, yeni_ms = olc(lambda db: yeni_liderlik(db, limit=args.limit), args.tekrar)
+            ayni = eski == yeni
+            basarili = basarili and ayni
+            print(f"{sayi:>6} | {eski_sorgu:>11} {eski_ms:>9.1f} | {yeni_sorgu:>12} {yeni_ms:>9.1f} | "
+                  f"{eski_ms / yeni_ms:>5.1f}x{'' if ayni else '  ❌ sonuçlar farklı'}")
+        print("=" * 78)
+
+    if not basarili:
+        sys.exit(1)
+    print("✅ Her boyutta eski ve yeni uygulama aynı ilk şehirleri döndürdü")
+
+
+if __name__ == "__main__":
+    main()
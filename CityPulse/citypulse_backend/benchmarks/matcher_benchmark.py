@@ -0,0 +1,190 @@
+"""
+Feedback sınıflandırıcı eşleştirici benchmark scripti
+
+Eski regex döngüsü (her mesajda ~200 regex derleme + tarama) ile derlenmiş
+KeywordIndex tabanlı eşleştiriciyi karşılaştırır. Önce iki uygulamanın
+çıktılarının birebir aynı olduğunu doğrular, sonra mesaj/saniye ölçer.
+
+Kullanım:
+    python -m benchmarks.matcher_benchmark
+    python -m benchmarks.matcher_benchmark --mesaj-sayisi 20000
+"""
+import argparse
+import random
+import re
+import time
+
+from app import feedback_classifier
+from app.feedback_classifier import (
+    CATEGORY_KEYWORDS,
+    temizle_metin,
+    kategori_bul,
+    kategori_detayli_analiz,
+)
+
+
+# ==================== ESKİ UYGULAMA (REFERANS) ====================
+def eski_kategori_bul(mesaj: str) -> str:
+    """Değişiklik öncesi kategori_bul - referans olarak birebir korunmuştur"""
+    if not mesaj or not mesaj.strip():
+        return "Öneri"
+    
+    temiz_mesaj = temizle_metin(mesaj)
+    kategori_skorlari = {}
+    
+    for kategori, kelimeler in CATEGORY_KEYWORDS.items():
+        skor = 0
+        eslesme_sayisi = 0
+        
+        for kelime in kelimeler:
+            temiz_kelime = temizle_metin(kelime)
+            pattern = r'\b' + re.escape(temiz_kelime) + r'\b'
+            eslesme = len(re.findall(pattern, temiz_mesaj))
+            
+            if eslesme > 0:
+                eslesme_sayisi += eslesme
+                skor += eslesme * (len(kelime) / 5)
+        
+        if eslesme_sayisi > 0:
+            kategori_skorlari[kategori] = {
+                'skor': skor,
+                'eslesme': eslesme_sayisi
+            }
+    
+    if kategori_skorlari:
+        return max(
+            kategori_skorlari.items(),
+            key=lambda x: (x[1]['skor'], x[1]['eslesme'])
+        )[0]
+    return "Öneri"
+
+
+def eski_kategori_detayli_analiz(mesaj: str) -> dict:
+    """Değişiklik öncesi kategori_detayli_analiz - referans olarak birebir korunmuştur"""
+    if not mesaj or not mesaj.strip():
+        return {
+            'kategori': 'Öneri',
+            'guven_skoru': 0,
+            'bulunan_kelimeler': [],
+            'analiz_detayi': {}
+        }
+    
+    temiz_mesaj = temizle_metin(mesaj)
+    tum_skorlar = {}
+    tum_kelimeler = {}
+    
+    for kategori, kelimeler in CATEGORY_KEYWORDS.items():
+        skor = 0
+        bulunan = []
+        
+        for kelime in kelimeler:
+            temiz_kelime = temizle_metin(kelime)
+            pattern = r'\b' + re.escape(temiz_kelime) + r'\b'
+            eslesme = len(re.findall(pattern, temiz_mesaj))
+            
+            if eslesme > 0:
+                bulunan.append(kelime)
+                skor += eslesme * (len(kelime) / 5)
+        
+        tum_skorlar[kategori] = skor
+        tum_kelimeler[kategori] = bulunan
+    
+    analiz_detayi = {
+        'tum_skorlar': tum_skorlar,
+        'mesaj_uzunlugu': len(mesaj),
+        'kelime_sayisi': len(mesaj.split())
+    }
+    
+    if any(tum_skorlar.values()):
+        en_iyi_kategori = max(tum_skorlar.items(), key=lambda x: x[1])[0]
+        en_iyi_skor = tum_skorlar[en_iyi_kategori]
+        toplam_skor = sum(tum_skorlar.values())
+        guven_skoru = (en_iyi_skor / toplam_skor * 100) if toplam_skor > 0 else 0
+        
+        return {
+            'kategori': en_iyi_kategori,
+            'guven_skoru': round(guven_skoru, 2),
+            'bulunan_kelimeler': tum_kelimeler[en_iyi_kategori],
+            'analiz_detayi': analiz_detayi
+        }
+    
+    return {
+        'kategori': 'Öneri',
+        'guven_skoru': 0,
+        'bulunan_kelimeler': [],
+        'analiz_detayi': analiz_detayi
+    }
+
+
+# ==================== TEST VERİSİ ====================
+DOLGU_KELIMELERI = [
+    "bugün", "sabah", "akşam", "mahallede", "lütfen", "çok", "yine", "hâlâ",
+    "neden", "bu", "bir", "var", "yok", "ve", "ama", "gibi", "şikayet", "durum",
+    "İstanbul", "Ankara", "merkezde", "sürekli", "acil", "!", "?", ",", "...",
+]
+
+
+def mesajlari_uret(adet: int, tohum: int = 42) -> list:
+    """Anahtar kelime ve dolgu kelimelerinden deterministik test mesajları üret"""
+    rastgele = random.Random(tohum)
+    tum_kelimeler = [k for kelimeler in CATEGORY_KEYWORDS.values() for k in kelimeler]
+    mesajlar = []
+    
+    for _ in range(adet):
+        parcalar = rastgele.choices(DOLGU_KELIMELERI, k=rastgele.randint(3, 15))
+        for _ in range(rastgele.randint(0, 4)):
+            kelime = rastgele.choice(tum_kelimeler)
+            # Büyük harf ve noktalama varyasyonları
+            if rastgele.random() < 0.3:
+                kelime = kelime.upper()
+            parcalar.insert(rastgele.randint(0, len(parcalar)), kelime)
+        mesajlar.append(" ".join(parcalar))
+    
+    return mesajlar
+
+
+def olc(fonksiyon, mesajlar: list) -> float:
+    """Verilen fonksiyonun mesaj/saniye değerini ölç"""
+    baslangic = time.perf_counter()
+    for mesaj in mesajlar:
+        fonksiyon(mesaj)
+    sure = time.perf_counter() - baslangic
+    return len(mesajlar) / sure if sure > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback eşleştirici benchmark")
+    parser.add_argument("--mesaj-sayisi", type=int, default=5000)
+    parser.add_argument("--tohum", type=int, default=42)
+    args = parser.parse_args()
+    
+    mesajlar = mesajlari_uret(args.mesaj_sayisi, args.tohum)
+    
+    # 1. Doğruluk kontrolü - çıktılar birebir aynı olmalı
+    for mesaj in mesajlar:
+        assert kategori_bul(mesaj) == eski_kategori_bul(mesaj), mesaj
+        assert kategori_detayli_analiz(mesaj) == eski_kategori_detayli_analiz(mesaj), mesaj
+    print(f"✅ {len(mesajlar)} mesajda eski ve yeni çıktılar birebir aynı")
+    
+    # 2. Hız ölçümü - doğruluk döngüsü LRU önbelleğini doldurdu; ham eşleştirici
+    #    hızı ölçülsün diye önbellek ölçüm süresince kapatılır
+    onbellek_boyutu = feedback_classifier.onbellek.boyut
+    feedback_classifier.onbellek.temizle()
+    feedback_classifier.onbellek.boyut = 0
+    try:
+        print("=" * 60)
+        for ad, eski, yeni in [
+            ("kategori_bul", eski_kategori_bul, kategori_bul),
+            ("kategori_detayli_analiz", eski_kategori_detayli_analiz, kategori_detayli_analiz),
+        ]:
+            eski_hiz = olc(eski, mesajlar)
+            yeni_hiz = olc(yeni, mesajlar)
+            print(f"{ad:26} önce: {eski_hiz:10,.0f} mesaj/sn  |  sonra: {yeni_hiz:10,.0f} mesaj/sn  "
+                  f"({yeni_hiz / eski_hiz:.1f}x)")
+        print("=" * 60)
+    finally:
+        feedback_classifier.onbellek.boyut = onbellek_boyutu
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Canlı akış (SSE) boşta abone yük testi
+
+sql_app.db'nin geçici bir kopyası üzerinde tek event loop'ta (tek worker gibi)
+N adet /api/stream/city/{city_id} bağlantısını doğrudan ASGI ile açar ve
+şehirlere dağıtır. Bağlantılar boşta beklerken bellek artışı ve event loop
+gecikmesi ölçülür; ardından başka bir thread'den feedback yazılır ve olayın
+o şehrin tüm abonelerine ulaşma süresi raporlanır.
+
+Kullanım:
+    python -m benchmarks.stream_subscribers
+    python -m benchmarks.stream_subscribers --abone 5000 --sehir 81
+"""
+from contextlib import closing
+from datetime import datetime
+from typing import List
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+
+def _rss_mb() -> float:
+    # Linux'ta ru_maxrss KB'dir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _abone(app, city_id: str, alinan: dict, bitti: asyncio.Event):
+    yol = f"/api/stream/city/{city_id}"
+
+    async def receive():
+        await bitti.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mesaj):
+        if mesaj["type"] == "http.response.body" and b"event: feedback" in mesaj.get("body", b""):
+            alinan.setdefault(city_id, []).append(time.perf_counter())
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": yol,
+        "raw_path": yol.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    await app(scope, receive, send)
+
+
+async def _loop_gecikmesi(sure: float) -> List[float]:
+    """sleep(0.01) çağrılarının planlanandan ne kadar geç döndüğü (ms)"""
+    gecikmeler = []
+    bitis = time.perf_counter() + sure
+    while time.perf_counter() < bitis:
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        gecikmeler.append((time.perf_counter() - t0 - 0.01) * 1000)
+    return sorted(gecikmeler)
+
+
+async def yuk_testi(args) -> dict:
+    from sqlalchemy import text
+    from main import app
+    from app.city_stream import canli_akis
+    from app.database import SessionLocal
+    from app.feedback_service import feedback_kaydet
+    from app.schema import sema_guncelle
+
+    sema_guncelle()
+    db = SessionLocal()
+    try:
+        sehirler = list(db.execute(
+            text("SELECT city_id FROM cities ORDER BY city_id LIMIT :n"), {"n": args.sehir}
+        ).scalars())
+    finally:
+        db.close()
+
+    canli_akis.en_fazla_abone = max(canli_akis.en_fazla_abone, args.abone)
+    canli_akis.baslat()
+    alinan: dict = {}
+    bitti = asyncio.Event()
+    rss_once = _rss_mb()
+    t0 = time.perf_counter()
+    gorevler = [
+        asyncio.create_task(_abone(app, sehirler[i % len(sehirler)], alinan, bitti))
+        for i in range(args.abone)
+    ]
+    while canli_akis.metrikler()["subscribers"] < args.abone:
+        await asyncio.sleep(0.01)
+    baglanma_sn = time.perf_counter() - t0
+
+    bosta = await _loop_gecikmesi(args.bekleme)
+    rss_sonra = _rss_mb()
+
+    # Başka bir process gibi: feedback yaz, olay abonelere ulaşana kadar bekle
+    hedef = sehirler[0]
+    hedef_abone = sum(1 for i in range(args.abone) if sehirler[i % len(sehirler)] == hedef)
+
+    def yaz():
+        db = SessionLocal()
+        try:
+            feedback_kaydet(db, hedef, "canlı akış yük testi", "Öneri", datetime.now())
+        finally:
+            db.close()
+
+    yazma = time.perf_counter()
+    await asyncio.to_thread(yaz)
+    while len(alinan.get(hedef, [])) < hedef_abone and time.perf_counter() - yazma < 30:
+        await asyncio.sleep(0.005)
+    ulasma = sorted((t - yazma) * 1000 for t in alinan.get(hedef, []))
+
+    bitti.set()
+    await asyncio.gather(*gorevler, return_exceptions=True)
+    await canli_akis.durdur()
+
+    def yuzdelik(degerler: List[float], oran: float) -> float:
+        if not degerler:
+            return 0
+        return round(degerler[min(len(degerler) - 1, int(len(degerler) * oran))], 2)
+
+    return {
+        "ok": len(ulasma) == hedef_abone and canli_akis.metrikler()["subscribers"] == 0,
+        "subscribers": args.abone,
+        "cities": len(sehirler),
+        "connect_sec": round(baglanma_sn, 2),
+        "rss_mb": {
+            "before": round(rss_once, 1),
+            "after": round(rss_sonra, 1),
+            "per_1000_subscribers": round((rss_sonra - rss_once) / args.abone * 1000, 2)
+        },
+        "idle_loop_lag_ms": {"p50": yuzdelik(bosta, 0.50), "p99": yuzdelik(bosta, 0.99)},
+        "fanout": {
+            "subscribers": hedef_abone,
+            "delivered": len(ulasma),
+            "first_ms": yuzdelik(ulasma, 0),
+            "last_ms": round(ulasma[-1], 2) if ulasma else 0
+        },
+        "config": {"poll_interval": canli_akis.kontrol_araligi, "queue_size": canli_akis.kuyruk_boyutu}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canlı akış boşta abone yük testi")
+    parser.add_argument("--abone", type=int, default=2000, help="Açılacak SSE bağlantısı")
+    parser.add_argument("--sehir", type=int, default=81, help="Abonelerin dağıtıldığı şehir sayısı")
+    parser.add_argument("--bekleme", type=float, default=3.0, help="Boşta ölçüm süresi (saniye)")
+    parser.add_argument("--veritabani", default="sql_app.db", help="Kopyalanacak kaynak veritabanı")
+    args = parser.parse_args()
+    args.abone = max(1, args.abone)
+
+    with tempfile.TemporaryDirectory() as klasor:
+        kopya = os.path.join(klasor, "stream_test.db")
+        # WAL dosyasındaki commit'ler de kopyaya girsin diye backup API kullanılır
+        with closing(sqlite3.connect(args.veritabani)) as kaynak, closing(sqlite3.connect(kopya)) as hedef:
+            kaynak.backup(hedef)
+        os.environ["DATABASE_URL"] = f"sqlite:///{kopya}"
+        rapor = asyncio.run(yuk_testi(args))
+
+    print(json.dumps(rapor, ensure_ascii=False, indent=2, sort_keys=True))
+    if not rapor["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Eşzamanlı feedback submit yük testi
+
+sql_app.db'nin geçici bir kopyası üzerinde submit endpoint fonksiyonunu birden
+fazla process ve thread'den aynı anda çağırır (uvicorn worker'ları ve request
+threadpool'u gibi). Test sonunda:
+- feedback id'lerinin ve user_N numaralarının tekil olduğu,
+- kaydedilen satır sayısının başarılı istek sayısına eşit olduğu,
+- id_counters sayacının verilen son numarayla aynı olduğu
+doğrulanır; p50/p95/p99 gecikme ve istek/saniye raporlanır. Doğrulama
+başarısızsa çıkış kodu 1'dir.
+
+Asıl veritabanına dokunulmaz. DUPLICATE_MODE=collapse ise yeni kayıt
+oluşmadığından test süresince flag moduna alınır.
+
+FEEDBACK_GROUP_COMMIT açıksa her worker process grup commit tamponunu başlatır;
+rapora commit sayısı ve ortalama commit boyutu eklenir. --karsilastir aynı yükü
+istek başına commit ve grup commit ile ayrı process'lerde çalıştırıp karşılaştırır.
+
+Kullanım:
+    python -m benchmarks.submit_load
+    python -m benchmarks.submit_load --istek-sayisi 5000 --process 4 --thread 8
+    python -m benchmarks.submit_load --karsilastir
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from multiprocessing import Pool
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import korpus_uret
+
+
+def _yuzdelik(sirali: List[int], oran: float) -> float:
+    if not sirali:
+        return 0
+    indeks = min(len(sirali) - 1, int(len(sirali) * oran))
+    return sirali[indeks] / 1e6  # ns -> ms
+
+
+def _istek_gonder(istek: Tuple[str, str]) -> Tuple[int, object, object, str]:
+    """Tek submit çağrısı: (gecikme_ns, id, user, hata)"""
+    from fastapi import HTTPException
+    from app.database import SessionLocal
+    from app.routers.feedback import FeedbackFromFlutter, submit_feedback_from_flutter
+
+    city_id, mesaj = istek
+    db = SessionLocal()
+    t0 = time.perf_counter_ns()
+    try:
+        yanit = submit_feedback_from_flutter(FeedbackFromFlutter(city_id=city_id, message=mesaj), db=db)
+        gecikme = time.perf_counter_ns() - t0
+        return gecikme, yanit["data"]["id"], yanit["data"]["user"], ""
+    except HTTPException as e:
+        return time.perf_counter_ns() - t0, None, None, str(e.detail)
+    finally:
+        db.close()
+
+
+def _process_calistir(parametre: Tuple[List[Tuple[str, str]], int]) -> Tuple[List[Tuple[int, object, object, str]], int]:
+    """Bir worker process: istekleri thread havuzuyla eşzamanlı gönder (sonuçlar, commit sayısı)"""
+    from app.write_buffer import tamponu_baslat, tamponu_durdur, yazma_tamponu
+
+    istekler, thread_sayisi = parametre
+    tamponu_baslat()
+    try:
+        with ThreadPoolExecutor(max_workers=thread_sayisi) as havuz:
+            sonuclar = list(havuz.map(_istek_gonder, istekler))
+    finally:
+        tamponu_durdur()
+    # Tampon kapalıyken her başarılı istek kendi commit'ini yapar
+    commitler = yazma_tamponu.metrikler()["commits"] or sum(1 for s in sonuclar if not s[3])
+    return sonuclar, commitler
+
+
+def _durum(db_url: str) -> Dict[str, int]:
+    from sqlalchemy import create_engine, text
+
+    motor = create_engine(db_url)
+    try:
+        with motor.connect() as conn:
+            return {
+                "rows": conn.execute(text("SELECT COUNT(*) FROM city_feedback")).scalar(),
+                "counter": conn.execute(
+                    text("SELECT value FROM id_counters WHERE name = 'feedback_user'")
+                ).scalar(),
+            }
+    finally:
+        motor.dispose()
+
+
+def yuk_testi(args, db_url: str) -> dict:
+    from sqlalchemy import create_engine, text
+    from app.schema import sema_guncelle
+
+    sema_guncelle()
+
+    motor = create_engine(db_url)
+    with motor.connect() as conn:
+        sehirler = [r[0] for r in conn.execute(text("SELECT city_id FROM cities ORDER BY city_id"))]
+    motor.dispose()
+    if not sehirler:
+        raise SystemExit("Veritabanında şehir yok")
+
+    korpus = korpus_uret(args.istek_sayisi, tohum=args.tohum)
+    istekler = [(sehirler[i % len(sehirler)], mesaj) for i, (mesaj, _) in enumerate(korpus)]
+    parcalar = [(istekler[i::args.process], args.thread) for i in range(args.process)]
+
+    once = _durum(db_url)
+    baslangic = time.perf_counter()
+    if args.process == 1:
+        ciktilar = [_process_calistir(parcalar[0])]
+    else:
+        with Pool(args.process) as havuz:
+            ciktilar = havuz.map(_process_calistir, parcalar)
+    sonuclar = [s for parca, _ in ciktilar for s in parca]
+    commitler = sum(c for _, c in ciktilar)
+    sure = time.perf_counter() - baslangic
+    sonra = _durum(db_url)
+
+    basarili = [s for s in sonuclar if not s[3]]
+    hatalar = [s[3] for s in sonuclar if s[3]]
+    idler = [s[1] for s in basarili]
+    kullanicilar = [s[2] for s in basarili]
+    numaralar = [int(k.split("_", 1)[1]) for k in kullanicilar]
+    gecikmeler = sorted(s[0] for s in basarili)
+
+    kontroller = {
+        "unique_ids": len(set(idler)) == len(idler),
+        "unique_users": len(set(kullanicilar)) == len(kullanicilar),
+        "rows_match": sonra["rows"] - once["rows"] == len(basarili),
+        "counter_match": not numaralar or sonra["counter"] == max(numaralar),
+    }
+    from app import config
+
+    return {
+        "config": {
+            "requests": len(istekler),
+            "processes": args.process,
+            "threads_per_process": args.thread,
+            "group_commit": config.FEEDBACK_GROUP_COMMIT,
+        },
+        "commits": commitler,
+        "avg_commit_size": round(len(basarili) / commitler, 2) if commitler else 0,
+        "checks": kontroller,
+        "ok": all(kontroller.values()) and not hatalar,
+        "errors": len(hatalar),
+        "error_samples": hatalar[:5],
+        "requests_per_sec": round(len(sonuclar) / sure, 1) if sure else 0,
+        "latency_ms": {
+            "p50": round(_yuzdelik(gecikmeler, 0.50), 3),
+            "p95": round(_yuzdelik(gecikmeler, 0.95), 3),
+            "p99": round(_yuzdelik(gecikmeler, 0.99), 3),
+            "max": round(gecikmeler[-1] / 1e6, 3) if gecikmeler else 0,
+        },
+    }
+
+
+def karsilastir(args) -> dict:
+    """Aynı yükü istek başına commit ve grup commit ile ayrı process'lerde çalıştır"""
+    raporlar = {}
+    with tempfile.TemporaryDirectory() as klasor:
+        for ad, deger in (("per_request", "0"), ("group_commit", "1")):
+            cikti = os.path.join(klasor, f"{ad}.json")
+            komut = [
+                sys.executable, "-m", "benchmarks.submit_load",
+                "--istek-sayisi", str(args.istek_sayisi), "--process", str(args.process),
+                "--thread", str(args.thread), "--tohum", str(args.tohum),
+                "--veritabani", args.veritabani, "--cikti", cikti
+            ]
+            subprocess.run(komut, env={**os.environ, "FEEDBACK_GROUP_COMMIT": deger}, check=False)
+            with open(cikti, encoding="utf-8") as f:
+                raporlar[ad] = json.load(f)
+
+    once, sonra = raporlar["per_request"], raporlar["group_commit"]
+    return {
+        **raporlar,
+        "ok": once["ok"] and sonra["ok"],
+        "speedup": round(sonra["requests_per_sec"] / once["requests_per_sec"], 2)
+        if once["requests_per_sec"] else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşzamanlı feedback submit yük testi")
+    parser.add_argument("--istek-sayisi", type=int, default=2000)
+    parser.add_argument("--process", type=int, default=2, help="Worker process sayısı")
+    parser.add_argument("--thread", type=int, default=16, help="Process başına eşzamanlı thread")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--veritabani", default="sql_app.db", help="Kopyalanacak kaynak veritabanı")
+    parser.add_argument("--cikti", help="JSON raporun yazılacağı dosya (varsayılan: stdout)")
+    parser.add_argument("--karsilastir", action="store_true",
+                        help="İstek başına commit ile grup commit'i karşılaştır")
+    args = parser.parse_args()
+    args.process = max(1, args.process)
+    args.thread = max(1, args.thread)
+
+    if args.karsilastir:
+        rapor = karsilastir(args)
+        print(json.dumps(rapor, ensure_ascii=False, indent=2, sort_keys=True))
+        if not rapor["ok"]:
+            sys.exit(1)
+        return
+
+    with tempfile.TemporaryDirectory() as klasor:
+        kopya = os.path.join(klasor, "load_test.db")
+        # WAL dosyasındaki commit'ler de kopyaya girsin diye backup API kullanılır
+        with closing(sqlite3.connect(args.veritabani)) as kaynak, closing(sqlite3.connect(kopya)) as hedef:
+            kaynak.backup(hedef)
+        db_url = f"sqlite:///{kopya}"
+        # Worker process'ler ayarları ortamdan devralır (app modülleri henüz import edilmedi)
+        os.environ["DATABASE_URL"] = db_url
+        if os.getenv("DUPLICATE_MODE", "").lower() == "collapse":
+            os.environ["DUPLICATE_MODE"] = "flag"
+
+        rapor = yuk_testi(args, db_url)
+
+    metin = json.dumps(rapor, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(metin + "\n")
+        print(f"✅ Rapor yazıldı: {args.cikti}")
+        print(f"   {rapor['requests_per_sec']:,.0f} istek/sn, p99 {rapor['latency_ms']['p99']} ms")
+    else:
+        print(metin)
+
+    if not rapor["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
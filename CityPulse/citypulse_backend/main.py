@@ -1,17 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine
-from app import models
+from app import config, models
+from app.classifier_pool import havuzu_baslat, havuzu_kapat
+from app.city_stream import canli_akis
+from app.classification_queue import kuyrugu_baslat, kuyrugu_durdur
+from app.duplicate_index import indeksi_kur
+from app.feedback_classifier import dosya_izleyici
+from app.feedback_service import referanslar
+from app.idempotency import temizleyiciyi_baslat, temizleyiciyi_durdur
+from app.linear_classifier import motoru_baslat
+from app.schema import sema_guncelle
+from app.write_buffer import tamponu_baslat, tamponu_durdur
 from app.routers import cities, stats, feedback
 
 # NOT: Veritabanı zaten mevcut - sadece bağlanıyoruz, tablo oluşturmuyoruz
 # models.Base.metadata.create_all(bind=engine)  # KAPALI - Veritabanı hazır
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Uygulama açılış/kapanış işlemleri"""
+    # Sonradan eklenen kolon/tabloları uygula
+    sema_guncelle()
+    # Şehir adlarını ve kategori haritasını belleğe al
+    referanslar.yukle()
+    # CLASSIFIER_ENGINE=linear ise doğrusal modeli yükle
+    motoru_baslat()
+    # CLASSIFIER_MODE=process ise sınıflandırma havuzunu ısıt
+    havuzu_baslat()
+    # Anahtar kelime dosyası değişince indeksi yenile
+    dosya_izleyici.baslat(config.CLASSIFIER_KEYWORDS_RELOAD_INTERVAL)
+    # Yakın-kopya indeksini son feedback'lerden kur
+    indeksi_kur()
+    # CLASSIFIER_ASYNC açıksa bekleyen feedback'leri arka planda sınıflandır
+    kuyrugu_baslat()
+    # FEEDBACK_GROUP_COMMIT açıksa submit yazmalarını grup halinde commit et
+    tamponu_baslat()
+    # Süresi dolan idempotency anahtarlarını arka planda sil
+    temizleyiciyi_baslat()
+    # Canlı akış: yeni değişiklikleri şehir abonelerine dağıt
+    canli_akis.baslat()
+    yield
+    await canli_akis.durdur()
+    temizleyiciyi_durdur()
+    tamponu_durdur()
+    kuyrugu_durdur()
+    dosya_izleyici.durdur()
+    havuzu_kapat()
+
+
 # FastAPI uygulamasını oluştur
 app = FastAPI(
     title="Turkcell Code Night - Yolcu Projesi API",
     description="Mevcut veritabanından veri çeker ve Flutter'a sunar - READ-ONLY modda çalışır",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS ayarları - Flutter mobil uygulamanın API'ye erişebilmesi için
@@ -30,12 +75,13 @@ app.include_router(feedback.router)
 app.include_router(feedback.categories_router)
 
 # Yeni eklenen router'lar
-from app.routers import weather, paycell, scores, city_statistics, location
+from app.routers import weather, paycell, scores, city_statistics, location, stream
 app.include_router(weather.router)
 app.include_router(paycell.router)
 app.include_router(scores.router)
 app.include_router(city_statistics.router)
 app.include_router(location.router)
+app.include_router(stream.router)
 
 
 @app.get("/")
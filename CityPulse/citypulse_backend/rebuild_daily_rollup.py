@@ -0,0 +1,42 @@
+"""
+city_daily_rollup özetlerini yeniden oluşturma scripti
+
+Özetler kaynak tablolara yazılınca trigger'larla güncellenir. Trigger'lar
+kapalıyken yüklenmiş veri (ör. başka bir araçla içe aktarma) veya
+CEVRE_KATEGORILERI değişikliği sonrası bir tarih aralığının özetleri
+kaynaklardan baştan hesaplanır. Aralık verilmezse tüm günler işlenir.
+
+Kullanım:
+    python rebuild_daily_rollup.py
+    python rebuild_daily_rollup.py --baslangic 2025-11-01 --bitis 2025-11-30
+"""
+from datetime import date
+import argparse
+
+from app.daily_rollup import yeniden_olustur
+from app.database import SessionLocal
+from app.schema import sema_guncelle
+
+
+def ozetleri_yeniden_olustur(baslangic: date, bitis: date):
+    sema_guncelle()
+    db = SessionLocal()
+    try:
+        sayi = yeniden_olustur(db, baslangic, bitis)
+        print(f"✅ {baslangic} - {bitis} arası {sayi} şehir x gün özeti yeniden hesaplandı")
+    except Exception as e:
+        print(f"\n❌ HATA: {str(e)}")
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="city_daily_rollup özetlerini yeniden oluştur")
+    parser.add_argument("--baslangic", type=date.fromisoformat, default=date.min, help="İlk gün (YYYY-MM-DD)")
+    parser.add_argument("--bitis", type=date.fromisoformat, default=date.max, help="Son gün (YYYY-MM-DD, dahil)")
+    args = parser.parse_args()
+
+    if args.baslangic > args.bitis:
+        parser.error("--baslangic --bitis'ten sonra olamaz")
+    ozetleri_yeniden_olustur(args.baslangic, args.bitis)
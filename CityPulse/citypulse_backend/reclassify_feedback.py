@@ -0,0 +1,260 @@
+"""
+city_feedback tablosundaki kategorileri yeniden hesaplama scripti
+
+Anahtar kelimeler (app/data/category_keywords.json) değiştiğinde kayıtlı
+kategoriler eskir. Bu script tüm feedback'leri id sırasıyla parça parça okur,
+mesajları birden fazla process'te yeniden sınıflandırır ve değişen
+kategorileri toplu UPDATE ile yazar.
+
+- Bellek kullanımı tablo boyutundan bağımsızdır: aynı anda en fazla
+  (worker sayısı x 2) parça bellekte tutulur.
+- Her parça commit edildikten sonra kontrol noktası dosyasına son id yazılır;
+  yarıda kalan çalışma aynı komutla kaldığı yerden devam eder.
+- Anahtar kelimeler değiştiyse eski kontrol noktası yok sayılır.
+- Kategorisi değişen satırlara kategoriyi belirleyen sürüm yazılır (anahtar
+  kelime sürümü veya doğrusal model sürümü).
+- Motor uygulamadaki gibi CLASSIFIER_ENGINE ile seçilir, --motor ile
+  değiştirilebilir. Doğrusal modelin emin olmadığı mesajlar kural motoruna düşer.
+- Hata olursa kontrol noktası korunur ve script 1 koduyla çıkar.
+
+Kullanım:
+    python reclassify_feedback.py
+    python reclassify_feedback.py --parca-boyutu 5000 --isci-sayisi 4
+    python reclassify_feedback.py --bastan --onayla
+    python reclassify_feedback.py --motor linear
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import select, update
+from app.database import SessionLocal
+from app import config, linear_classifier, models
+from app.feedback_classifier import anahtar_kelime_surumu, kategori_toplu_analiz
+from app.schema import sema_guncelle
+
+
+VARSAYILAN_KONTROL_NOKTASI = ".reclassify_checkpoint.json"
+
+
+def kontrol_noktasi_oku(yol: str, surum: str) -> dict:
+    """Kontrol noktasını oku - yoksa veya anahtar kelimeler değiştiyse baştan başla"""
+    bos = {"son_id": 0, "islenen": 0, "guncellenen": 0, "surum": surum}
+    if not os.path.exists(yol):
+        return bos
+
+    with open(yol, encoding="utf-8") as f:
+        durum = json.load(f)
+
+    if durum.get("surum") != surum:
+        print("⚠️  Anahtar kelimeler kontrol noktasından sonra değişmiş, baştan başlanıyor")
+        return bos
+    return durum
+
+
+def kontrol_noktasi_yaz(yol: str, durum: dict):
+    """Kontrol noktasını atomik olarak yaz (yarım dosya kalmasın)"""
+    gecici = yol + ".tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(durum, f)
+    os.replace(gecici, yol)
+
+
+def satirlari_akit(db, son_id: int, parca_boyutu: int):
+    """
+    id > son_id olan feedback'leri id sırasıyla parça parça döndür
+
+    Her parça ayrı ve sınırlı bir sorgudur (keyset sayfalama); SQLite'ta açık bir
+    okuma cursor'ı varken başka bir bağlantıdan commit yapılamadığı için uzun
+    ömürlü tek cursor yerine bu yöntem kullanılır.
+    """
+    while True:
+        parca = db.execute(
+            select(
+                models.CityFeedback.id,
+                models.CityFeedback.message,
+                models.CityFeedback.category
+            )
+            .where(models.CityFeedback.id > son_id)
+            .order_by(models.CityFeedback.id)
+            .limit(parca_boyutu)
+        ).all()
+
+        if not parca:
+            return
+
+        yield parca
+        son_id = parca[-1].id
+
+
+def motoru_hazirla(motor: str):
+    """Ana process ve worker'larda seçilen sınıflandırma motorunu yükle"""
+    config.CLASSIFIER_ENGINE = motor
+    linear_classifier.motoru_baslat()
+
+
+def motor_surumu() -> str:
+    """Kontrol noktası sürümü: anahtar kelimeler ve (varsa) doğrusal model"""
+    model = linear_classifier.aktif_model()
+    surum = anahtar_kelime_surumu()
+    return f"{surum}+{model.surum}" if model is not None else surum
+
+
+def parca_siniflandir(mesajlar: list) -> list:
+    """Worker process'te çalışır - mesajların yeni (kategori, sürüm) çiftlerini döndür"""
+    tahminler = linear_classifier.guvenli_tahminler(mesajlar)
+    dusenler = [mesaj for mesaj, tahmin in zip(mesajlar, tahminler) if tahmin is None]
+    kural_sonuclari = iter(kategori_toplu_analiz(dusenler) if dusenler else [])
+    surum = anahtar_kelime_surumu()
+    return [
+        (next(kural_sonuclari)['kategori'], surum) if tahmin is None else (tahmin[0], tahmin[3])
+        for tahmin in tahminler
+    ]
+
+
+def kategorileri_hazirla(db, kategoriler: set, bilinen: set):
+    """Veritabanında olmayan kategorileri oluştur (foreign key için)"""
+    for kategori in kategoriler - bilinen:
+        if db.get(models.FeedbackCategory, kategori) is None:
+            db.add(models.FeedbackCategory(
+                category=kategori,
+                description=f"{kategori} kategorisi için feedback'ler"
+            ))
+        bilinen.add(kategori)
+
+
+def tum_feedbackleri_yeniden_siniflandir(
+    parca_boyutu: int = 2000,
+    isci_sayisi: int = 2,
+    kontrol_noktasi: str = VARSAYILAN_KONTROL_NOKTASI,
+    deneme: bool = False,
+    motor: str = config.CLASSIFIER_ENGINE
+):
+    """Tüm feedback kategorilerini yeniden hesapla ve değişenleri güncelle"""
+    sema_guncelle()
+    motoru_hazirla(motor)
+    db = SessionLocal()
+    surum = motor_surumu()
+    durum = kontrol_noktasi_oku(kontrol_noktasi, surum)
+    bilinen_kategoriler = set()
+
+    print("=" * 70)
+    print("🔄 FEEDBACK YENİDEN SINIFLANDIRMA BAŞLIYOR")
+    print(f"   Sınıflandırıcı sürümü: {surum}  |  Başlangıç id: > {durum['son_id']}")
+    print("=" * 70)
+
+    baslangic = time.perf_counter()
+    bu_calisma = 0
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=isci_sayisi,
+            initializer=motoru_hazirla,
+            initargs=(motor,)
+        ) as havuz:
+            bekleyenler = deque()
+            parcalar = satirlari_akit(db, durum["son_id"], parca_boyutu)
+
+            def parca_gonder() -> bool:
+                parca = next(parcalar, None)
+                if parca is None:
+                    return False
+                mesajlar = [satir.message for satir in parca]
+                bekleyenler.append((parca, havuz.submit(parca_siniflandir, mesajlar)))
+                return True
+
+            # Worker'ları meşgul tutacak kadar parça önden gönder (bellek sınırlı kalır)
+            for _ in range(isci_sayisi * 2):
+                if not parca_gonder():
+                    break
+
+            while bekleyenler:
+                parca, gorev = bekleyenler.popleft()
+                yeni_kategoriler = gorev.result()
+                parca_gonder()
+
+                degisenler = [
+                    {"id": satir.id, "category": yeni, "keyword_version": yeni_surum}
+                    for satir, (yeni, yeni_surum) in zip(parca, yeni_kategoriler)
+                    if satir.category != yeni
+                ]
+
+                if degisenler and not deneme:
+                    kategorileri_hazirla(db, {d["category"] for d in degisenler}, bilinen_kategoriler)
+                    # Birincil anahtara göre toplu UPDATE (executemany)
+                    db.execute(update(models.CityFeedback), degisenler)
+                db.commit()
+
+                durum["son_id"] = parca[-1].id
+                durum["islenen"] += len(parca)
+                durum["guncellenen"] += len(degisenler)
+                if not deneme:
+                    kontrol_noktasi_yaz(kontrol_noktasi, durum)
+
+                bu_calisma += len(parca)
+                sure = time.perf_counter() - baslangic
+                print(f"   📦 id ≤ {durum['son_id']}: {durum['islenen']} satır işlendi, "
+                      f"{durum['guncellenen']} güncellendi  |  {bu_calisma / sure:,.0f} satır/sn")
+
+        sure = time.perf_counter() - baslangic
+        print("\n" + "=" * 70)
+        print("✨ YENİDEN SINIFLANDIRMA TAMAMLANDI" + (" (deneme - yazılmadı)" if deneme else ""))
+        print(f"📈 Toplam {durum['islenen']} satır işlendi, {durum['guncellenen']} kategori değişti")
+        if bu_calisma:
+            print(f"⏱️  Bu çalışma: {bu_calisma} satır, {sure:.2f} sn ({bu_calisma / sure:,.0f} satır/sn)")
+        print("=" * 70)
+
+        # İş bitti - bir sonraki çalışma baştan başlasın
+        if not deneme and os.path.exists(kontrol_noktasi):
+            os.remove(kontrol_noktasi)
+
+    except KeyboardInterrupt:
+        db.rollback()
+        print(f"\n⏸️  Durduruldu. Son kaydedilen id: {durum['son_id']} - tekrar çalıştırınca devam eder.")
+    except Exception as e:
+        print(f"\n❌ HATA: {str(e)}")
+        print(f"   Son kaydedilen id: {durum['son_id']} - tekrar çalıştırınca devam eder.")
+        db.rollback()
+        # cron/CI başarısız çalışmayı görsün
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="city_feedback kategorilerini yeniden hesapla")
+    parser.add_argument("--parca-boyutu", type=int, default=2000, help="Parça başına satır sayısı")
+    parser.add_argument("--isci-sayisi", type=int, default=os.cpu_count() or 2, help="Worker process sayısı")
+    parser.add_argument("--kontrol-noktasi", default=VARSAYILAN_KONTROL_NOKTASI, help="Kontrol noktası dosyası")
+    parser.add_argument("--bastan", action="store_true", help="Kontrol noktasını yok say, baştan başla")
+    parser.add_argument("--deneme", action="store_true", help="Sadece say, veritabanına yazma")
+    parser.add_argument("--onayla", action="store_true", help="Onay sormadan çalıştır")
+    parser.add_argument(
+        "--motor", choices=["rules", "linear"], default=config.CLASSIFIER_ENGINE,
+        help="Sınıflandırma motoru (varsayılan: CLASSIFIER_ENGINE)"
+    )
+    args = parser.parse_args()
+
+    print("\n🚀 Feedback Yeniden Sınıflandırma Aracı")
+    print("\nBu script city_feedback tablosundaki kategorileri güncel")
+    print("anahtar kelimelerle yeniden hesaplayacak.\n")
+
+    if args.bastan and os.path.exists(args.kontrol_noktasi):
+        os.remove(args.kontrol_noktasi)
+
+    if not args.onayla and not args.deneme:
+        response = input("⚠️  Veritabanını güncellemek istediğinize emin misiniz? (evet/hayır): ")
+        if response.lower() not in ['evet', 'yes', 'e', 'y']:
+            print("\n❌ İşlem iptal edildi.")
+            raise SystemExit(0)
+
+    tum_feedbackleri_yeniden_siniflandir(
+        parca_boyutu=args.parca_boyutu,
+        isci_sayisi=args.isci_sayisi,
+        kontrol_noktasi=args.kontrol_noktasi,
+        deneme=args.deneme,
+        motor=args.motor
+    )
@@ -0,0 +1,56 @@
+"""
+Testler sql_app.db'nin geçici bir kopyası üzerinde çalışır
+
+DATABASE_URL, app modülleri import edilmeden önce ayarlanmalıdır.
+"""
+from contextlib import closing
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import pytest
+
+_KLASOR = tempfile.mkdtemp(prefix="citypulse_test_")
+_KAYNAK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql_app.db")
+_KOPYA = os.path.join(_KLASOR, "test.db")
+
+# WAL'de kalmış commit'ler de kopyaya girsin diye backup API kullanılır
+with closing(sqlite3.connect(_KAYNAK)) as _kaynak, closing(sqlite3.connect(_KOPYA)) as _hedef:
+    _kaynak.backup(_hedef)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{_KOPYA}"
+os.environ.setdefault("CLASSIFIER_KEYWORDS_RELOAD_INTERVAL", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
+    shutil.rmtree(_KLASOR, ignore_errors=True)
+
+
+@pytest.fixture
+def db(client):
+    """Test boyunca açık kalan oturum"""
+    from app.database import SessionLocal
+
+    oturum = SessionLocal()
+    yield oturum
+    oturum.close()
+
+
+@pytest.fixture(scope="session")
+def sehir_id(client) -> str:
+    """Kimliği en küçük şehir (metrik ve skor satırları olan gerçek bir şehir)"""
+    from sqlalchemy import text
+    from app.database import SessionLocal
+
+    oturum = SessionLocal()
+    try:
+        return oturum.execute(text("SELECT city_id FROM cities ORDER BY city_id LIMIT 1")).scalar()
+    finally:
+        oturum.close()
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.feedback_service import feedback_kaydet
+
+
+def test_liste_etag_ile_304_doner(client):
+    yanit = client.get("/api/categories/")
+    assert yanit.status_code == 200
+    etag = yanit.headers["etag"]
+    kategoriler = [k["category"] for k in yanit.json()["data"]]
+    assert kategoriler and "Beklemede" not in kategoriler
+
+    tekrar = client.get("/api/categories/", headers={"If-None-Match": etag})
+    assert tekrar.status_code == 304
+    assert tekrar.content == b""
+    assert tekrar.headers["etag"] == etag
+
+    tekil = client.get(f"/api/categories/{kategoriler[0]}")
+    assert tekil.status_code == 200
+    assert tekil.json()["data"]["category"] == kategoriler[0]
+    assert client.get(
+        f"/api/categories/{kategoriler[0]}", headers={"If-None-Match": tekil.headers["etag"]}
+    ).status_code == 304
+    assert client.get("/api/categories/Beklemede").status_code == 404
+
+
+def test_submit_yolundaki_yeni_kategori_haritayi_yeniler(client, db, sehir_id):
+    once = client.get("/api/categories/")
+    feedback_kaydet(db, sehir_id, "haritaya yeni kategori", "Test Kategorisi", datetime.now())
+
+    sonra = client.get("/api/categories/", headers={"If-None-Match": once.headers["etag"]})
+    assert sonra.status_code == 200
+    assert sonra.headers["etag"] != once.headers["etag"]
+    assert "Test Kategorisi" in [k["category"] for k in sonra.json()["data"]]
+    assert client.get("/api/categories/Test Kategorisi").status_code == 200
+
+
+def test_baska_processin_ekledigi_kategori_bulunur(client, db):
+    db.execute(text(
+        "INSERT INTO feedback_categories(category, description) VALUES ('Dış Kategori', 'dışarıdan')"
+    ))
+    db.commit()
+
+    yanit = client.get("/api/categories/Dış Kategori")
+    assert yanit.status_code == 200
+    assert yanit.json()["data"]["description"] == "dışarıdan"
+    assert "Dış Kategori" in [k["category"] for k in client.get("/api/categories/").json()["data"]]
@@ -0,0 +1,141 @@
+from datetime import datetime
+import asyncio
+import json
+
+import anyio
+from sqlalchemy import text
+
+from app.city_stream import AkisDolu, CanliAkis, canli_akis
+from app.database import SessionLocal
+from app.feedback_service import feedback_kaydet
+
+
+def _hub(**ayarlar) -> CanliAkis:
+    return CanliAkis(**{
+        "kontrol_araligi": 0.1,
+        "kuyruk_boyutu": 3,
+        "kalp_atisi": 0.1,
+        "en_fazla_abone": 2,
+        "saklanan_degisiklik": 1000,
+        **ayarlar
+    })
+
+
+def test_yavas_abonede_en_eski_olay_duser():
+    async def senaryo():
+        hub = _hub()
+        yavas = hub.abone_ol("06")
+        diger = hub.abone_ol("34")
+        hub.dagit([(i, "06", "feedback", f'{{"id": {i}}}') for i in range(1, 6)])
+
+        cerceveler = await yavas.bekle(1)
+        assert cerceveler[0].startswith("event: resync") and '"dropped": 2' in cerceveler[0]
+        assert [c.split("\n")[0] for c in cerceveler[1:]] == ["id: 3", "id: 4", "id: 5"]
+        # Başka şehrin abonesine olay gitmez, süre dolunca heartbeat zamanıdır
+        assert await diger.bekle(0.05) == []
+        assert hub.metrikler()["dropped"] == 2
+
+        try:
+            hub.abone_ol("35")
+            assert False, "abone sınırı aşıldı"
+        except AkisDolu:
+            pass
+        hub.ayril(yavas)
+        hub.ayril(yavas)
+        assert hub.metrikler()["subscribers"] == 1
+
+    asyncio.run(senaryo())
+
+
+async def _akisi_oku(app, yol: str, yeterli, basliklar=(), yazici=None) -> str:
+    """SSE endpoint'ini doğrudan ASGI ile çağır; yeterli(metin) doğru olunca bağlantıyı kapat"""
+    govde = []
+    bitti = anyio.Event()
+
+    async def receive():
+        await bitti.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mesaj):
+        if mesaj["type"] == "http.response.start":
+            assert mesaj["status"] == 200
+        elif mesaj["type"] == "http.response.body":
+            govde.append(mesaj.get("body", b"").decode("utf-8"))
+            if yeterli("".join(govde)):
+                bitti.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": yol,
+        "raw_path": yol.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(a.encode(), d.encode()) for a, d in basliklar],
+        "server": ("test", 80),
+        "client": ("test", 1),
+    }
+    with anyio.fail_after(15):
+        async with anyio.create_task_group() as grup:
+            grup.start_soon(app, scope, receive, send)
+            if yazici is not None:
+                # Abone kaydolup hub son seq'i okuyana kadar bekle, sonra başka bir "process" yazsın
+                while canli_akis.metrikler()["subscribers"] == 0:
+                    await anyio.sleep(0.01)
+                await anyio.sleep(canli_akis.kontrol_araligi * 2)
+                await anyio.to_thread.run_sync(yazici)
+    return "".join(govde)
+
+
+def _olaylar(metin: str) -> list:
+    olaylar = []
+    for blok in metin.split("\n\n"):
+        alanlar = dict(satir.split(": ", 1) for satir in blok.split("\n") if ": " in satir and satir[0] != ":")
+        if "event" in alanlar:
+            olaylar.append((alanlar.get("id"), alanlar["event"], json.loads(alanlar["data"])))
+    return olaylar
+
+
+def test_yeni_feedback_ve_skor_aboneye_gelir(client, sehir_id):
+    from main import app
+
+    kayit = {}
+
+    def yaz():
+        db = SessionLocal()
+        try:
+            kayit.update(feedback_kaydet(db, sehir_id, "canlı akış mesajı", "Öneri", datetime.now()))
+            db.execute(text(
+                "UPDATE city_scores SET eco_score = eco_score + 0.5 "
+                "WHERE city_id = :c AND date = (SELECT MAX(date) FROM city_scores WHERE city_id = :c)"
+            ), {"c": sehir_id})
+            db.commit()
+        finally:
+            db.close()
+
+    metin = client.portal.call(
+        _akisi_oku, app, f"/api/stream/city/{sehir_id}",
+        lambda m: "event: score" in m, (), yaz
+    )
+    assert metin.startswith("retry: ")
+    olaylar = _olaylar(metin)
+    # Abone olmadan hemen önce yazılmış başka satırlar da gelebilir
+    feedbackler = [o for o in olaylar if o[1] == "feedback" and o[2]["id"] == kayit["id"]]
+    assert feedbackler[0][2]["category"] == "Öneri"
+    skor = [o for o in olaylar if o[1] == "score"][0]
+    assert skor[2]["city_id"] == sehir_id and skor[2]["source"] == "city_scores"
+    assert canli_akis.metrikler()["subscribers"] == 0
+
+    # Yeniden bağlanan istemci kaçırdığı olayları Last-Event-ID ile alır
+    tekrar = client.portal.call(
+        _akisi_oku, app, f"/api/stream/city/{sehir_id}",
+        lambda m: "event: score" in m, [("last-event-id", str(int(feedbackler[0][0]) - 1))]
+    )
+    assert [o[1] for o in _olaylar(tekrar)] == ["feedback", "score"]
+
+
+def test_olmayan_sehir_404(client):
+    assert client.get("/api/stream/city/olmayan-sehir").status_code == 404
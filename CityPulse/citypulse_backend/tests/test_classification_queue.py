@@ -0,0 +1,82 @@
+from datetime import datetime
+import time
+
+from sqlalchemy import text
+
+from app import classification_queue
+from app.classification_queue import BEKLEMEDE_KATEGORISI, SiniflandirmaKuyrugu
+from app.feedback_service import feedback_kaydet
+
+
+def _sayac(db, city_id: str) -> int:
+    return db.execute(
+        text("SELECT COALESCE(SUM(count), 0) FROM feedback_category_counts WHERE city_id = :c"),
+        {"c": city_id}
+    ).scalar()
+
+
+def _bekleyenleri_temizle(db):
+    db.execute(text("DELETE FROM city_feedback WHERE category = :k"), {"k": BEKLEMEDE_KATEGORISI})
+    db.commit()
+
+
+def test_bekleme_kategorisi_listelenmez(client):
+    yanit = client.get("/api/categories/")
+    assert yanit.status_code == 200
+    assert BEKLEMEDE_KATEGORISI not in [k["category"] for k in yanit.json()["data"]]
+    assert client.get(f"/api/categories/{BEKLEMEDE_KATEGORISI}").status_code == 404
+
+
+def test_bekleyen_satir_siniflandirilinca_sayilir(db, sehir_id):
+    _bekleyenleri_temizle(db)
+    once = _sayac(db, sehir_id)
+
+    feedback_kaydet(db, sehir_id, "internet sürekli kopuyor", BEKLEMEDE_KATEGORISI, datetime.now())
+    assert _sayac(db, sehir_id) == once
+
+    kuyruk = SiniflandirmaKuyrugu(parti_boyutu=10, kontrol_araligi=1)
+    assert kuyruk.bekleyenleri_isle() == 1
+    assert _sayac(db, sehir_id) == once + 1
+
+
+def test_siniflandirilamayan_satirlar_donguyu_kilitlemez(db, sehir_id, monkeypatch):
+    _bekleyenleri_temizle(db)
+    for i in range(5):
+        feedback_kaydet(db, sehir_id, f"mesaj {i}", BEKLEMEDE_KATEGORISI, datetime.now())
+
+    def hep_beklemede(mesajlar):
+        return [{"kategori": BEKLEMEDE_KATEGORISI, "analiz_detayi": {}} for _ in mesajlar]
+
+    monkeypatch.setattr(classification_queue, "toplu_analiz_et", hep_beklemede)
+    kuyruk = SiniflandirmaKuyrugu(parti_boyutu=2, kontrol_araligi=1)
+    for i in range(5):
+        kuyruk.bildir(10**9 + i)
+
+    # Her satır bir kez denenir, imleç sona ulaşınca döngü biter
+    assert kuyruk.bekleyenleri_isle() == 5
+    assert kuyruk.metrikler()["batches"] == 3
+    _bekleyenleri_temizle(db)
+
+
+def test_asenkron_kapaliyken_kalan_satirlar_acilista_siniflandirilir(db, sehir_id, monkeypatch):
+    _bekleyenleri_temizle(db)
+    kayit = feedback_kaydet(db, sehir_id, "köprüde trafik kilitlendi", BEKLEMEDE_KATEGORISI, datetime.now())
+
+    monkeypatch.setattr(classification_queue.config, "CLASSIFIER_ASYNC", False)
+    kuyruk = SiniflandirmaKuyrugu(parti_boyutu=10, kontrol_araligi=0.05)
+    monkeypatch.setattr(classification_queue, "kuyruk", kuyruk)
+    classification_queue.kuyrugu_baslat()
+    try:
+        bitis = time.monotonic() + 10
+        while kuyruk.aktif and time.monotonic() < bitis:
+            time.sleep(0.05)
+        # Kalan satırlar bitince kuyruk kendiliğinden durur
+        assert not kuyruk.aktif
+    finally:
+        classification_queue.kuyrugu_durdur()
+    kategori = db.execute(text("SELECT category FROM city_feedback WHERE id = :i"), {"i": kayit["id"]}).scalar()
+    assert kategori != BEKLEMEDE_KATEGORISI
+
+    # Bekleyen yoksa asenkron mod kapalıyken kuyruk başlamaz
+    classification_queue.kuyrugu_baslat()
+    assert not kuyruk.aktif
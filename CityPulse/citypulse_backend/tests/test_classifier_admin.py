@@ -0,0 +1,25 @@
+import pytest
+
+from app import classifier_pool, config
+
+
+def test_reload_admin_token_tanimsizsa_kapali(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+    yanit = client.post("/api/feedback/classifier/reload", headers={"X-Admin-Token": ""})
+    assert yanit.status_code == 503
+
+
+def test_reload_token_dogrulanir(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "gizli")
+    assert client.post("/api/feedback/classifier/reload").status_code == 403
+    assert client.post(
+        "/api/feedback/classifier/reload", headers={"X-Admin-Token": "yanlis"}
+    ).status_code == 403
+    assert client.post(
+        "/api/feedback/classifier/reload", headers={"X-Admin-Token": "gizli"}
+    ).status_code == 200
+
+
+def test_worker_baska_surumle_siniflandirmaz():
+    with pytest.raises(classifier_pool.SurumUyusmazligi):
+        classifier_pool._havuz_ozeti(("internet yok", "olmayan-surum"))
@@ -0,0 +1,136 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.daily_rollup import yeniden_olustur
+from app.database import SessionLocal
+
+
+def _calistir(ifade: str, **parametreler):
+    db = SessionLocal()
+    try:
+        sonuc = db.execute(text(ifade), parametreler)
+        satirlar = sonuc.all() if sonuc.returns_rows else None
+        db.commit()
+        return satirlar
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def sehir(sehir_id):
+    """Son günlere metrik satırları eklenmiş şehir"""
+    bugun = datetime.now().date()
+    for gun, deger in ((bugun, 80), (bugun - timedelta(days=1), 60), (bugun - timedelta(days=3), 70)):
+        parametreler = {"c": sehir_id, "d": str(gun), "v": deger}
+        _calistir("INSERT OR REPLACE INTO city_stats VALUES (:c, :d, :v, :v * 100)", **parametreler)
+        _calistir("INSERT OR REPLACE INTO city_weather VALUES (:c, :d, :v / 4, :v)", **parametreler)
+        _calistir("INSERT OR REPLACE INTO paycell_stats VALUES (:c, :d, :v * 10, :v * 1000.5)", **parametreler)
+        _calistir("INSERT OR REPLACE INTO city_scores VALUES (:c, :d, :v / 10.0, 2)", **parametreler)
+    return sehir_id
+
+
+def _ham_ortalamalar(city_id: str) -> dict:
+    baslangic = str(datetime.now().date() - timedelta(days=7))
+    sonuc = {}
+    for tablo, kolon in (
+        ("city_stats", "signal_strength"), ("city_stats", "traffic_gb"),
+        ("paycell_stats", "transactions_count"), ("paycell_stats", "total_amount"),
+        ("city_weather", "temp_c"), ("city_weather", "air_quality"),
+        ("city_scores", "eco_score"), ("city_scores", "alerts_count"),
+    ):
+        ortalama = _calistir(
+            f"SELECT AVG({kolon}) FROM {tablo} WHERE city_id = :c AND date >= :b", c=city_id, b=baslangic
+        )[0][0]
+        sonuc[kolon] = round(ortalama, 2) if ortalama else 0
+    return sonuc
+
+
+def _haftalik(client, city_id: str) -> dict:
+    veri = client.get(f"/api/city-statistics/{city_id}").json()["data"]
+    return {
+        "signal_strength": veri["network_statistics"]["avg_signal_strength"],
+        "traffic_gb": veri["network_statistics"]["avg_internet_usage_gb"],
+        "transactions_count": veri["financial_statistics"]["avg_daily_transactions"],
+        "total_amount": veri["financial_statistics"]["avg_daily_amount"],
+        "temp_c": veri["weather_statistics"]["avg_temperature"],
+        "air_quality": veri["weather_statistics"]["avg_air_quality"],
+        "eco_score": veri["scores"]["avg_eco_score"],
+        "alerts_count": veri["scores"]["avg_alerts"],
+        "_satir": veri["network_statistics"]["data_points"],
+    }
+
+
+def test_ozetler_ham_satirlarla_ayni_ve_yazmalarla_guncellenir(client, sehir):
+    haftalik = _haftalik(client, sehir)
+    assert haftalik.pop("_satir") == 3
+    assert haftalik == _ham_ortalamalar(sehir)
+
+    # Güncelleme ve silme de özetlere yansır
+    _calistir("UPDATE city_stats SET signal_strength = 20 WHERE city_id = :c AND date = :d",
+              c=sehir, d=str(datetime.now().date()))
+    _calistir("DELETE FROM city_weather WHERE city_id = :c AND date = :d",
+              c=sehir, d=str(datetime.now().date() - timedelta(days=3)))
+    haftalik = _haftalik(client, sehir)
+    haftalik.pop("_satir")
+    assert haftalik == _ham_ortalamalar(sehir)
+    assert haftalik["signal_strength"] == 50.0
+
+    ozet = client.get(f"/api/city-statistics/{sehir}/summary").json()["data"]
+    assert ozet["avg_signal_strength"] == haftalik["signal_strength"]
+    assert ozet["avg_air_quality"] == haftalik["air_quality"]
+
+
+def test_feedback_sayilari_ozete_yansir(client, sehir):
+    once = client.get(f"/api/city-statistics/{sehir}/sustainability-score").json()["data"]["feedback_info"]
+    yanit = client.post("/api/feedback/submit", json={
+        "city_id": sehir, "message": "Parktaki ağaçlar kesiliyor, yeşil alan kalmadı, çevre kirleniyor"
+    })
+    assert yanit.status_code == 200
+    sonra = client.get(f"/api/city-statistics/{sehir}/sustainability-score").json()["data"]["feedback_info"]
+    assert sonra["total_feedbacks"] == once["total_feedbacks"] + 1
+
+
+def test_tarih_araligi_yeniden_olusturulur(client, db, sehir):
+    bugun = datetime.now().date()
+    dogru = _haftalik(client, sehir)
+    # Özetler trigger'lar dışında bozulmuş olsun (aralık dışındaki eski günler dahil)
+    _calistir("UPDATE city_daily_rollup SET signal_strength_sum = 0, stats_rows = 9 WHERE city_id = :c", c=sehir)
+    assert _haftalik(client, sehir) != dogru
+
+    assert yeniden_olustur(db, bugun - timedelta(days=7), bugun) >= 3
+    assert _haftalik(client, sehir) == dogru
+    # Aralık dışındaki günlere dokunulmaz
+    bozuk = "SELECT COUNT(*) FROM city_daily_rollup WHERE stats_rows = 9"
+    assert _calistir(bozuk)[0][0] > 0
+    yeniden_olustur(db, date.min, date.max)
+    assert _calistir(bozuk)[0][0] == 0
+
+
+def test_uc_endpoint_tek_anlik_ozeti_paylasir(client, sehir):
+    from sqlalchemy import event
+    from app.database import engine
+
+    # Önceki yazmalar önbelleği boşaltmış olsun
+    _calistir("UPDATE city_stats SET traffic_gb = traffic_gb WHERE city_id = :c", c=sehir)
+    ozet_sorgulari = []
+
+    def say(conn, cursor, ifade, *_):
+        if "FROM cities AS c" in ifade:
+            ozet_sorgulari.append(ifade)
+
+    event.listen(engine, "before_cursor_execute", say)
+    try:
+        haftalik = client.get(f"/api/city-statistics/{sehir}").json()["data"]
+        ozet = client.get(f"/api/city-statistics/{sehir}/summary").json()["data"]
+        skor = client.get(f"/api/city-statistics/{sehir}/sustainability-score").json()["data"]
+    finally:
+        event.remove(engine, "before_cursor_execute", say)
+
+    assert len(ozet_sorgulari) == 1
+    assert ozet["avg_signal_strength"] == haftalik["network_statistics"]["avg_signal_strength"]
+    assert skor["score_details"]["air_quality"] == haftalik["weather_statistics"]["avg_air_quality"]
+    assert skor["period"] == {k: haftalik["period"][k] for k in ("start_date", "end_date")}
+    for yol in ("", "/summary", "/sustainability-score"):
+        assert client.get(f"/api/city-statistics/olmayan-sehir{yol}").status_code == 404
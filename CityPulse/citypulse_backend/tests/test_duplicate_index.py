@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+
+from app.duplicate_index import EN_FAZLA_KARAKTER, DuplicateIndex, shingle_kumesi
+
+
+def test_uzun_mesajda_shingle_sayisi_sinirli():
+    uzun = "elektrik kesintisi mahallede devam ediyor " * 500
+    assert len(shingle_kumesi(uzun)) <= EN_FAZLA_KARAKTER
+
+
+def test_pencere_satirin_zamanina_gore_uygulanir():
+    indeks = DuplicateIndex(esik=0.8, sehir_basina=100, pencere_saat=24)
+    mesaj = "ana caddede su borusu patladı yol göle döndü"
+    simdi = datetime.now()
+
+    indeks.ekle("34", 1, mesaj, simdi - timedelta(hours=48))
+    assert indeks.bul("34", mesaj) is None
+
+    indeks.ekle("34", 2, mesaj, simdi - timedelta(hours=1))
+    assert indeks.bul("34", mesaj)[0] == 2
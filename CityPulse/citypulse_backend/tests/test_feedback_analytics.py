@@ -0,0 +1,64 @@
+import pytest
+
+
+def _gonder(client, city_id: str, mesaj: str, zaman: str) -> dict:
+    yanit = client.post("/api/feedback/submit", json={"city_id": city_id, "message": mesaj, "timestamp": zaman})
+    assert yanit.status_code == 200
+    return yanit.json()["data"]
+
+
+def _analitik(client, **parametreler) -> dict:
+    yanit = client.get("/api/feedback/analytics", params=parametreler)
+    assert yanit.status_code == 200, yanit.text
+    return yanit.json()["data"]
+
+
+def _sayi(veri: dict, kategori: str, kova: str) -> int:
+    if kategori not in veri["categories"]:
+        return 0
+    return veri["counts"][veri["categories"].index(kategori)][veri["buckets"].index(kova)]
+
+
+def test_gun_saat_ve_hafta_kovalari(client, sehir_id):
+    parametreler = {"city_id": sehir_id, "date_from": "2020-03-02", "date_to": "2020-03-08"}
+    once = _analitik(client, **parametreler)
+    assert once["buckets"][0] == "2020-03-02" and len(once["buckets"]) == 7
+    assert all(len(satir) == len(once["buckets"]) for satir in once["counts"])
+
+    a = _gonder(client, sehir_id, "Kavşaktaki trafik ışıkları çalışmıyor, araçlar birbirine girdi", "2020-03-04 10:15:00")
+    b = _gonder(client, sehir_id, "Parkın çöp kutuları günlerdir boşaltılmadı, koku yayılıyor", "2020-03-04 10:45:00")
+
+    # Yeni feedback veri sürümünü değiştirir, önbellekteki sonuç kullanılmaz
+    gunluk = _analitik(client, **parametreler)
+    assert gunluk["data_version"] > once["data_version"]
+    assert gunluk["total"] == once["total"] + 2
+    for satir in (a, b):
+        kategori = satir["category"]
+        beklenen = _sayi(once, kategori, "2020-03-04") + (2 if a["category"] == b["category"] else 1)
+        assert _sayi(gunluk, kategori, "2020-03-04") == beklenen
+
+    saatlik = _analitik(client, granularity="hour", **parametreler)
+    assert len(saatlik["buckets"]) == 7 * 24
+    assert sum(_sayi(saatlik, k, "2020-03-04 10:00") for k in saatlik["categories"]) >= 2
+
+    haftalik = _analitik(client, granularity="week", **parametreler)
+    assert haftalik["buckets"] == ["2020-03-02"]
+    assert haftalik["total"] == gunluk["total"]
+
+
+def test_tum_sehirler_ve_sehir_listesi(client, sehir_id):
+    tumu = _analitik(client, date_from="2020-03-01", date_to="2020-03-31")
+    assert tumu["city_ids"] is None
+    tek = _analitik(client, city_id=f"{sehir_id},{sehir_id}", date_from="2020-03-01", date_to="2020-03-31")
+    assert tek["city_ids"] == [sehir_id]
+    assert tumu["total"] >= tek["total"]
+
+
+@pytest.mark.parametrize("parametreler,durum", [
+    ({"date_from": "2020-03-08", "date_to": "2020-03-01"}, 400),
+    ({"granularity": "hour", "date_from": "2019-01-01", "date_to": "2020-01-01"}, 400),
+    ({"city_id": "olmayan-sehir"}, 404),
+    ({"granularity": "month"}, 422),
+])
+def test_gecersiz_istekler(client, parametreler, durum):
+    assert client.get("/api/feedback/analytics", params=parametreler).status_code == durum
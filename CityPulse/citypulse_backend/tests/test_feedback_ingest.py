@@ -0,0 +1,170 @@
+import gzip
+import json
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app import classifier_pool, config, linear_classifier
+
+
+def _ndjson(*satirlar) -> bytes:
+    return "\n".join(
+        s if isinstance(s, str) else json.dumps(s, ensure_ascii=False) for s in satirlar
+    ).encode("utf-8")
+
+
+def _yukle(client, govde: bytes, **basliklar):
+    yanit = client.post("/api/feedback/bulk", content=govde, headers=basliklar)
+    assert yanit.status_code == 200
+    assert yanit.headers["content-type"].startswith("application/x-ndjson")
+    satirlar = [json.loads(s) for s in yanit.text.splitlines()]
+    return satirlar[:-1], satirlar[-1]["summary"]
+
+
+def _benzersiz(metin: str) -> str:
+    """Önceki testlerin indeksteki mesajlarıyla çakışmasın"""
+    return f"{metin} {uuid.uuid4().hex}"
+
+
+@pytest.fixture
+def parti_boyutu(monkeypatch):
+    def ayarla(boyut: int):
+        monkeypatch.setattr(config, "BULK_INGEST_CHUNK_SIZE", boyut)
+    return ayarla
+
+
+@pytest.fixture(autouse=True)
+def kopya_modu(monkeypatch):
+    monkeypatch.setattr(config, "DUPLICATE_MODE", "flag")
+    monkeypatch.setattr(config, "CLASSIFIER_ASYNC", False)
+
+
+def test_duz_ndjson_kaydedilir(client, parti_boyutu):
+    parti_boyutu(2)
+    sonuclar, ozet = _yukle(client, _ndjson(
+        {"city_id": "06", "message": _benzersiz("internet çekmiyor")},
+        {"city_id": "34", "message": _benzersiz("yolda büyük çukur var"), "timestamp": "2025-11-20 10:00:00"},
+        {"city_id": "06", "message": _benzersiz("park çok temiz")},
+    ))
+
+    assert [s["line"] for s in sonuclar] == [1, 2, 3]
+    assert all(isinstance(s["id"], int) for s in sonuclar)
+    assert len({s["id"] for s in sonuclar}) == 3
+    assert len({s["user"] for s in sonuclar}) == 3
+    assert ozet == {"lines": 3, "saved": 3, "duplicates": 0, "errors": 0}
+
+    kayit = client.get(f"/api/feedback/{sonuclar[1]['id']}").json()["data"]
+    assert kayit["city_id"] == "34"
+    assert kayit["timestamp"].startswith("2025-11-20 10:00:00")
+
+
+def test_gzip_ndjson_kaydedilir(client):
+    govde = _ndjson(*[{"city_id": "06", "message": _benzersiz(f"sinyal yok {i}")} for i in range(5)])
+    sonuclar, ozet = _yukle(client, gzip.compress(govde), **{"Content-Encoding": "gzip"})
+
+    assert len(sonuclar) == 5
+    assert ozet["saved"] == 5
+
+
+def test_hatali_satirlar_satir_bazinda_raporlanir(client, parti_boyutu, monkeypatch):
+    parti_boyutu(3)
+    monkeypatch.setattr(config, "BULK_INGEST_MAX_LINE_BYTES", 200)
+    sonuclar, ozet = _yukle(client, _ndjson(
+        "json değil",
+        "",
+        "[1, 2]",
+        {"city_id": "06"},
+        {"city_id": "999999", "message": "x"},
+        json.dumps({"city_id": "06", "message": "a" * 500}),
+        {"city_id": "06", "message": _benzersiz("trafik ışıkları bozuk")},
+    ))
+
+    kodlar = {s["line"]: s.get("error_code") for s in sonuclar}
+    assert kodlar == {
+        1: "INVALID_JSON",
+        3: "INVALID_LINE",
+        4: "INVALID_LINE",
+        5: "CITY_NOT_FOUND",
+        6: "LINE_TOO_LONG",
+        7: None,
+    }
+    assert isinstance(sonuclar[-1]["id"], int)
+    assert ozet == {"lines": 6, "saved": 1, "duplicates": 0, "errors": 5}
+
+
+def test_yarim_gzip_son_satiri_hata_olarak_doner(client):
+    govde = gzip.compress(_ndjson(
+        *[{"city_id": "06", "message": _benzersiz(f"hava kirli {i}")} for i in range(50)]
+    ))
+    sonuclar, ozet = _yukle(client, govde[:len(govde) // 2], **{"Content-Encoding": "gzip"})
+
+    kodlar = [s.get("error_code") for s in sonuclar]
+    assert kodlar[-1] == "INVALID_GZIP"
+    assert kodlar[-2] == "TRUNCATED_LINE"
+    assert all(k is None for k in kodlar[:-2])
+
+
+def test_parti_icindeki_yakin_kopyalar_isaretlenir(client, parti_boyutu):
+    parti_boyutu(10)
+    mesaj = _benzersiz("Gazi Mahallesi girişinde sinyalizasyon aksaklığı var")
+    sonuclar, ozet = _yukle(client, _ndjson(
+        {"city_id": "06", "message": mesaj},
+        {"city_id": "06", "message": mesaj + "!"},
+        {"city_id": "34", "message": mesaj},
+    ))
+
+    assert sonuclar[0]["duplicate_of"] is None
+    assert sonuclar[1]["duplicate_of"] == sonuclar[0]["id"]
+    # Başka şehirdeki aynı mesaj kopya sayılmaz
+    assert sonuclar[2]["duplicate_of"] is None
+    assert ozet["duplicates"] == 1
+
+
+def test_partiler_arasi_yakin_kopyalar_isaretlenir(client, parti_boyutu):
+    parti_boyutu(1)
+    mesaj = _benzersiz("Kızılay meydanında çöpler toplanmamış")
+    sonuclar, _ = _yukle(client, _ndjson(
+        {"city_id": "06", "message": mesaj},
+        {"city_id": "06", "message": mesaj + "."},
+    ))
+
+    assert sonuclar[1]["duplicate_of"] == sonuclar[0]["id"]
+
+
+def test_collapse_modunda_parti_ici_kopya_yazilmaz(client, parti_boyutu, monkeypatch):
+    parti_boyutu(10)
+    monkeypatch.setattr(config, "DUPLICATE_MODE", "collapse")
+    mesaj = _benzersiz("Metro istasyonunda internet yok")
+    sonuclar, ozet = _yukle(client, _ndjson(
+        {"city_id": "06", "message": mesaj},
+        {"city_id": "06", "message": mesaj + "!!"},
+    ))
+
+    assert sonuclar[1] == {"line": 2, "id": sonuclar[0]["id"], "duplicate_of": sonuclar[0]["id"], "collapsed": True}
+    assert ozet == {"lines": 2, "saved": 1, "duplicates": 1, "errors": 0}
+
+
+def test_calisan_siniflandiricinin_surumu_yazilir(client, db, monkeypatch):
+    # İlk mesajı doğrusal model, ikincisini kural motoru sınıflandırır
+    monkeypatch.setattr(linear_classifier, "guvenli_tahminler", lambda mesajlar: [
+        ("Ulaşım", 0.99, {}, "model-test")
+    ] + [None] * (len(mesajlar) - 1))
+    gonderilen = []
+    calistir = classifier_pool.havuz.calistir
+
+    def kaydeden(fonksiyon, arguman):
+        gonderilen.append(arguman[1])
+        return calistir(fonksiyon, arguman)
+
+    monkeypatch.setattr(classifier_pool.havuz, "calistir", kaydeden)
+    sonuclar, _ = _yukle(client, _ndjson(
+        {"city_id": "06", "message": _benzersiz("otobüs gelmedi")},
+        {"city_id": "06", "message": _benzersiz("park çok temiz")},
+    ))
+
+    surumler = [
+        db.execute(text("SELECT keyword_version FROM city_feedback WHERE id = :id"), {"id": s["id"]}).scalar()
+        for s in sonuclar
+    ]
+    assert surumler == ["model-test", gonderilen[0]]
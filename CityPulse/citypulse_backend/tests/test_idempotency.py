@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+import uuid
+
+from fastapi import HTTPException
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.idempotency import TekrarAnahtarlari, istek_ozeti, tekrar_anahtarlari
+from app.routers.feedback import FeedbackFromFlutter, _feedback_isle, submit_feedback_from_flutter
+
+
+def _satir_sayisi(db, mesaj: str) -> int:
+    return db.execute(text("SELECT COUNT(*) FROM city_feedback WHERE message = :m"), {"m": mesaj}).scalar()
+
+
+def test_tekrar_ilk_yaniti_dondurur(client, db, sehir_id):
+    anahtar, mesaj = str(uuid.uuid4()), f"Metro istasyonunun asansörü bozuk {uuid.uuid4()}"
+    govde = {"city_id": sehir_id, "message": mesaj}
+    ilk = client.post("/api/feedback/submit", json=govde, headers={"Idempotency-Key": anahtar})
+    tekrar = client.post("/api/feedback/submit", json=govde, headers={"Idempotency-Key": anahtar})
+    assert ilk.status_code == tekrar.status_code == 200
+    assert tekrar.json() == ilk.json()
+    assert _satir_sayisi(db, mesaj) == 1
+
+
+def test_anahtar_baska_govdeyle_kullanilamaz(client, sehir_id):
+    anahtar = str(uuid.uuid4())
+    basliklar = {"Idempotency-Key": anahtar}
+    assert client.post("/api/feedback/submit", json={"city_id": sehir_id, "message": "ilk mesaj"},
+                       headers=basliklar).status_code == 200
+    yanit = client.post("/api/feedback/submit", json={"city_id": sehir_id, "message": "başka mesaj"}, headers=basliklar)
+    assert yanit.status_code == 422
+    assert yanit.json()["detail"]["error_code"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+def test_basarisiz_istek_anahtari_birakir(client):
+    basliklar = {"Idempotency-Key": str(uuid.uuid4())}
+    govde = {"city_id": "olmayan-sehir", "message": "mesaj"}
+    assert client.post("/api/feedback/submit", json=govde, headers=basliklar).status_code == 404
+    # 409 (işleniyor) değil, istek yeniden işlenir
+    assert client.post("/api/feedback/submit", json=govde, headers=basliklar).status_code == 404
+
+
+def test_eszamanli_tekrarlar_tek_kayit_olusturur(db, sehir_id):
+    anahtar, mesaj = str(uuid.uuid4()), f"Sokak lambaları yanmıyor {uuid.uuid4()}"
+    feedback = FeedbackFromFlutter(city_id=sehir_id, message=mesaj)
+
+    def gonder(_):
+        # Her istek (thread) kendi oturumunu kullanır
+        oturum = SessionLocal()
+        try:
+            return submit_feedback_from_flutter(feedback, db=oturum, idempotency_key=anahtar)
+        finally:
+            oturum.close()
+
+    with ThreadPoolExecutor(max_workers=8) as havuz:
+        yanitlar = list(havuz.map(gonder, range(8)))
+    assert len({y["data"]["id"] for y in yanitlar}) == 1
+    assert _satir_sayisi(db, mesaj) == 1
+
+
+def test_suresi_dolan_anahtarlar_silinir(db):
+    anahtarlar = TekrarAnahtarlari(ttl_saniye=1, boyut=10, temizlik_araligi=60)
+    anahtar, ozet = str(uuid.uuid4()), istek_ozeti("x")
+    assert anahtarlar.ayir(db, anahtar, ozet) is None
+    anahtarlar.yanit_yaz(db, anahtar, ozet, anahtarlar.ayrilma_zamani(db, anahtar), {"success": True})
+    db.commit()
+    anahtarlar.tamamlandi(anahtar, ozet, {"success": True})
+    assert anahtarlar.ayir(db, anahtar, ozet) == {"success": True}
+    time.sleep(1.1)
+    assert anahtarlar.temizle() >= 1
+    assert anahtarlar.metrikler()["cached"] == 0
+    # Süresi dolan anahtar yeniden kullanılabilir
+    assert anahtarlar.ayir(db, anahtar, ozet) is None
+
+
+def test_yanit_satirla_ayni_transactionda_yazilir(client, db, sehir_id, monkeypatch):
+    # Yanıt saklanamazsa feedback satırı da yazılmaz, anahtar bırakılır
+    def bozuk(*_):
+        raise RuntimeError("disk dolu")
+
+    anahtar, mesaj = str(uuid.uuid4()), f"Kaldırımlar kırık {uuid.uuid4()}"
+    govde = {"city_id": sehir_id, "message": mesaj}
+    with monkeypatch.context() as m:
+        m.setattr(tekrar_anahtarlari, "yanit_yaz", bozuk)
+        yanit = client.post("/api/feedback/submit", json=govde, headers={"Idempotency-Key": anahtar})
+        assert yanit.status_code == 500
+    assert _satir_sayisi(db, mesaj) == 0
+
+    ilk = client.post("/api/feedback/submit", json=govde, headers={"Idempotency-Key": anahtar})
+    assert ilk.status_code == 200 and _satir_sayisi(db, mesaj) == 1
+    kayitli = db.execute(text("SELECT response FROM idempotency_keys WHERE key = :k"), {"k": anahtar}).scalar()
+    assert json.loads(kayitli) == ilk.json()
+
+
+def test_devralinan_anahtara_eski_sahibi_yazamaz(db, sehir_id):
+    anahtar, mesaj = str(uuid.uuid4()), f"Otobüs durağı yıkık {uuid.uuid4()}"
+    feedback = FeedbackFromFlutter(city_id=sehir_id, message=mesaj)
+    ozet = istek_ozeti(feedback.city_id, mesaj, None)
+    assert tekrar_anahtarlari.ayir(db, anahtar, ozet) is None
+    ayrilma = tekrar_anahtarlari.ayrilma_zamani(db, anahtar)
+    # İlk istek yarıda kalmış sayılıp anahtar başka bir isteğe devredildi
+    db.execute(text("UPDATE idempotency_keys SET created_at = created_at + 1 WHERE key = :k"), {"k": anahtar})
+    db.commit()
+
+    with pytest.raises(HTTPException) as hata:
+        _feedback_isle(feedback, db, lambda yazma_db, yanit: tekrar_anahtarlari.yanit_yaz(
+            yazma_db, anahtar, ozet, ayrilma, yanit
+        ))
+    assert hata.value.status_code == 409
+    assert _satir_sayisi(db, mesaj) == 0
@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+
+from sqlalchemy import text
+
+from app.data_version import SureliOnbellek
+
+
+def test_liderlik_tablosu_sehir_skorlariyla_ayni(client):
+    yanit = client.get("/api/city-statistics/leaderboard/green-cities", params={"limit": 100})
+    assert yanit.status_code == 200
+    veri = yanit.json()["data"]
+    sehirler = veri["top_3_green_cities"]
+    assert len(sehirler) == veri["evaluated_cities_count"] == len(client.get("/api/cities/").json()["data"])
+
+    skorlar = [s["sustainability_score"] for s in sehirler]
+    assert skorlar == sorted(skorlar, reverse=True)
+    assert [s["rank"] for s in sehirler] == list(range(1, len(sehirler) + 1))
+    for sehir in sehirler:
+        tekil = client.get(f"/api/city-statistics/{sehir['city_id']}/sustainability-score").json()["data"]
+        assert tekil["sustainability_score"] == sehir["sustainability_score"]
+        assert tekil["score_details"]["eco_feedback_ratio"] == sehir["score_breakdown"]["eco_feedback_ratio"]
+
+
+def test_varsayilan_ilk_uc_ve_limit(client):
+    varsayilan = client.get("/api/city-statistics/leaderboard/green-cities").json()["data"]["top_3_green_cities"]
+    tek = client.get("/api/city-statistics/leaderboard/green-cities", params={"limit": 1}).json()["data"]
+    assert len(varsayilan) == min(3, len(client.get("/api/cities/").json()["data"]))
+    assert tek["top_3_green_cities"][0]["city_id"] == varsayilan[0]["city_id"]
+    assert tek["top_3_green_cities"][0]["badge"].startswith("🥇")
+
+
+def test_etag_ve_veri_degisince_yeniden_hesaplama(client, db):
+    from app.routers.city_statistics import liderlik_onbellegi
+
+    yol = "/api/city-statistics/leaderboard/green-cities"
+    ilk = client.get(yol, params={"limit": 100})
+    etag = ilk.headers["etag"]
+    once = liderlik_onbellegi.metrikler()
+    assert client.get(yol, params={"limit": 100}, headers={"If-None-Match": etag}).status_code == 304
+    assert liderlik_onbellegi.metrikler()["hits"] == once["hits"] + 1
+
+    # Skoru değiştiren metrik yazması sürümü artırır, yeni içerik yeni ETag ile gelir
+    try:
+        sehir = db.execute(text("SELECT city_id FROM cities ORDER BY city_id DESC LIMIT 1")).scalar()
+        db.execute(text("INSERT OR REPLACE INTO city_stats VALUES (:c, :d, 1, 0)"),
+                   {"c": sehir, "d": str(datetime.now().date())})
+        db.commit()
+        yeni = client.get(yol, params={"limit": 100}, headers={"If-None-Match": etag})
+        assert yeni.status_code == 200 and yeni.headers["etag"] != etag
+        skor = [s for s in yeni.json()["data"]["top_3_green_cities"] if s["city_id"] == sehir][0]
+        tekil = client.get(f"/api/city-statistics/{sehir}/sustainability-score").json()["data"]
+        assert skor["sustainability_score"] == tekil["sustainability_score"]
+    finally:
+        db.execute(text("DELETE FROM city_stats WHERE city_id = :c AND date = :d"),
+                   {"c": sehir, "d": str(datetime.now().date())})
+        db.commit()
+
+
+def test_hesaplama_surerken_bayat_sonuc_sunulur():
+    onbellek = SureliOnbellek(ttl=60, bayat_suresi=60)
+    assert onbellek.getir("a", 1, "gun1", lambda: "eski") == "eski"
+
+    basladi, bitir = threading.Event(), threading.Event()
+    hesaplamalar = []
+
+    def yavas():
+        hesaplamalar.append(1)
+        basladi.set()
+        bitir.wait(5)
+        return "yeni"
+
+    with ThreadPoolExecutor(4) as havuz:
+        hesaplayan = havuz.submit(onbellek.getir, "a", 2, "gun1", yavas)
+        assert basladi.wait(5)
+        # Sürüm değişti ama biri hesaplıyor: diğerleri beklemeden eski sonucu alır
+        assert [onbellek.getir("a", 2, "gun1", yavas) for _ in range(3)] == ["eski"] * 3
+        # Gün değiştiyse eski sonuç sunulmaz, hesaplamayı bekler
+        ertesi_gun = havuz.submit(onbellek.getir, "a", 2, "gun2", lambda: "ertesi")
+        bitir.set()
+        assert hesaplayan.result(5) == "yeni"
+        assert ertesi_gun.result(5) == "ertesi"
+    assert len(hesaplamalar) == 1
+    assert onbellek.getir("a", 2, "gun2", yavas) == "ertesi"
+    assert onbellek.metrikler()["stale_hits"] == 3
+
+
+def test_soguk_onbellekte_eszamanli_istekler_tek_hesaplama_yapar():
+    onbellek = SureliOnbellek(ttl=60, bayat_suresi=60)
+    basladi, bitir = threading.Event(), threading.Event()
+    hesaplamalar = []
+
+    def yavas():
+        hesaplamalar.append(1)
+        basladi.set()
+        bitir.wait(5)
+        return "sonuc"
+
+    with ThreadPoolExecutor(5) as havuz:
+        ilk = havuz.submit(onbellek.getir, "a", 1, "gun1", yavas)
+        assert basladi.wait(5)
+        # Hesaplama başladıktan sonra gelenler bekler ve aynı sonucu kullanır
+        bekleyenler = [havuz.submit(onbellek.getir, "a", 1, "gun1", yavas) for _ in range(4)]
+        bitir.set()
+        assert [f.result(5) for f in [ilk, *bekleyenler]] == ["sonuc"] * 5
+    assert len(hesaplamalar) == 1
+    assert onbellek.metrikler()["misses"] == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from app.pagination import SAYFA_LIMITI
+
+
+def _tum_sayfalar(client, url: str, **parametreler) -> list:
+    satirlar, cursor = [], None
+    while True:
+        yanit = client.get(url, params={**parametreler, **({"cursor": cursor} if cursor else {})})
+        assert yanit.status_code == 200
+        govde = yanit.json()
+        satirlar.extend(govde["data"])
+        cursor = govde.get("next_cursor")
+        if cursor is None:
+            return satirlar
+
+
+@pytest.mark.parametrize("url", ["/api/stats/", "/api/weather/", "/api/paycell/", "/api/scores/"])
+def test_cursor_tum_satirlari_bir_kez_dolasir(client, url):
+    satirlar = _tum_sayfalar(client, url, limit=37)
+    anahtarlar = [(s["city_id"], s["date"]) for s in satirlar]
+    assert anahtarlar == sorted(set(anahtarlar))
+
+    # skip ile eski sayfalama aynı sırayı verir
+    ikinci = client.get(url, params={"skip": 37, "limit": 37}).json()["data"]
+    assert [(s["city_id"], s["date"]) for s in ikinci] == anahtarlar[37:74]
+
+
+def test_sehir_feedbackleri_yeniden_eskiye_sayfalanir(client):
+    city_id = client.get("/api/feedback/", params={"limit": 1}).json()["data"][0]["city_id"]
+    # Cursor bilmeyen istemcinin ilk sayfasında yeni feedback görünür
+    yeni = client.post("/api/feedback/submit", json={"city_id": city_id, "message": "sayfalama yeni mesaj"})
+    ilk = client.get(f"/api/feedback/city/{city_id}").json()["data"]
+    assert ilk[0]["id"] == yeni.json()["data"]["id"]
+
+    satirlar = _tum_sayfalar(client, f"/api/feedback/city/{city_id}", limit=5)
+    idler = [s["id"] for s in satirlar]
+    assert idler == sorted(set(idler), reverse=True)
+    assert all(s["city_id"] == city_id for s in satirlar)
+
+
+@pytest.mark.parametrize("url", ["/api/stats", "/api/weather", "/api/paycell", "/api/scores"])
+def test_sehir_metrikleri_en_yeni_tarihten_baslar(client, url):
+    city_id = client.get(f"{url}/", params={"limit": 1}).json()["data"][0]["city_id"]
+    tum = client.get(f"{url}/{city_id}").json()["data"]
+    tarihler = [s["date"] for s in _tum_sayfalar(client, f"{url}/{city_id}", limit=3)]
+    assert tarihler == sorted(set(tarihler), reverse=True)
+    assert tum[0]["date"] == tarihler[0]
+
+
+def test_sayfa_boyutu_sinirli(client):
+    govde = client.get("/api/feedback/", params={"limit": SAYFA_LIMITI * 10}).json()
+    assert len(govde["data"]) <= SAYFA_LIMITI
+
+
+@pytest.mark.parametrize("cursor", ["bozuk", "eyJ4IjoxfQ", "eyJpZCI6ImEifQ"])
+def test_gecersiz_cursor_400(client, cursor):
+    yanit = client.get("/api/feedback/", params={"cursor": cursor})
+    assert yanit.status_code == 400
+    assert yanit.json()["detail"]["error_code"] == "INVALID_CURSOR"
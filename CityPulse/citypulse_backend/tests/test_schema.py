@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import os
+import random
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import models, schema
+from app.database import engine
+
+
+# Sık çalışan sorgular ve kullanmaları gereken indeks
+SICAK_SORGULAR = [
+    ("SELECT * FROM city_feedback WHERE city_id = '34' AND id > 0 ORDER BY id LIMIT 101",
+     "ix_city_feedback_city_id"),
+    ("SELECT category, COUNT(*) FROM city_feedback WHERE city_id = '34' "
+     "AND timestamp >= '2024-01-01' AND timestamp < '2024-02-01' GROUP BY category",
+     "ix_city_feedback_city_timestamp"),
+    ("SELECT category, COUNT(*) FROM city_feedback WHERE city_id = '34' GROUP BY category",
+     "ix_city_feedback_city_category"),
+]
+
+
+@pytest.fixture(scope="module")
+def dolu_veritabani():
+    """Göçleri uygulanmış, sentetik feedback'lerle dolu geçici veritabanı"""
+    with tempfile.TemporaryDirectory() as klasor:
+        gecici = create_engine(f"sqlite:///{os.path.join(klasor, 'plan.db')}")
+        models.CityFeedback.__table__.create(gecici)
+        rastgele = random.Random(0)
+        baslangic = datetime(2024, 1, 1)
+        with gecici.begin() as conn:
+            conn.execute(models.CityFeedback.__table__.insert(), [
+                {
+                    "city_id": str(rastgele.randint(1, 81)),
+                    "user": f"user_{i}",
+                    "message": "mesaj",
+                    "category": rastgele.choice(["Altyapı", "Çevre", "Ulaşım", "İnternet"]),
+                    "timestamp": baslangic + timedelta(minutes=i)
+                }
+                for i in range(20000)
+            ])
+        onceki = schema.engine
+        schema.engine = gecici
+        try:
+            # İndeks göçü (sonraki göçler bu tabloda olmayan nesnelere dokunabilir)
+            schema.gocleri_uygula(schema.GOCLER[:1])
+        finally:
+            schema.engine = onceki
+        yield gecici
+        gecici.dispose()
+
+
+@pytest.mark.parametrize("sorgu,indeks", SICAK_SORGULAR)
+def test_sicak_sorgular_indeks_kullanir(dolu_veritabani, sorgu, indeks):
+    with dolu_veritabani.connect() as conn:
+        plan = " | ".join(r[3] for r in conn.execute(text("EXPLAIN QUERY PLAN " + sorgu)))
+    assert indeks in plan
+    assert "SCAN city_feedback" not in plan
+    assert "TEMP B-TREE FOR ORDER BY" not in plan
+
+
+def test_goc_tekrar_calismaz(client):
+    surum = schema.gocleri_uygula()
+    assert surum == schema.GOCLER[-1][0]
+    assert schema.gocleri_uygula() == surum
+    with engine.connect() as conn:
+        surumler = [r[0] for r in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+    assert surumler == [g[0] for g in schema.GOCLER]
+
+
+def test_eszamanli_workerlar_gocu_bir_kez_uygular(monkeypatch):
+    with tempfile.TemporaryDirectory() as klasor:
+        gecici = create_engine(f"sqlite:///{os.path.join(klasor, 'goc.db')}")
+        monkeypatch.setattr(schema, "engine", gecici)
+        # IF NOT EXISTS yok: iki kez çalışırsa hata verir
+        gocler = [
+            (1, "tablo", ["CREATE TABLE t (x INTEGER)"]),
+            (2, "satır", ["INSERT INTO t VALUES (1)"]),
+        ]
+        with ThreadPoolExecutor(max_workers=8) as havuz:
+            sonuclar = list(havuz.map(lambda _: schema.gocleri_uygula(gocler), range(8)))
+        assert sonuclar == [2] * 8
+        with gecici.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM t")).scalar() == 1
+            assert conn.execute(text("SELECT COUNT(*) FROM schema_migrations")).scalar() == 2
+        gecici.dispose()
+
+
+@pytest.mark.parametrize("kosullar", [
+    ["city_feedback_fts MATCH :sorgu"],
+    ["city_feedback_fts MATCH :sorgu", "city_feedback_fts.rowid < :c_id", "f.city_id = :city_id"],
+])
+def test_yeni_arama_rowid_sirasiyla_akar(client, kosullar):
+    from app.routers.feedback import _arama_sorgusu
+
+    with engine.connect() as conn:
+        plan = " | ".join(r[3] for r in conn.execute(
+            text("EXPLAIN QUERY PLAN " + _arama_sorgusu("recent", kosullar)),
+            {"sorgu": '"yol"*', "c_id": 100, "city_id": "34", "limit": 21}
+        ))
+    assert "SCAN city_feedback_fts VIRTUAL TABLE" in plan
+    assert "TEMP B-TREE" not in plan
+    assert "SCAN f" not in plan
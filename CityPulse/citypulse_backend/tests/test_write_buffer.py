@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.write_buffer import YazmaTamponu
+
+
+@pytest.fixture
+def tampon(client):
+    tampon = YazmaTamponu(en_fazla_satir=50, en_fazla_bekleme_ms=20)
+    tampon.baslat()
+    yield tampon
+    tampon.durdur()
+
+
+def _kaydet(tampon, city_id, mesaj, zaman=None, sonrasi=None):
+    # Her istek (thread) kendi oturumunu kullanır
+    db = SessionLocal()
+    try:
+        return tampon.kaydet(db, city_id, mesaj, "Öneri", zaman or datetime.now(), sonrasi=sonrasi)
+    finally:
+        db.close()
+
+
+def test_eszamanli_istekler_grup_halinde_commit_edilir(tampon, db, sehir_id):
+    with ThreadPoolExecutor(max_workers=16) as havuz:
+        satirlar = list(havuz.map(lambda i: _kaydet(tampon, sehir_id, f"grup mesajı {i}"), range(100)))
+
+    idler = [s["id"] for s in satirlar]
+    assert len(set(idler)) == 100
+    assert len({s["user"] for s in satirlar}) == 100
+    metrikler = tampon.metrikler()
+    assert metrikler["rows"] == 100
+    assert metrikler["commits"] < 100
+
+    kayitli = db.execute(
+        text("SELECT COUNT(*) FROM city_feedback WHERE id IN (%s)" % ",".join(map(str, idler)))
+    ).scalar()
+    assert kayitli == 100
+
+
+def test_hatali_satir_grubun_geri_kalanini_dusurmez(tampon, sehir_id):
+    with ThreadPoolExecutor(max_workers=8) as havuz:
+        # Zamanı datetime olmayan satır veritabanına yazılamaz
+        isler = [
+            havuz.submit(_kaydet, tampon, sehir_id, f"tek hata {i}", "dün" if i == 3 else None)
+            for i in range(8)
+        ]
+        sonuclar = []
+        for i, is_ in enumerate(isler):
+            if i == 3:
+                with pytest.raises(Exception):
+                    is_.result()
+            else:
+                sonuclar.append(is_.result())
+    assert len(sonuclar) == 7
+    assert tampon.metrikler()["errors"] == 1
+
+
+def test_durdurulunca_dogrudan_yazar(sehir_id):
+    tampon = YazmaTamponu(en_fazla_satir=10, en_fazla_bekleme_ms=5)
+    satir = _kaydet(tampon, sehir_id, "tampon kapalı")
+    assert satir["id"] is not None
+    assert tampon.metrikler()["commits"] == 0
+
+
+def test_sonrasi_satirla_ayni_transactionda_calisir(tampon, db, sehir_id):
+    gorulen = []
+
+    def sonrasi(yazma_db, satir):
+        gorulen.append(satir["id"])
+        if satir["message"] == "sonrası bozuk":
+            raise RuntimeError("yanıt yazılamadı")
+
+    with ThreadPoolExecutor(max_workers=4) as havuz:
+        gelecekler = [
+            havuz.submit(_kaydet, tampon, sehir_id, m, sonrasi=sonrasi)
+            for m in ("sonrası 1", "sonrası bozuk", "sonrası 2")
+        ]
+    with pytest.raises(RuntimeError):
+        gelecekler[1].result()
+    idler = [gelecekler[0].result()["id"], gelecekler[2].result()["id"]]
+    assert set(idler) <= set(gorulen)
+
+    mesajlar = db.execute(text(
+        "SELECT message FROM city_feedback WHERE message LIKE 'sonrası %'"
+    )).scalars().all()
+    assert sorted(mesajlar) == ["sonrası 1", "sonrası 2"]
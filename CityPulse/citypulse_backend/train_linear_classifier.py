@@ -0,0 +1,121 @@
+"""
+Hash'lenmiş kelime torbası doğrusal sınıflandırıcıyı eğitme scripti
+
+Etiketli city_feedback satırlarını (message, category) okur, bir kısmını
+doğrulama için ayırır, softmax modeli eğitir ve doğrulama doğruluğunu kural
+tabanlı motorla karşılaştırarak modeli CLASSIFIER_LINEAR_MODEL_PATH'e yazar.
+Veritabanında yeterli etiketli veri yoksa --korpus ile sentetik mesajlar eklenebilir.
+
+Kullanım:
+    python train_linear_classifier.py
+    python train_linear_classifier.py --korpus 20000 --donem 20
+    CLASSIFIER_ENGINE=linear uvicorn main:app
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import select
+from app.database import SessionLocal
+from app import config, models
+from app.classification_queue import BEKLEMEDE_KATEGORISI
+from app.feedback_classifier import kategori_bul
+from app.linear_classifier import VARSAYILAN_OZELLIK_BOYUTU, egit, kullanilabilir, ozellik_boyutu_dogrula
+
+
+def etiketli_mesajlari_oku(en_fazla: int = None) -> list:
+    """Veritabanındaki (mesaj, kategori) çiftleri - henüz sınıflandırılmamış satırlar hariç"""
+    db = SessionLocal()
+    try:
+        sorgu = select(models.CityFeedback.message, models.CityFeedback.category).where(
+            models.CityFeedback.message.isnot(None),
+            models.CityFeedback.category.isnot(None),
+            models.CityFeedback.category != BEKLEMEDE_KATEGORISI
+        )
+        if en_fazla:
+            sorgu = sorgu.limit(en_fazla)
+        return [(mesaj, kategori) for mesaj, kategori in db.execute(sorgu)]
+    finally:
+        db.close()
+
+
+def _ozellik_boyutu(deger: str) -> int:
+    try:
+        return ozellik_boyutu_dogrula(int(deger))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def dogruluk(tahminler: list, etiketler: list) -> float:
+    if not etiketler:
+        return 0
+    return sum(1 for t, e in zip(tahminler, etiketler) if t == e) / len(etiketler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Doğrusal feedback sınıflandırıcıyı eğit")
+    parser.add_argument("--cikti", default=config.CLASSIFIER_LINEAR_MODEL_PATH, help="Model dosyası (.npz)")
+    parser.add_argument("--en-fazla", type=int, help="Veritabanından okunacak en fazla satır")
+    parser.add_argument("--korpus", type=int, default=0, help="Eklenecek sentetik mesaj sayısı")
+    parser.add_argument("--dogrulama-orani", type=float, default=0.1)
+    parser.add_argument("--donem", type=int, default=15)
+    parser.add_argument(
+        "--ozellik-boyutu", type=_ozellik_boyutu, default=VARSAYILAN_OZELLIK_BOYUTU,
+        help="Hash uzayı boyutu (2'nin kuvveti)"
+    )
+    parser.add_argument("--tohum", type=int, default=42)
+    args = parser.parse_args()
+
+    if not kullanilabilir():
+        print("❌ numpy ve scipy kurulu değil: pip install numpy scipy")
+        raise SystemExit(1)
+
+    print("\n🧠 Doğrusal Sınıflandırıcı Eğitimi")
+    veri = etiketli_mesajlari_oku(args.en_fazla)
+    print(f"   Veritabanından {len(veri)} etiketli mesaj okundu")
+
+    if args.korpus:
+        from benchmarks.corpus import korpus_uret
+        veri.extend(korpus_uret(args.korpus, tohum=args.tohum))
+        print(f"   {args.korpus} sentetik mesaj eklendi")
+
+    if len({etiket for _, etiket in veri}) < 2:
+        print("❌ Eğitim için en az iki farklı kategori gerekli")
+        raise SystemExit(1)
+
+    random.Random(args.tohum).shuffle(veri)
+    ayrim = int(len(veri) * args.dogrulama_orani)
+    dogrulama, egitim = veri[:ayrim], veri[ayrim:]
+
+    baslangic = time.perf_counter()
+    model = egit(
+        [m for m, _ in egitim],
+        [e for _, e in egitim],
+        ozellik_boyutu=args.ozellik_boyutu,
+        donem=args.donem,
+        tohum=args.tohum
+    )
+    print(f"   {len(egitim)} mesajla eğitildi ({time.perf_counter() - baslangic:.2f} sn)")
+
+    if dogrulama:
+        mesajlar = [m for m, _ in dogrulama]
+        etiketler = [e for _, e in dogrulama]
+        model_tahminleri = model.tahmin_et(mesajlar)
+        emin = [
+            (t[0], e) for t, e in zip(model_tahminleri, etiketler)
+            if t[1] >= config.CLASSIFIER_LINEAR_MIN_CONFIDENCE
+        ]
+        # Servisteki gibi: emin olunmayan mesajlar kural motoruna düşer
+        karma = [
+            t[0] if t[1] >= config.CLASSIFIER_LINEAR_MIN_CONFIDENCE else kategori_bul(m)
+            for m, t in zip(mesajlar, model_tahminleri)
+        ]
+        print(f"\n📊 Doğrulama ({len(dogrulama)} mesaj):")
+        print(f"   Kural motoru        : {dogruluk([kategori_bul(m) for m in mesajlar], etiketler):.2%}")
+        print(f"   Doğrusal model      : {dogruluk([t[0] for t in model_tahminleri], etiketler):.2%}")
+        print(f"   Model + kural yedek : {dogruluk(karma, etiketler):.2%}  "
+              f"(%{len(emin) / len(dogrulama) * 100:.1f} mesajda model emin)")
+
+    model.meta["validation_samples"] = len(dogrulama)
+    model.kaydet(args.cikti)
+    print(f"\n✅ Model kaydedildi: {args.cikti} (sürüm {model.surum})")
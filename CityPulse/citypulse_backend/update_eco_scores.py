@@ -6,17 +6,26 @@ city_scores tablosundaki eco_score değerlerini günceller.
 
 Kullanım:
     python update_eco_scores.py
+    python update_eco_scores.py --gun 30   # Çevre mesaj oranı sadece son 30 gün
 """
+import argparse
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.database import SessionLocal, engine
 from app import models
-from app.routers.city_statistics import calculate_city_sustainability_score
+from app.routers.city_statistics import calculate_city_sustainability_score, sehir_skor_girdileri
+from app.schema import sema_guncelle
 
 
-def update_all_eco_scores():
-    """Tüm şehirler ve tarihleri için eco_score değerlerini güncelle"""
+def update_all_eco_scores(gun: int = None):
+    """
+    Tüm şehirler ve tarihleri için eco_score değerlerini güncelle
+    
+    Args:
+        gun: Çevre mesaj oranı için son kaç gün (None: tüm zamanlar)
+    """
+    sema_guncelle()
     db = SessionLocal()
     
     try:
@@ -28,47 +37,24 @@ def update_all_eco_scores():
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=7)
         
-        # Tüm şehirleri getir
-        cities = db.query(models.City).all()
+        # Tüm şehirlerin ortalamaları ve feedback sayıları tek sorguda
+        girdiler = sehir_skor_girdileri(db, start_date, gun)
         
         total_updated = 0
-        total_cities = len(cities)
+        total_cities = len(girdiler)
         
-        for idx, city in enumerate(cities, 1):
+        for idx, (city, avg_signal, avg_air_quality, avg_traffic, total_feedback, eco_feedback) in enumerate(
+            girdiler, 1
+        ):
             print(f"\n[{idx}/{total_cities}] 🏙️  {city.name} (ID: {city.city_id})")
             
-            # Her şehir için haftalık istatistikleri hesapla
-            avg_signal = db.query(func.avg(models.CityStats.signal_strength)).filter(
-                models.CityStats.city_id == city.city_id,
-                models.CityStats.date >= start_date
-            ).scalar() or 0
-            
-            avg_air_quality = db.query(func.avg(models.CityWeather.air_quality)).filter(
-                models.CityWeather.city_id == city.city_id,
-                models.CityWeather.date >= start_date
-            ).scalar() or 0
-            
-            avg_traffic = db.query(func.avg(models.CityStats.traffic_gb)).filter(
-                models.CityStats.city_id == city.city_id,
-                models.CityStats.date >= start_date
-            ).scalar() or 0
-            
-            total_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-                models.CityFeedback.city_id == city.city_id
-            ).scalar() or 0
-            
-            eco_feedback = db.query(func.count(models.CityFeedback.id)).filter(
-                models.CityFeedback.city_id == city.city_id,
-                models.CityFeedback.category.in_(['Çevre', 'Yeşil', 'Sürdürülebilirlik', 'Enerji'])
-            ).scalar() or 0
-            
             eco_feedback_ratio = (eco_feedback / total_feedback * 100) if total_feedback > 0 else 0
             
             # Sürdürülebilirlik skorunu hesapla (0-100)
             sustainability_score = calculate_city_sustainability_score(
-                signal_strength=float(avg_signal),
-                air_quality=float(avg_air_quality),
-                traffic_gb=float(avg_traffic),
+                signal_strength=avg_signal,
+                air_quality=avg_air_quality,
+                traffic_gb=avg_traffic,
                 eco_feedback_ratio=eco_feedback_ratio
             )
             
@@ -144,6 +130,10 @@ def show_eco_scores_comparison():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="city_scores eco_score değerlerini güncelle")
+    parser.add_argument("--gun", type=int, help="Çevre mesaj oranı için son kaç gün (varsayılan: tüm zamanlar)")
+    args = parser.parse_args()
+    
     print("\n🚀 City Scores Eco Score Güncelleme Aracı")
     print("\nBu script city_scores tablosundaki eco_score değerlerini")
     print("hesaplanan sürdürülebilirlik skoruyla güncelleyecek.\n")
@@ -155,7 +145,7 @@ if __name__ == "__main__":
     response = input("\n⚠️  Veritabanını güncellemek istediğinize emin misiniz? (evet/hayır): ")
     
     if response.lower() in ['evet', 'yes', 'e', 'y']:
-        update_all_eco_scores()
+        update_all_eco_scores(gun=args.gun)
         
         # Sonucu göster
         print("\n📋 Güncelleme Sonrası Durum:")